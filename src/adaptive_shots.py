@@ -0,0 +1,160 @@
+"""
+Asignación adaptativa de shots para la estimación de energía.
+
+Las primeras iteraciones de SPSA no necesitan 20000 shots: la diferencia de
+energía entre los dos puntos perturbados es grande comparada con el ruido de
+muestreo. ``AdaptiveShots`` empieza con pocos shots y, cada vez que esa
+diferencia queda enterrada en el ruido estimado a partir de la varianza
+observada, aumenta el presupuesto lo necesario para resolverla.
+"""
+import math
+import sys
+
+import numpy as np
+
+
+class AdaptiveShots:
+    """
+    Envuelve un ``BatchedObjective`` (o ``AsyncObjective``) y ajusta sus shots.
+
+    Tras cada lote de al menos dos puntos se compara la diferencia entre los
+    dos primeros, |f+ - f-|, con su error estándar sqrt(σ+² + σ-²) / sqrt(shots).
+    Si en las últimas ``window`` comparaciones más de la mitad quedaron por
+    debajo de ``z`` errores estándar, el ruido domina el paso del optimizador y
+    los shots crecen hasta la mediana de los necesarios para resolverlas, como
+    máximo ``growth`` veces por ajuste y sin pasar de ``max_shots``. Los shots
+    nunca disminuyen, de modo que la precisión acompaña al tamaño de paso
+    decreciente del optimizador.
+    """
+
+    def __init__(self, objective, min_shots=500, max_shots=20000, z=1.0, growth=2.0, window=10):
+        self.objective = objective
+        self.min_shots = min_shots
+        self.max_shots = max_shots
+        self.z = z
+        self.growth = growth
+        self.window = window
+        self.shot_history = []
+        self._needed = []
+        objective.shots = min_shots
+
+    @property
+    def shots(self):
+        return self.objective.shots
+
+    @property
+    def total_shots(self):
+        return self.objective.total_shots
+
+    @property
+    def num_evaluations(self):
+        return self.objective.num_evaluations
+
+    @property
+    def num_jobs(self):
+        return self.objective.num_jobs
+
+    @property
+    def telemetry(self):
+        return self.objective.telemetry
+
+    @property
+    def history(self):
+        return self.objective.history
+
+    @property
+    def callback(self):
+        return self.objective.callback
+
+    @callback.setter
+    def callback(self, callback):
+        self.objective.callback = callback
+
+    def run_counts(self, points):
+        return self.objective.run_counts(points)
+
+    def _update_shots(self, means, stds):
+        noise = math.sqrt(stds[0] ** 2 + stds[1] ** 2)
+        signal = abs(means[0] - means[1])
+        # Shots con los que la diferencia quedaría a z errores estándar
+        if noise == 0:
+            needed = 0
+        elif signal == 0:
+            needed = self.max_shots
+        else:
+            needed = (self.z * noise / signal) ** 2
+        self._needed.append(needed)
+        if len(self._needed) < self.window:
+            return
+
+        shots = self.objective.shots
+        unresolved = sum(n > shots for n in self._needed)
+        if 2 * unresolved > len(self._needed):
+            target = math.ceil(np.median(self._needed))
+            self.objective.shots = int(min(self.max_shots, target, shots * self.growth))
+        self._needed = []
+
+    def evaluate(self, points):
+        means, stds = self.objective.evaluate(points)
+        self.shot_history.append(self.objective.shots)
+        if len(means) >= 2:
+            self._update_shots(means, stds)
+        return means, stds
+
+    def __call__(self, points):
+        points = np.asarray(points, dtype=float)
+        means, _ = self.evaluate(points)
+        if points.ndim == 1:
+            return float(means[0])
+        return means
+
+
+def compare_shot_strategies(rows, cols, backend, alpha, qubits_per_cell, maxiter=250,
+                            shots=20000, min_shots=500, seed=None):
+    """Ejecuta SPSA con shots fijos y adaptativos desde el mismo punto inicial."""
+    from qiskit.algorithms.optimizers import SPSA
+    from qiskit.utils import algorithm_globals
+
+    from ansatz import constraint_ansatz
+    from batched_objective import BatchedObjective
+    from restrictions import create_hamiltonian
+    from sudoku_board import decode_board, is_valid_board
+
+    H = create_hamiltonian(alpha, rows, qubits_per_cell, cols)
+    ansatz, _ = constraint_ansatz(H, layers=2)
+    initial_point = np.random.default_rng(seed).uniform(-np.pi, np.pi, ansatz.num_parameters)
+
+    report = []
+    for name in ('fijo', 'adaptativo'):
+        if seed is not None:
+            algorithm_globals.random_seed = seed
+        objective = BatchedObjective(ansatz, H, backend, shots=shots, seed=seed)
+        if name == 'adaptativo':
+            objective = AdaptiveShots(objective, min_shots=min_shots, max_shots=shots)
+
+        optimizer = SPSA(maxiter=maxiter)
+        optimizer.set_max_evals_grouped(2)
+        result = optimizer.minimize(objective, initial_point)
+        total_shots = objective.total_shots
+
+        # La evaluación final se hace con el máximo de shots en ambos casos
+        final = BatchedObjective(ansatz, H, backend, shots=shots, seed=seed)
+        counts = final.run_counts(result.x)[0]
+        energy, _ = final.hamiltonian.expectation(counts)
+        board = decode_board(max(counts, key=counts.get), rows, cols, qubits_per_cell)
+        report.append({'strategy': name, 'energy': energy, 'total_shots': total_shots,
+                       'valid': is_valid_board(board)})
+    return report
+
+
+if __name__ == '__main__':
+    from qiskit import Aer
+
+    from vqe_local import ALPHA, QUBITS_PER_CELL, SUDOKU_COLS, SUDOKU_ROWS
+
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else 12345
+    backend = Aer.get_backend('qasm_simulator')
+    for entry in compare_shot_strategies(SUDOKU_ROWS, SUDOKU_COLS, backend, ALPHA,
+                                         QUBITS_PER_CELL, seed=seed):
+        print(f"{entry['strategy']:<12} energía {entry['energy']:>10.2f}  "
+              f"shots totales {entry['total_shots']:>10}  válido {entry['valid']}")
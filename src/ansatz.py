@@ -0,0 +1,153 @@
+import sys
+
+from qiskit.circuit import ParameterVector, QuantumCircuit
+
+
+def constraint_graph(hamiltonian):
+    """
+    Devuelve las aristas (i, j), i < j, entre qubits que comparten algún término.
+
+    Para el Hamiltoniano de ``create_hamiltonian`` son exactamente los pares de
+    qubits acoplados por una restricción de celda, fila, columna o subgrilla.
+    """
+    edges = set()
+    for pauli in hamiltonian.paulis:
+        support = sorted(int(q) for q in (pauli.z | pauli.x).nonzero()[0])
+        for a in range(len(support)):
+            for b in range(a + 1, len(support)):
+                edges.add((support[a], support[b]))
+    return sorted(edges)
+
+
+def spanning_edges(edges):
+    """
+    Bosque generador del grafo de restricciones obtenido con una búsqueda en profundidad.
+
+    Conecta todos los qubits acoplados con el mínimo número de aristas (un CNOT
+    por arista). La búsqueda en profundidad produce árboles alargados, de grado
+    bajo, que se pueden programar en pocas capas paralelas.
+    """
+    neighbors = {}
+    for i, j in edges:
+        neighbors.setdefault(i, []).append(j)
+        neighbors.setdefault(j, []).append(i)
+
+    visited = set()
+    tree = []
+    for root in sorted(neighbors):
+        if root in visited:
+            continue
+        visited.add(root)
+        stack = [root]
+        while stack:
+            node = stack[-1]
+            for neighbor in neighbors[node]:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    tree.append((min(node, neighbor), max(node, neighbor)))
+                    stack.append(neighbor)
+                    break
+            else:
+                stack.pop()
+    return tree
+
+
+def schedule_edges(edges):
+    """
+    Agrupa las aristas en capas de CNOT que no comparten qubits (coloreo voraz).
+
+    Cada capa se ejecuta en paralelo, así que la profundidad de entrelazamiento
+    es el número de capas, a lo sumo el grado máximo del grafo más uno en la
+    práctica.
+    """
+    layers = []
+    busy = []
+    # Primero las aristas de los qubits con más vecinos, que son las que limitan
+    degree = {}
+    for i, j in edges:
+        degree[i] = degree.get(i, 0) + 1
+        degree[j] = degree.get(j, 0) + 1
+    for i, j in sorted(edges, key=lambda e: -(degree[e[0]] + degree[e[1]])):
+        for layer, used in zip(layers, busy):
+            if i not in used and j not in used:
+                layer.append((i, j))
+                used.update((i, j))
+                break
+        else:
+            layers.append([(i, j)])
+            busy.append({i, j})
+    return layers
+
+
+def constraint_ansatz(hamiltonian, layers=1, entanglement='tree'):
+    """
+    Ansatz poco profundo cuyo entrelazamiento sigue el grafo de restricciones.
+
+    Cada capa aplica una RY con parámetro propio a cada qubit y luego CNOTs
+    agrupados en capas paralelas entre qubits acoplados por el Hamiltoniano:
+    con ``entanglement='tree'`` solo las aristas de un bosque generador (el
+    mínimo que entrelaza cada componente), con ``'full'`` todas. Una rotación
+    final cierra el circuito.
+
+    Returns:
+        tuple: (circuito, lista de parámetros) igual que ``sudoku_ansatz``.
+    """
+    num_qubits = hamiltonian.num_qubits
+    edges = constraint_graph(hamiltonian)
+    if entanglement == 'tree':
+        edges = spanning_edges(edges)
+    elif entanglement != 'full':
+        raise ValueError(f'Entrelazamiento desconocido: {entanglement}')
+    cx_layers = schedule_edges(edges)
+    params = ParameterVector('θ', num_qubits * (layers + 1))
+
+    qc = QuantumCircuit(num_qubits)
+    for layer in range(layers + 1):
+        for qubit in range(num_qubits):
+            qc.ry(params[layer * num_qubits + qubit], qubit)
+        if layer == layers:
+            break
+        for cx_layer in cx_layers:
+            for i, j in cx_layer:
+                qc.cx(i, j)
+
+    return qc, list(params)
+
+
+def ansatz_stats(circuit):
+    """Profundidad, número de CNOT y de parámetros de un circuito."""
+    return {
+        'depth': circuit.depth(),
+        'cx': circuit.count_ops().get('cx', 0),
+        'parameters': circuit.num_parameters,
+    }
+
+
+def compare_ansatze(shapes, alpha, qubits_per_cell, layers=1):
+    """Compara ``sudoku_ansatz`` con ``constraint_ansatz`` para cada forma de tablero."""
+    from restrictions import create_hamiltonian
+    from vqe_local import sudoku_ansatz
+
+    report = []
+    for rows, cols in shapes:
+        H = create_hamiltonian(alpha, rows, qubits_per_cell, cols)
+        current, _ = sudoku_ansatz(rows, cols)
+        proposed, _ = constraint_ansatz(H, layers=layers)
+        report.append({'shape': (rows, cols),
+                       'sudoku_ansatz': ansatz_stats(current),
+                       'constraint_ansatz': ansatz_stats(proposed)})
+    return report
+
+
+if __name__ == '__main__':
+    from vqe_local import ALPHA, QUBITS_PER_CELL
+
+    layers = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+
+    print(f"{'tablero':<10}{'ansatz':<20}{'profundidad':>12}{'cx':>8}{'parámetros':>12}")
+    for entry in compare_ansatze([(2, 2), (2, 4), (4, 4)], ALPHA, QUBITS_PER_CELL, layers):
+        shape = '{}x{}'.format(*entry['shape'])
+        for name in ('sudoku_ansatz', 'constraint_ansatz'):
+            stats = entry[name]
+            print(f"{shape:<10}{name:<20}{stats['depth']:>12}{stats['cx']:>8}"
+                  f"{stats['parameters']:>12}")
@@ -0,0 +1,103 @@
+"""
+Escritura de dibujos de circuitos e histogramas fuera del camino crítico.
+
+Por defecto no se dibuja nada. Si se configura un directorio (con
+``configure`` o la variable de entorno ``SUDOKU_ARTIFACTS``), cada dibujo se
+escribe a un archivo desde un hilo en segundo plano con el backend ``Agg`` de
+matplotlib, de modo que el solucionador nunca espera por el render ni por una
+pantalla.
+"""
+import atexit
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ArtifactWriter:
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._executor = None
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            # Un solo hilo: matplotlib no es seguro para dibujar en paralelo
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='artifacts')
+
+    @property
+    def enabled(self):
+        return self._executor is not None
+
+    def _submit(self, function, *args):
+        if not self.enabled:
+            return None
+        return self._executor.submit(function, *args)
+
+    def draw_circuit(self, circuit, name, output='text'):
+        """Escribe el circuito en ``<name>.txt`` (output='text') o ``<name>.png`` ('mpl')."""
+        # Copia para que modificaciones posteriores no cambien el dibujo
+        return self._submit(self._draw_circuit, circuit.copy(), name, output)
+
+    def plot_histogram(self, counts, name):
+        """Escribe el histograma de conteos en ``<name>.png``."""
+        return self._submit(self._plot_histogram, dict(counts), name)
+
+    def _draw_circuit(self, circuit, name, output):
+        if output == 'text':
+            path = os.path.join(self.directory, f'{name}.txt')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(str(circuit.draw(output='text', fold=-1)))
+            return path
+
+        plt = _pyplot()
+        path = os.path.join(self.directory, f'{name}.png')
+        figure = circuit.draw(output=output)
+        figure.savefig(path)
+        plt.close(figure)
+        return path
+
+    def _plot_histogram(self, counts, name):
+        from qiskit.visualization import plot_histogram
+
+        plt = _pyplot()
+        path = os.path.join(self.directory, f'{name}.png')
+        figure = plot_histogram(counts)
+        figure.savefig(path)
+        plt.close(figure)
+        return path
+
+    def close(self, wait=True):
+        """Espera a que terminen los dibujos pendientes."""
+        if self.enabled:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+def _pyplot():
+    import matplotlib
+
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+_writer = None
+
+
+def configure(directory=None):
+    """Reemplaza el escritor global. ``directory=None`` desactiva los dibujos."""
+    global _writer
+    if _writer is not None:
+        _writer.close()
+    _writer = ArtifactWriter(directory)
+    return _writer
+
+
+def get_writer():
+    if _writer is None:
+        configure(os.environ.get('SUDOKU_ARTIFACTS'))
+    return _writer
+
+
+@atexit.register
+def _flush():
+    if _writer is not None:
+        _writer.close()
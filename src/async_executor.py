@@ -0,0 +1,262 @@
+"""
+Ejecución asíncrona por lotes de circuitos en backends remotos.
+
+Cada envío a un backend de IBM paga la latencia de la cola. ``AsyncExecutor``
+agrupa los circuitos pendientes en jobs de hasta ``max_circuits_per_job``
+circuitos, mantiene hasta ``max_jobs_in_flight`` jobs en curso y entrega los
+conteos como ``Future``. El proveedor es intercambiable: ``BackendProvider``
+envuelve cualquier backend de Qiskit y ``FakeLatencyProvider`` agrega una
+latencia de cola artificial para probar localmente con Aer.
+"""
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from qiskit import transpile
+
+from batched_objective import BatchedObjective
+from energy import DiagonalHamiltonian
+from profiling import stage
+
+
+class BackendProvider:
+    """Proveedor que transpila y envía los circuitos a un backend de Qiskit."""
+
+    def __init__(self, backend, optimization_level=1):
+        self.backend = backend
+        self.optimization_level = optimization_level
+
+    def run(self, circuits, shots):
+        transpiled = transpile(circuits, self.backend,
+                               optimization_level=self.optimization_level)
+        return self.backend.run(transpiled, shots=shots)
+
+
+class _DelayedJob:
+    def __init__(self, job, ready_at):
+        self._job = job
+        self._ready_at = ready_at
+
+    def result(self):
+        remaining = self._ready_at - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+        return self._job.result()
+
+
+class FakeLatencyProvider(BackendProvider):
+    """
+    Proveedor de prueba: cada job queda listo ``queue_delay`` segundos después
+    de enviarse, como si esperara en la cola de un backend remoto.
+    """
+
+    def __init__(self, backend, queue_delay=1.0, optimization_level=1):
+        super().__init__(backend, optimization_level)
+        self.queue_delay = queue_delay
+
+    def run(self, circuits, shots):
+        ready_at = time.monotonic() + self.queue_delay
+        return _DelayedJob(super().run(circuits, shots), ready_at)
+
+
+# Centinela que ``close`` encola para detener al despachador
+_CLOSE = object()
+
+
+class _Request:
+    __slots__ = ('circuit', 'shots', 'future')
+
+    def __init__(self, circuit, shots):
+        self.circuit = circuit
+        self.shots = shots
+        self.future = Future()
+
+
+class AsyncExecutor:
+    """
+    Agrupa circuitos en jobs y mantiene varios jobs en curso a la vez.
+
+    ``submit`` devuelve de inmediato un ``Future`` con los conteos del circuito.
+    Un hilo despachador junta los circuitos que llegan dentro de
+    ``batch_window`` segundos (con el mismo número de shots) en un solo job.
+    """
+
+    def __init__(self, provider, max_circuits_per_job=100, max_jobs_in_flight=4,
+                 batch_window=0.005):
+        self.provider = provider
+        self.max_circuits_per_job = max_circuits_per_job
+        self.batch_window = batch_window
+        self.num_jobs = 0
+        self.num_circuits = 0
+
+        self._pending = queue.Queue()
+        self._slots = threading.Semaphore(max_jobs_in_flight)
+        self._collectors = ThreadPoolExecutor(max_workers=max_jobs_in_flight,
+                                              thread_name_prefix='jobs')
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, circuit, shots):
+        request = _Request(circuit, shots)
+        self._pending.put(request)
+        return request.future
+
+    def map(self, circuits, shots):
+        return [self.submit(circuit, shots) for circuit in circuits]
+
+    def _next_batch(self, first):
+        """Junta solicitudes compatibles con ``first``; devuelve (lote, sobrante)."""
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_circuits_per_job:
+            try:
+                request = self._pending.get(timeout=max(0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if request is _CLOSE or request.shots != first.shots:
+                return batch, request
+            batch.append(request)
+        return batch, None
+
+    def _dispatch(self):
+        carry = None
+        while True:
+            request = carry if carry is not None else self._pending.get()
+            carry = None
+            if request is _CLOSE:
+                break
+
+            # Si el lote terminó en _CLOSE, se envía el lote y luego se sale
+            batch, carry = self._next_batch(request)
+            self._slots.acquire()
+            try:
+                job = self.provider.run([r.circuit for r in batch], request.shots)
+            except Exception as error:
+                self._slots.release()
+                for r in batch:
+                    r.future.set_exception(error)
+                continue
+
+            self.num_jobs += 1
+            self.num_circuits += len(batch)
+            self._collectors.submit(self._collect, job, batch)
+
+    def _collect(self, job, batch):
+        try:
+            result = job.result()
+            for i, request in enumerate(batch):
+                request.future.set_result(result.get_counts(i))
+        except Exception as error:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(error)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Espera a que se despachen y resuelvan todos los circuitos enviados."""
+        self._pending.put(_CLOSE)
+        self._dispatcher.join()
+        self._collectors.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class AsyncObjective(BatchedObjective):
+    """
+    ``BatchedObjective`` que envía los circuitos ligados a un ``AsyncExecutor``.
+
+    Útil para backends remotos que no aceptan ``parameter_binds``: los puntos se
+    ligan localmente y todos los de una llamada viajan en el mismo job.
+    """
+
+    def __init__(self, ansatz, hamiltonian, executor, shots=20000, callback=None,
+                 telemetry=None, mitigation=None):
+        self.hamiltonian = DiagonalHamiltonian(hamiltonian)
+        self.parameters = list(ansatz.parameters)
+        self.executor = executor
+        self.shots = shots
+        self.callback = callback
+        self.telemetry = telemetry
+        self.mitigation = mitigation
+
+        self.circuit = ansatz.copy()
+        self.circuit.measure_all()
+
+        self.num_jobs = 0
+        self.num_evaluations = 0
+        self.total_shots = 0
+        self.history = []
+        self._timings = {}
+
+    def _counts(self, points):
+        # La transpilación ocurre en el proveedor y queda dentro de 'simulate'
+        self._timings = {}
+        start = time.perf_counter()
+        with stage('bind'):
+            circuits = [self.circuit.assign_parameters(dict(zip(self.parameters, point)))
+                        for point in points]
+        self._time('bind', start)
+        start = time.perf_counter()
+        jobs_before = self.executor.num_jobs
+        with stage('simulate'):
+            counts_list = [future.result()
+                           for future in self.executor.map(circuits, self.shots)]
+        self._time('simulate', start)
+        self.num_jobs += self.executor.num_jobs - jobs_before
+        self.num_evaluations += len(points)
+        self.total_shots += self.shots * len(points)
+        return self._mitigate(counts_list)
+
+
+def measure_throughput(provider, circuits, shots, **executor_options):
+    """Ejecuta ``circuits`` con un ``AsyncExecutor`` y devuelve circuitos por segundo."""
+    start = time.perf_counter()
+    with AsyncExecutor(provider, **executor_options) as executor:
+        futures = executor.map(circuits, shots)
+        for future in futures:
+            future.result()
+    elapsed = time.perf_counter() - start
+    return {
+        'circuits': len(circuits),
+        'jobs': executor.num_jobs,
+        'seconds': elapsed,
+        'circuits_per_second': len(circuits) / elapsed,
+    }
+
+
+if __name__ == '__main__':
+    import numpy as np
+    from qiskit import Aer
+
+    from ansatz import constraint_ansatz
+    from restrictions import create_hamiltonian
+
+    queue_delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+    num_circuits = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+    H = create_hamiltonian(100, 2, 2, 2)
+    ansatz, _ = constraint_ansatz(H)
+    ansatz.measure_all()
+    rng = np.random.default_rng(12345)
+    circuits = [ansatz.assign_parameters(rng.uniform(-np.pi, np.pi, ansatz.num_parameters))
+                for _ in range(num_circuits)]
+
+    provider = FakeLatencyProvider(Aer.get_backend('qasm_simulator'), queue_delay=queue_delay)
+    configurations = {
+        'un circuito por job, secuencial': {'max_circuits_per_job': 1, 'max_jobs_in_flight': 1},
+        'un circuito por job, 4 en curso': {'max_circuits_per_job': 1, 'max_jobs_in_flight': 4},
+        'lotes de 10, 4 en curso': {'max_circuits_per_job': 10, 'max_jobs_in_flight': 4},
+        'lotes de 100, 1 en curso': {'max_circuits_per_job': 100, 'max_jobs_in_flight': 1},
+    }
+    print(f'Latencia de cola: {queue_delay} s, {num_circuits} circuitos')
+    for name, options in configurations.items():
+        stats = measure_throughput(provider, circuits, 1000, **options)
+        print(f"{name:<35}{stats['jobs']:>5} jobs {stats['seconds']:>8.2f} s "
+              f"{stats['circuits_per_second']:>8.1f} circuitos/s")
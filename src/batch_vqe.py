@@ -0,0 +1,374 @@
+"""
+VQE por lotes: varios sudokus pequeños en una misma ejecución de Aer.
+
+Cada sudoku tiene su Hamiltoniano reducido (``ClueHamiltonian.reduce``: la
+geometría se construye una vez y las pistas fijan sus qubits), su ansatz y sus
+parámetros. Un único bucle SPSA avanza todos los sudokus a la vez: en cada
+iteración se evalúan los dos puntos perturbados de cada sudoku activo en un
+solo job, y cada uno actualiza sus parámetros con su propio gradiente. Un
+sudoku sale del lote en cuanto aparece un tablero válido (energía 0) con
+probabilidad de al menos ``EARLY_STOP_THRESHOLD``.
+
+Dos formas de ejecutar el lote:
+
+- ``experiments``: un circuito por sudoku, todos en el mismo job con sus
+  ``parameter_binds``; solo se simulan los sudokus activos.
+- ``packed``: circuitos anchos de hasta ``PACKED_QUBITS`` qubits con varios
+  ansatz en qubits disjuntos; cada shot muestrea todos los sudokus del
+  circuito y los conteos de cada uno se obtienen marginalizando. Un sudoku con
+  más de ``MAX_STATEVECTOR_QUBITS`` qubits se simula con un ``AerSimulator`` de
+  método ``matrix_product_state``. El costo de simular crece con el ancho del
+  circuito, así que con pocos qubits por sudoku ``experiments`` suele ser más
+  rápido.
+"""
+import itertools
+import sys
+import time
+
+import numpy as np
+from qiskit import Aer, QuantumCircuit, transpile
+from qiskit.circuit import ParameterVector
+from qiskit.result import marginal_distribution
+from qiskit_aer import AerSimulator
+
+from ansatz import constraint_ansatz
+from clue_hamiltonian import ClueHamiltonian
+from energy import DiagonalHamiltonian
+from profiling import stage
+from sudoku_board import is_valid_board
+
+ALPHA = 100
+ENCODING = 'binary'
+ANSATZ_LAYERS = 2
+SHOTS = 2000
+MAXITER = 100
+MODE = 'experiments'
+MODES = ('experiments', 'packed')
+# Probabilidad mínima de un tablero válido para sacar un sudoku del lote
+EARLY_STOP_THRESHOLD = 0.05
+# Qubits por circuito ancho en el modo 'packed'; por encima de
+# MAX_STATEVECTOR_QUBITS se simula con matrix_product_state
+PACKED_QUBITS = 16
+MAX_STATEVECTOR_QUBITS = 24
+# Ganancias de SPSA, con los valores por defecto de qiskit.algorithms.optimizers.SPSA
+SPSA_ALPHA = 0.602
+SPSA_GAMMA = 0.101
+PERTURBATION = 0.2
+TARGET_MAGNITUDE = 2 * np.pi / 10
+CALIBRATION_STEPS = 10
+
+
+class BatchEntry:
+    """Estado de un sudoku del lote."""
+
+    def __init__(self, puzzle, reduced, layers, rng):
+        self.puzzle = puzzle
+        self.reduced = reduced
+        self.hamiltonian = DiagonalHamiltonian(reduced.operator)
+        self.ansatz, self.parameters = constraint_ansatz(reduced.operator, layers=layers)
+        self.theta = rng.uniform(-np.pi, np.pi, len(self.parameters))
+        self.learning_rate = None
+        self.solution = None
+        self.iterations = 0
+
+    @property
+    def num_qubits(self):
+        return self.reduced.num_qubits
+
+    def energy(self, counts):
+        return self.hamiltonian.expectation(counts)[0]
+
+    def valid_probability(self, counts):
+        """(bitstring válido más frecuente, su probabilidad); los válidos tienen energía 0."""
+        bitstrings = list(counts)
+        energies = self.hamiltonian.bitstring_energies(bitstrings)
+        valid = [(counts[b], b) for b, e in zip(bitstrings, energies) if abs(e) < 1e-6]
+        if not valid:
+            return None, 0.0
+        frequency, bitstring = max(valid)
+        return bitstring, frequency / sum(counts.values())
+
+
+class ExperimentsExecutor:
+    """Un circuito transpilado por sudoku; cada llamada envía los activos en un solo job."""
+
+    def __init__(self, entries, backend, shots, seed=None):
+        self.entries = entries
+        self.backend = backend
+        self.shots = shots
+        self.seed = seed
+        with stage('transpile'):
+            circuits = []
+            for entry in entries:
+                circuit = entry.ansatz.copy()
+                circuit.measure_all()
+                circuits.append(circuit)
+            self.circuits = transpile(circuits, backend)
+        self.num_jobs = 0
+        self.num_experiments = 0
+
+    def run(self, points):
+        """``points``: {índice: arreglo (k, parámetros)} -> {índice: lista de k conteos}."""
+        indices = sorted(points)
+        binds = [{param: points[i][:, j].tolist()
+                  for j, param in enumerate(self.entries[i].parameters)}
+                 for i in indices]
+        options = {'shots': self.shots, 'parameter_binds': binds}
+        if self.seed is not None:
+            options['seed_simulator'] = self.seed
+        with stage('simulate'):
+            result = self.backend.run([self.circuits[i] for i in indices], **options).result()
+        self.num_jobs += 1
+
+        counts, experiment = {}, 0
+        for i in indices:
+            counts[i] = [result.get_counts(experiment + k) for k in range(len(points[i]))]
+            experiment += len(points[i])
+        self.num_experiments += experiment
+        return counts
+
+
+class PackedExecutor:
+    """
+    Los ansatz en qubits disjuntos de circuitos anchos.
+
+    Los sudokus se agrupan en circuitos de hasta el máximo de qubits del
+    backend y todos los grupos viajan en el mismo job.
+    """
+
+    def __init__(self, entries, backend, shots, seed=None):
+        self.entries = entries
+        self.shots = shots
+        self.seed = seed
+        limit = max(PACKED_QUBITS, max(entry.num_qubits for entry in entries))
+        if limit > MAX_STATEVECTOR_QUBITS:
+            backend = AerSimulator(method='matrix_product_state')
+        self.backend = backend
+        limit = min(limit, backend.configuration().n_qubits)
+
+        # Grupos de sudokus consecutivos que caben en un circuito
+        self.groups, width = [[]], 0
+        for i, entry in enumerate(entries):
+            if entry.num_qubits > limit:
+                raise ValueError(f'El sudoku {i} necesita {entry.num_qubits} qubits; '
+                                 f'el backend admite {limit}')
+            if width + entry.num_qubits > limit:
+                self.groups.append([])
+                width = 0
+            self.groups[-1].append(i)
+            width += entry.num_qubits
+
+        self.qubits, self.parameters = {}, {}
+        with stage('transpile'):
+            circuits = []
+            for group in self.groups:
+                circuit = QuantumCircuit(sum(entries[i].num_qubits for i in group))
+                offset = 0
+                for i in group:
+                    entry = entries[i]
+                    self.qubits[i] = list(range(offset, offset + entry.num_qubits))
+                    offset += entry.num_qubits
+                    # Nombres de parámetro distintos por sudoku: todos los ansatz usan 'θ'
+                    renamed = ParameterVector(f'θ{i}', len(entry.parameters))
+                    circuit.compose(entry.ansatz.assign_parameters(
+                        dict(zip(entry.parameters, renamed))), qubits=self.qubits[i],
+                        inplace=True)
+                    self.parameters[i] = list(renamed)
+                circuit.measure_all()
+                circuits.append(circuit)
+            self.circuits = transpile(circuits, backend)
+        self.num_jobs = 0
+        self.num_experiments = 0
+
+    def run(self, points):
+        # Solo se envían los grupos con algún sudoku activo; los que ya salieron
+        # del lote se ligan a sus parámetros actuales
+        k = len(next(iter(points.values())))
+        groups = [g for g, group in enumerate(self.groups) if any(i in points for i in group)]
+        binds = []
+        for g in groups:
+            bind = {}
+            for i in self.groups[g]:
+                values = points[i] if i in points else np.tile(self.entries[i].theta, (k, 1))
+                bind.update({param: values[:, j].tolist()
+                             for j, param in enumerate(self.parameters[i])})
+            binds.append(bind)
+        options = {'shots': self.shots, 'parameter_binds': binds}
+        if self.seed is not None:
+            options['seed_simulator'] = self.seed
+        with stage('simulate'):
+            result = self.backend.run([self.circuits[g] for g in groups], **options).result()
+        self.num_jobs += 1
+        self.num_experiments += k * len(groups)
+
+        counts = {}
+        with stage('marginalize'):
+            for position, g in enumerate(groups):
+                joint = [result.get_counts(position * k + e) for e in range(k)]
+                for i in self.groups[g]:
+                    if i in points:
+                        counts[i] = [marginal_distribution(c, self.qubits[i]) for c in joint]
+        return counts
+
+
+EXECUTORS = {'experiments': ExperimentsExecutor, 'packed': PackedExecutor}
+
+
+def _calibrate(entries, executor, rng, steps=CALIBRATION_STEPS):
+    """Tasa de aprendizaje de cada sudoku como en ``SPSA.calibrate``, en un solo job."""
+    c = PERTURBATION
+    deltas = {i: rng.choice([-1, 1], size=(steps, len(entry.theta)))
+              for i, entry in enumerate(entries)}
+    points = {i: np.concatenate([entry.theta + c * deltas[i], entry.theta - c * deltas[i]])
+              for i, entry in enumerate(entries)}
+    counts = executor.run(points)
+    for i, entry in enumerate(entries):
+        energies = np.array([entry.energy(result) for result in counts[i]])
+        magnitude = np.mean(np.abs(energies[:steps] - energies[steps:]) / (2 * c))
+        entry.learning_rate = TARGET_MAGNITUDE / max(magnitude, 1e-12)
+
+
+def _check_solution(entry, counts_list, iteration):
+    for counts in counts_list:
+        bitstring, probability = entry.valid_probability(counts)
+        if bitstring is not None and probability >= EARLY_STOP_THRESHOLD:
+            entry.solution = {'bitstring': bitstring, 'probability': probability,
+                              'iteration': iteration}
+            return True
+    return False
+
+
+def solve_batch(puzzles, mode=MODE, encoding=ENCODING, layers=ANSATZ_LAYERS, shots=SHOTS,
+                maxiter=MAXITER, backend=None, seed=None):
+    """
+    Resuelve ``puzzles`` (todos de la misma forma, 0 en las celdas vacías) en un lote.
+
+    Devuelve (resultados por sudoku, estadísticas del lote). Cada resultado
+    tiene el tablero decodificado (dígitos 1..n, None en celdas inválidas), si
+    es válido, la probabilidad del bitstring elegido y la iteración en que se
+    encontró; las estadísticas incluyen jobs, experimentos y sudokus por minuto.
+    """
+    if mode not in EXECUTORS:
+        raise ValueError(f'Modo desconocido: {mode}. Opciones: {MODES}')
+    start = time.perf_counter()
+    rows, cols = len(puzzles[0]), len(puzzles[0][0])
+    rng = np.random.default_rng(seed)
+    if backend is None:
+        backend = Aer.get_backend('qasm_simulator')
+
+    with stage('create_hamiltonian'):
+        clue_hamiltonian = ClueHamiltonian(rows, cols, alpha=ALPHA, encoding=encoding)
+        reduced = [clue_hamiltonian.reduce(puzzle) for puzzle in puzzles]
+    with stage('ansatz'):
+        entries = [BatchEntry(puzzle, r, layers, rng) for puzzle, r in zip(puzzles, reduced)]
+    executor = EXECUTORS[mode](entries, backend, shots, seed)
+
+    with stage('optimize'):
+        _calibrate(entries, executor, rng)
+        active = set(range(len(entries)))
+        for k in range(maxiter):
+            if not active:
+                break
+            c_k = PERTURBATION / (k + 1) ** SPSA_GAMMA
+            deltas = {i: rng.choice([-1, 1], size=len(entries[i].theta)) for i in active}
+            points = {i: np.stack([entries[i].theta + c_k * deltas[i],
+                                   entries[i].theta - c_k * deltas[i]])
+                      for i in active}
+            counts = executor.run(points)
+            for i in sorted(active):
+                entry = entries[i]
+                entry.iterations = k + 1
+                if _check_solution(entry, counts[i], k + 1):
+                    active.discard(i)
+                    continue
+                plus, minus = (entry.energy(result) for result in counts[i])
+                gradient = (plus - minus) / (2 * c_k) * deltas[i]
+                entry.theta = entry.theta - entry.learning_rate / (k + 1) ** SPSA_ALPHA * gradient
+
+    # Los que no salieron antes se miden en sus parámetros finales
+    if active:
+        with stage('measure'):
+            counts = executor.run({i: entries[i].theta[None, :] for i in active})
+        for i in active:
+            entry = entries[i]
+            bitstring, probability = entry.valid_probability(counts[i][0])
+            if bitstring is None:
+                bitstring = max(counts[i][0], key=counts[i][0].get)
+                probability = counts[i][0][bitstring] / shots
+            entry.solution = {'bitstring': bitstring, 'probability': probability,
+                              'iteration': None}
+
+    results = []
+    with stage('decode'):
+        for entry in entries:
+            board = entry.reduced.decode(entry.solution['bitstring'])
+            valid = all(value is not None for row in board for value in row) \
+                and is_valid_board(board)
+            results.append({'board': board, 'valid': valid,
+                            'probability': entry.solution['probability'],
+                            'found_at': entry.solution['iteration'],
+                            'iterations': entry.iterations, 'qubits': entry.num_qubits})
+
+    elapsed = time.perf_counter() - start
+    stats = {'mode': mode, 'puzzles': len(puzzles), 'solved': sum(r['valid'] for r in results),
+             'jobs': executor.num_jobs, 'experiments': executor.num_experiments,
+             'seconds': elapsed, 'puzzles_per_minute': 60 * len(puzzles) / elapsed}
+    return results, stats
+
+
+def random_puzzles(rows, cols, clues, count, seed=None):
+    """
+    Sudokus de rows x cols con ``clues`` pistas y solución válida.
+
+    Los tableros cuadrados de lado cuadrado perfecto usan ``generate_sudoku``;
+    los demás (p. ej. 2x4) son rectángulos latinos con los dígitos 1..max(rows, cols).
+    """
+    from sudoku_generator import generate_sudoku, is_perfect_square
+
+    rng = np.random.default_rng(seed)
+    digits = max(rows, cols)
+    puzzles = []
+    while len(puzzles) < count:
+        if rows == cols and rows > 1 and is_perfect_square(rows):
+            puzzles.append(generate_sudoku(rows, rows * cols - clues))
+            continue
+        board = np.array([rng.permutation(digits)[:cols] + 1 for _ in range(rows)])
+        if not is_valid_board(board.tolist()):
+            continue
+        hidden = rng.choice(rows * cols, size=rows * cols - clues, replace=False)
+        board.ravel()[hidden] = 0
+        puzzles.append(board.tolist())
+    return puzzles
+
+
+def solve_sequential(puzzles, **options):
+    """Un lote por sudoku, como N ejecuciones independientes; para comparar el rendimiento."""
+    start = time.perf_counter()
+    results = list(itertools.chain.from_iterable(
+        solve_batch([puzzle], **options)[0] for puzzle in puzzles))
+    elapsed = time.perf_counter() - start
+    stats = {'mode': 'sequential', 'puzzles': len(puzzles),
+             'solved': sum(r['valid'] for r in results), 'seconds': elapsed,
+             'puzzles_per_minute': 60 * len(puzzles) / elapsed}
+    return results, stats
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    count = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    clues = int(sys.argv[4]) if len(sys.argv) > 4 else (rows * cols) // 2
+
+    puzzles = random_puzzles(rows, cols, clues, count, seed=1)
+    # Una ejecución descartada para no medir la importación ni el arranque de Aer
+    solve_batch(puzzles[:1], maxiter=1, seed=0)
+
+    runs = [solve_sequential(puzzles, seed=0)]
+    runs += [solve_batch(puzzles, mode=mode, seed=0) for mode in MODES]
+    for results, stats in runs:
+        print(f"{stats['mode']:<12} resueltos {stats['solved']}/{stats['puzzles']} "
+              f"en {stats['seconds']:.2f} s: {stats['puzzles_per_minute']:.1f} sudokus/min"
+              + (f", {stats['jobs']} jobs" if 'jobs' in stats else ''))
+    for puzzle, result in zip(puzzles, runs[-1][0]):
+        print(puzzle, '->', result['board'], 'válido' if result['valid'] else 'inválido',
+              f"(p={result['probability']:.2f}, {result['qubits']} qubits)")
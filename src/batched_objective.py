@@ -0,0 +1,175 @@
+import hashlib
+import time
+
+import numpy as np
+
+from qiskit import transpile
+
+from energy import DiagonalHamiltonian
+from profiling import stage
+from result_cache import backend_settings
+from telemetry import evaluation_events
+
+
+class BatchedObjective:
+    """
+    Función objetivo que evalúa muchos vectores de parámetros en un solo job de Aer.
+
+    El ansatz se transpila una única vez y cada llamada envía todos los puntos
+    como ``parameter_binds`` del mismo circuito, de modo que el costo de preparar
+    el job se paga una vez por lote y no una vez por punto. Las energías se
+    calculan a partir de los conteos con el Hamiltoniano diagonal.
+
+    Acepta un vector 1-D (devuelve un float) o una matriz 2-D (devuelve un
+    vector de energías), por lo que se puede pasar directamente a
+    ``SPSA.minimize`` con ``set_max_evals_grouped``.
+
+    Si se da ``callback``, se llama como ``callback(points, counts_list)`` después
+    de cada job, con los conteos de cada punto evaluado. En ``evaluate`` se llama
+    después de registrar la telemetría y ``history``, así que un callback que
+    lanza una excepción (``EarlyStopping``) no deja la evaluación sin registrar.
+
+    Con ``cache`` (un ``ResultCache``) y una semilla, un lote cuyos circuitos
+    ligados ya se ejecutaron juntos, en el mismo orden y con el mismo backend,
+    shots y semilla, no se vuelve a ejecutar; ``num_evaluations`` cuenta
+    únicamente los puntos ejecutados. La llave es el lote entero porque Aer
+    siembra cada experimento según su posición en el job: con una llave por
+    punto, los conteos dependerían de lo que ya estuviera en la caché. Sin
+    semilla no se usa la caché, para que las ejecuciones repetidas sigan siendo
+    independientes.
+
+    ``history`` guarda (media, desviación estándar) de cada punto evaluado. Con
+    ``telemetry`` (un destino de ``telemetry``) se registra además un evento por
+    punto con los tiempos de bind, simulación y posprocesamiento.
+
+    Con ``mitigation`` (una ``ReadoutCalibration`` de ``readout_mitigation``) los
+    conteos se corrigen por errores de lectura antes del callback y de la
+    energía; la caché guarda siempre los conteos sin corregir.
+    """
+
+    def __init__(self, ansatz, hamiltonian, backend, shots=20000, seed=None, callback=None,
+                 cache=None, telemetry=None, mitigation=None):
+        self.hamiltonian = DiagonalHamiltonian(hamiltonian)
+        self.parameters = list(ansatz.parameters)
+        self.backend = backend
+        self.shots = shots
+        self.seed = seed
+        self.callback = callback
+        self.cache = cache
+        self.telemetry = telemetry
+        self.mitigation = mitigation
+
+        start = time.perf_counter()
+        circuit = ansatz.copy()
+        circuit.measure_all()
+        with stage('transpile'):
+            self.circuit = transpile(circuit, backend)
+        if cache is not None and seed is None:
+            self.cache = None
+        if self.cache is not None:
+            self._settings = backend_settings(backend)
+        if telemetry is not None:
+            telemetry.record({'event': 'setup', 'transpile': time.perf_counter() - start,
+                              'num_qubits': self.circuit.num_qubits,
+                              'num_parameters': len(self.parameters)})
+
+        self.num_jobs = 0
+        self.num_evaluations = 0
+        self.total_shots = 0
+        self.history = []
+        self._timings = {}
+
+    def _check_points(self, points):
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        if points.shape[1] != len(self.parameters):
+            raise ValueError(
+                f'Se esperaban {len(self.parameters)} parámetros por punto, '
+                f'se recibieron {points.shape[1]}.')
+        return points
+
+    def _time(self, phase, start):
+        self._timings[phase] = self._timings.get(phase, 0.0) + time.perf_counter() - start
+
+    def _execute(self, points):
+        start = time.perf_counter()
+        with stage('bind'):
+            binds = {param: points[:, i].tolist()
+                     for i, param in enumerate(self.parameters)}
+            run_options = {'shots': self.shots, 'parameter_binds': [binds]}
+            if self.seed is not None:
+                run_options['seed_simulator'] = self.seed
+        self._time('bind', start)
+
+        start = time.perf_counter()
+        with stage('simulate'):
+            result = self.backend.run(self.circuit, **run_options).result()
+            counts_list = [result.get_counts(i) for i in range(len(points))]
+        self._time('simulate', start)
+        self.num_jobs += 1
+        self.num_evaluations += len(points)
+        self.total_shots += self.shots * len(points)
+        return counts_list
+
+    def _execute_cached(self, points):
+        start = time.perf_counter()
+        with stage('bind'):
+            keys = [self.cache.key(self.circuit.assign_parameters(point), self._settings,
+                                   self.shots, self.seed)
+                    for point in points]
+            key = hashlib.sha256(''.join(keys).encode()).hexdigest()
+        self._time('bind', start)
+        counts_list = self.cache.get(key)
+        if counts_list is None:
+            counts_list = self._execute(points)
+            self.cache.put(key, counts_list)
+        return counts_list
+
+    def _mitigate(self, counts_list):
+        if self.mitigation is None:
+            return counts_list
+        start = time.perf_counter()
+        with stage('mitigate'):
+            counts_list = [self.mitigation.correct(counts) for counts in counts_list]
+        self._time('postprocess', start)
+        return counts_list
+
+    def _counts(self, points):
+        self._timings = {}
+        if self.cache is None:
+            counts_list = self._execute(points)
+        else:
+            counts_list = self._execute_cached(points)
+        return self._mitigate(counts_list)
+
+    def run_counts(self, points):
+        """Ejecuta todos los puntos en un solo job y devuelve una lista de conteos."""
+        points = self._check_points(points)
+        counts_list = self._counts(points)
+        if self.callback is not None:
+            self.callback(points, counts_list)
+        return counts_list
+
+    def evaluate(self, points):
+        """Devuelve (medias, desviaciones estándar) de la energía para cada punto."""
+        points = self._check_points(points)
+        counts_list = self._counts(points)
+        start = time.perf_counter()
+        with stage('postprocess'):
+            stats = [self.hamiltonian.expectation(counts) for counts in counts_list]
+        self._time('postprocess', start)
+        if self.telemetry is not None:
+            for event in evaluation_events(points, stats, self._timings, len(self.history),
+                                           self.shots):
+                self.telemetry.record(event)
+        self.history.extend(stats)
+        if self.callback is not None:
+            self.callback(points, counts_list)
+        means, stds = zip(*stats)
+        return np.array(means), np.array(stds)
+
+    def __call__(self, points):
+        points = np.asarray(points, dtype=float)
+        means, _ = self.evaluate(points)
+        if points.ndim == 1:
+            return float(means[0])
+        return means
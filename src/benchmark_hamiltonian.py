@@ -0,0 +1,275 @@
+"""
+Micro-benchmarks de construcción del Hamiltoniano y del BQM.
+
+Mide ``restrictions.create_hamiltonian`` (original y con cada codificación de
+``cell_encodings``), ``convert_to_paulisumop`` y
+``dwave_sudoku_solver.build_bqm`` para tableros vacíos de 4x4, 9x9, 16x16 y
+25x25: tiempo de construcción (mínimo de varias repeticiones), pico de memoria
+de Python (``tracemalloc``, en una ejecución aparte) y número de qubits y
+términos, o de variables e interacciones del BQM.
+
+Cada caso corre en un subproceso con límite de tiempo y de RSS, de modo que un
+caso que no cabe en la máquina se registra como ``timeout`` o ``memory`` en
+lugar de tumbar la suite; los casos mayores de un constructor que ya excedió
+un límite se omiten. Sin dimod, ``build_bqm`` queda como ``skipped``.
+
+Los resultados se comparan con la línea base en ``BASELINE``: es una regresión
+que un caso cambie de estado (uno que terminaba y ahora no termina, y también
+uno que antes excedía un límite y ahora termina, para que la línea base se
+actualice), que el tiempo o el pico de memoria superen la línea base en más de
+su tolerancia, o que crezca el número de términos o variables. La línea base
+depende de la máquina; se regenera con ``--update``. El proceso sale con
+código 1 si hay regresiones o si no hay línea base.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+
+import psutil
+
+SIZES = (4, 9, 16, 25)
+# None es el Hamiltoniano original de restrictions (un qubit por dígito)
+ENCODINGS = (None, 'one_hot', 'binary', 'domain_wall')
+BUILDERS = ('create_hamiltonian', 'convert_to_paulisumop', 'build_bqm')
+# Relativa a la raíz del repositorio, no al directorio de trabajo
+BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'vars', 'hamiltonian_baseline.json')
+ALPHA = 100
+REPEAT = 3
+# Tolerancias relativas; el tiempo admite además TIME_FLOOR segundos de ruido
+TIME_TOLERANCE = 0.5
+TIME_FLOOR = 0.01
+MEMORY_TOLERANCE = 0.2
+CASE_TIMEOUT = 60
+MEMORY_LIMIT = 2 * 2**30
+_COUNTS = ('qubits', 'terms', 'variables', 'interactions')
+
+
+def case_key(builder, size, encoding=None):
+    return f"{builder}/{encoding or 'original'}/{size}x{size}"
+
+
+def cases(builders=BUILDERS, sizes=SIZES, encodings=ENCODINGS):
+    """(constructor, tamaño, codificación); solo ``create_hamiltonian`` varía la codificación."""
+    for builder in builders:
+        for encoding in (encodings if builder == 'create_hamiltonian' else (None,)):
+            for size in sizes:
+                yield builder, size, encoding
+
+
+def _prepare(builder, size, encoding):
+    """Función sin argumentos que construye el objeto medido y función que lo cuenta."""
+    from restrictions import create_hamiltonian
+
+    if builder == 'create_hamiltonian':
+        qubits_per_cell = size if encoding is None else None
+        return (lambda: create_hamiltonian(ALPHA, size, qubits_per_cell, encoding=encoding),
+                lambda H: {'qubits': H.num_qubits, 'terms': len(H)})
+
+    if builder == 'convert_to_paulisumop':
+        from qaoa_local import convert_to_paulisumop
+
+        H = create_hamiltonian(ALPHA, size, size)
+        return (lambda: convert_to_paulisumop(H),
+                lambda op: {'qubits': op.num_qubits, 'terms': len(op)})
+
+    if builder == 'build_bqm':
+        from dwave_sudoku_solver import build_bqm
+
+        matrix = [[0] * size for _ in range(size)]
+        return (lambda: build_bqm(matrix),
+                lambda bqm: {'variables': bqm.num_variables,
+                             'interactions': bqm.num_interactions})
+
+    raise ValueError(f'Constructor desconocido: {builder}. Opciones: {BUILDERS}')
+
+
+def measure(builder, size, encoding=None, repeat=REPEAT):
+    """Mide un caso en el proceso actual."""
+    warnings.simplefilter('ignore', DeprecationWarning)
+    try:
+        build, count = _prepare(builder, size, encoding)
+    except ImportError as error:
+        return {'status': 'skipped', 'reason': str(error)}
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = build()
+        times.append(time.perf_counter() - start)
+        # Un caso lento no se repite: su ruido relativo ya es pequeño
+        if times[0] > 1.0:
+            break
+    counts = count(result)
+    del result
+
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'status': 'ok', 'seconds': min(times), 'peak': peak, **counts}
+
+
+def run_case(builder, size, encoding=None, timeout=CASE_TIMEOUT, memory_limit=MEMORY_LIMIT):
+    """Mide un caso en un subproceso; lo termina si excede ``timeout`` o ``memory_limit``."""
+    command = [sys.executable, os.path.abspath(__file__), '--case', builder, str(size),
+               encoding or 'original']
+    child = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    process = psutil.Process(child.pid)
+    deadline = time.monotonic() + timeout
+    status = None
+    while child.poll() is None:
+        if time.monotonic() > deadline:
+            status = 'timeout'
+        else:
+            try:
+                if process.memory_info().rss > memory_limit:
+                    status = 'memory'
+            except psutil.NoSuchProcess:
+                pass
+        if status is not None:
+            child.kill()
+            child.wait()
+            return {'status': status}
+        time.sleep(0.05)
+
+    stdout, stderr = child.communicate()
+    if child.returncode != 0:
+        lines = stderr.strip().splitlines()
+        return {'status': 'error', 'reason': lines[-1] if lines else f'código {child.returncode}'}
+    return json.loads(stdout.strip().splitlines()[-1])
+
+
+def run_suite(builders=BUILDERS, sizes=SIZES, encodings=ENCODINGS, timeout=CASE_TIMEOUT,
+              memory_limit=MEMORY_LIMIT, verbose=True):
+    results = {}
+    exceeded = set()
+    for builder, size, encoding in cases(builders, sorted(sizes), encodings):
+        key = case_key(builder, size, encoding)
+        if (builder, encoding) in exceeded:
+            # Un tablero mayor no va a caber si uno menor ya no cupo
+            result = {'status': 'skipped', 'reason': 'excedió el límite con un tamaño menor'}
+        else:
+            result = run_case(builder, size, encoding, timeout, memory_limit)
+            if result['status'] in ('timeout', 'memory'):
+                exceeded.add((builder, encoding))
+        results[key] = result
+        if verbose:
+            print(format_result(key, result), flush=True)
+    return results
+
+
+def format_result(key, result):
+    if result['status'] != 'ok':
+        reason = f" ({result['reason']})" if 'reason' in result else ''
+        return f"{key:<40} {result['status']}{reason}"
+    counts = ', '.join(f'{name} {result[name]}' for name in _COUNTS if name in result)
+    return (f"{key:<40} {result['seconds'] * 1000:>10.1f} ms {result['peak'] / 2**20:>9.2f} MB"
+            f"  {counts}")
+
+
+def compare(results, baseline, time_tolerance=TIME_TOLERANCE, memory_tolerance=MEMORY_TOLERANCE):
+    """Lista de regresiones de ``results`` respecto de ``baseline``."""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if result['status'] != reference['status']:
+            if reference['status'] == 'ok':
+                regressions.append(f"{key}: terminaba y ahora da {result['status']}")
+            else:
+                regressions.append(f"{key}: el estado pasó de {reference['status']} a "
+                                   f"{result['status']}; actualice la línea base con --update")
+            continue
+        if result['status'] != 'ok':
+            continue
+        limit = reference['seconds'] * (1 + time_tolerance) + TIME_FLOOR
+        if result['seconds'] > limit:
+            regressions.append(f"{key}: {result['seconds']:.3f} s, línea base "
+                               f"{reference['seconds']:.3f} s (límite {limit:.3f} s)")
+        limit = reference['peak'] * (1 + memory_tolerance)
+        if result['peak'] > limit:
+            regressions.append(f"{key}: pico de {result['peak'] / 2**20:.2f} MB, línea base "
+                               f"{reference['peak'] / 2**20:.2f} MB")
+        for name in _COUNTS:
+            if name in reference and result.get(name, 0) > reference[name]:
+                regressions.append(f"{key}: {name} {result[name]}, línea base {reference[name]}")
+    return regressions
+
+
+def load_baseline(path=BASELINE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE):
+    """Agrega o reemplaza los casos medidos en la línea base."""
+    baseline = load_baseline(path)
+    baseline.update(results)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(baseline.items())), f, indent=2)
+        f.write('\n')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Mide la construcción del Hamiltoniano y del BQM por tamaño de tablero.')
+    parser.add_argument('--builders', nargs='+', choices=BUILDERS, default=list(BUILDERS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=list(SIZES))
+    parser.add_argument('--encodings', nargs='+', default=['original', *ENCODINGS[1:]],
+                        choices=['original', *ENCODINGS[1:]])
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='línea base JSON (por defecto: %(default)s)')
+    parser.add_argument('--update', action='store_true',
+                        help='guarda los resultados como línea base en lugar de compararlos')
+    parser.add_argument('--time-tolerance', type=float, default=TIME_TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument('--timeout', type=float, default=CASE_TIMEOUT,
+                        help='segundos por caso (por defecto: %(default)s)')
+    parser.add_argument('--memory-limit', type=float, default=MEMORY_LIMIT / 2**30,
+                        help='GiB de RSS por caso (por defecto: %(default)s)')
+    parser.add_argument('--case', nargs=3, metavar=('BUILDER', 'SIZE', 'ENCODING'),
+                        help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.case is not None:
+        builder, size, encoding = args.case
+        result = measure(builder, int(size), None if encoding == 'original' else encoding)
+        print(json.dumps(result))
+        return 0
+
+    encodings = [None if name == 'original' else name for name in args.encodings]
+    results = run_suite(args.builders, args.sizes, encodings, args.timeout,
+                        args.memory_limit * 2**30)
+    if args.update:
+        save_baseline(results, args.baseline)
+        print(f'Línea base guardada en {args.baseline}')
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if not baseline:
+        print(f'No hay línea base en {args.baseline}; use --update para crearla')
+        return 1
+    regressions = compare(results, baseline, args.time_tolerance, args.memory_tolerance)
+    for regression in regressions:
+        print(f'REGRESIÓN {regression}')
+    print(f'{len(regressions)} regresiones en {len(results)} casos')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
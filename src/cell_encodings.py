@@ -0,0 +1,185 @@
+"""
+Codificaciones de una celda de sudoku en qubits para el constructor de Hamiltonianos.
+
+Cada codificación define cuántos qubits usa una celda con ``digits`` valores
+posibles, el proyector diagonal "la celda vale d" como polinomio en Z, la
+penalización de los estados que no son palabras de código válidas y cómo
+codificar un dígito y decodificar los bits medidos. Las posiciones de qubit son posiciones en la
+etiqueta de Pauli (y en el bitstring medido), igual que en ``restrictions``.
+
+- one_hot: un qubit por dígito, exactamente uno encendido. Términos de a lo
+  sumo 2 qubits, pero ``digits`` qubits por celda.
+- binary: ceil(log2(digits)) qubits; el proyector de un valor es un producto
+  de ``q`` factores, por lo que aparecen términos de orden alto.
+- domain_wall: digits - 1 qubits en cadena 1...10...0; el valor es la
+  posición de la pared. Términos de a lo sumo 2 qubits en la celda y 4 entre
+  celdas.
+"""
+import math
+import sys
+
+from qiskit.quantum_info import SparsePauliOp
+
+
+def _constant(value, total_qubits):
+    return SparsePauliOp.from_sparse_list([('', [], value)], total_qubits)
+
+
+def _bit(position, value, total_qubits):
+    """Proyector diagonal sobre el valor ``value`` (0 o 1) del qubit en ``position``."""
+    sign = 0.5 if value == 0 else -0.5
+    return SparsePauliOp.from_sparse_list(
+        [('', [], 0.5), ('Z', [total_qubits - 1 - position], sign)], total_qubits)
+
+
+def _product(factors, total_qubits):
+    result = _constant(1.0, total_qubits)
+    for factor in factors:
+        result = result.compose(factor).simplify()
+    return result
+
+
+class OneHotEncoding:
+    name = 'one_hot'
+
+    def qubits(self, digits):
+        return digits
+
+    def indicator(self, positions, digit, total_qubits):
+        return _bit(positions[digit], 1, total_qubits)
+
+    def penalty(self, positions, digits, total_qubits):
+        # (sum x - 1)^2: cero solo si hay exactamente un qubit encendido
+        count = sum(_bit(p, 1, total_qubits) for p in positions)
+        shifted = count - _constant(1.0, total_qubits)
+        return shifted.compose(shifted).simplify()
+
+    def encode(self, digit, digits):
+        return [int(k == digit) for k in range(digits)]
+
+    def decode(self, bits, digits):
+        if sum(bits) != 1:
+            return None
+        return bits.index(1)
+
+
+class BinaryEncoding:
+    name = 'binary'
+
+    def qubits(self, digits):
+        return max(1, math.ceil(math.log2(digits)))
+
+    def indicator(self, positions, digit, total_qubits):
+        # Bit más significativo primero, como en decode_board
+        q = len(positions)
+        values = [(digit >> (q - 1 - k)) & 1 for k in range(q)]
+        return _product([_bit(p, v, total_qubits) for p, v in zip(positions, values)],
+                        total_qubits)
+
+    def penalty(self, positions, digits, total_qubits):
+        # Penalizar los códigos que no corresponden a ningún dígito
+        unused = [self.indicator(positions, code, total_qubits)
+                  for code in range(digits, 2 ** len(positions))]
+        return sum(unused, _constant(0.0, total_qubits)).simplify()
+
+    def encode(self, digit, digits):
+        q = self.qubits(digits)
+        return [(digit >> (q - 1 - k)) & 1 for k in range(q)]
+
+    def decode(self, bits, digits):
+        digit = int(''.join(str(b) for b in bits), 2)
+        return digit if digit < digits else None
+
+
+class DomainWallEncoding:
+    name = 'domain_wall'
+
+    def qubits(self, digits):
+        return digits - 1
+
+    def indicator(self, positions, digit, total_qubits):
+        # Valor d: x_k = 1 para k < d y 0 para k >= d, con x_{-1} = 1 y x_{D-1} = 0
+        factors = []
+        if digit > 0:
+            factors.append(_bit(positions[digit - 1], 1, total_qubits))
+        if digit < len(positions):
+            factors.append(_bit(positions[digit], 0, total_qubits))
+        return _product(factors, total_qubits)
+
+    def penalty(self, positions, digits, total_qubits):
+        # Penalizar cada 0 seguido de un 1 (más de una pared)
+        terms = [_bit(positions[k], 0, total_qubits).compose(
+            _bit(positions[k + 1], 1, total_qubits))
+            for k in range(len(positions) - 1)]
+        return sum(terms, _constant(0.0, total_qubits)).simplify()
+
+    def encode(self, digit, digits):
+        return [int(k < digit) for k in range(digits - 1)]
+
+    def decode(self, bits, digits):
+        digit = 0
+        while digit < len(bits) and bits[digit] == 1:
+            digit += 1
+        if any(bits[digit:]):
+            return None
+        return digit
+
+
+ENCODINGS = {
+    encoding.name: encoding
+    for encoding in (OneHotEncoding(), BinaryEncoding(), DomainWallEncoding())
+}
+
+
+def get_encoding(name):
+    try:
+        return ENCODINGS[name]
+    except KeyError:
+        raise ValueError(
+            f'Codificación desconocida: {name}. Opciones: {sorted(ENCODINGS)}') from None
+
+
+def decode_encoded_board(bitstring, rows, cols, encoding, digits):
+    """
+    Decodifica un bitstring con la convención de ``sudoku_board.decode_board``
+    (valores desde 0); las celdas con palabras de código inválidas quedan en None.
+    """
+    encoding = get_encoding(encoding)
+    qubits = encoding.qubits(digits)
+    bits = [int(b) for b in bitstring.replace(' ', '')]
+    board = []
+    for i in range(rows):
+        row = []
+        for j in range(cols):
+            idx = i * cols + j
+            row.append(encoding.decode(bits[idx * qubits:(idx + 1) * qubits], digits))
+        board.append(row)
+    return board
+
+
+def encoding_report(rows, cols=None, digits=None, alpha=1):
+    """Qubits y términos del Hamiltoniano de cada codificación para un tablero."""
+    from restrictions import create_hamiltonian, operator_stats
+
+    if cols is None:
+        cols = rows
+    if digits is None:
+        digits = max(rows, cols)
+
+    report = []
+    for name in ENCODINGS:
+        H = create_hamiltonian(alpha, rows, None, cols, encoding=name, digits=digits)
+        stats = operator_stats(H)
+        report.append({'encoding': name, 'qubits': stats['qubits'], 'terms': stats['terms'],
+                       'max_locality': stats['max_locality']})
+    return report
+
+
+if __name__ == '__main__':
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else rows
+
+    print(f"{'codificación':<14}{'qubits':>8}{'términos':>10}{'localidad máx.':>16}")
+    for entry in encoding_report(rows, cols):
+        print(f"{entry['encoding']:<14}{entry['qubits']:>8}{entry['terms']:>10}"
+              f"{entry['max_locality']:>16}")
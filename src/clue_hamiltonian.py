@@ -0,0 +1,195 @@
+"""
+Hamiltoniano de geometría fija con las pistas de cada sudoku como delta.
+
+Para una serie de sudokus del mismo tamaño, las restricciones de celda, fila,
+columna y subgrilla no cambian: ``ClueHamiltonian`` construye ese operador base
+una sola vez (con una codificación de ``cell_encodings``) y, por sudoku, solo
+agrega las pistas, de dos maneras:
+
+- ``hamiltonian(puzzle)``: base + alpha * sum (1 - P_{celda, pista}), en el
+  espacio completo de qubits. Los proyectores de cada (celda, dígito) se
+  construyen una vez y se reutilizan.
+- ``reduce(puzzle)``: fija los qubits de las celdas con pista a la palabra de
+  código de su dígito. Cada término Z...Z del operador base se multiplica por
+  los espines fijos que contiene y se restringe a los qubits libres, todo con
+  operaciones de NumPy sobre la matriz de Paulis ya construida; no se vuelve a
+  armar ni a convertir el ``SparsePauliOp`` término a término.
+
+Los dígitos del sudoku van de 1 a n (0 es una celda vacía) y los de la
+codificación de 0 a n-1.
+"""
+import sys
+import time
+
+import numpy as np
+from qiskit.quantum_info import PauliList, SparsePauliOp
+
+from cell_encodings import get_encoding
+from restrictions import encoded_hamiltonian
+
+ALPHA = 100
+ENCODING = 'one_hot'
+
+
+class ReducedHamiltonian:
+    """Operador sobre los qubits libres de un sudoku y lo necesario para volver al tablero."""
+
+    def __init__(self, operator, free_positions, fixed_bits, rows, cols, encoding, digits):
+        self.operator = operator
+        self.free_positions = free_positions
+        self.fixed_bits = fixed_bits
+        self.rows = rows
+        self.cols = cols
+        self.encoding = encoding
+        self.digits = digits
+
+    @property
+    def num_qubits(self):
+        return len(self.free_positions)
+
+    def expand(self, bitstring):
+        """Bitstring del operador reducido -> bitstring del tablero completo."""
+        bits = self.fixed_bits.copy()
+        bits[self.free_positions] = np.frombuffer(
+            bitstring.replace(' ', '').encode(), dtype=np.uint8) - ord('0')
+        return ''.join(map(str, bits))
+
+    def decode(self, bitstring):
+        """Tablero con dígitos 1..n; las celdas con una palabra de código inválida quedan en None."""
+        from cell_encodings import decode_encoded_board
+
+        board = decode_encoded_board(self.expand(bitstring), self.rows, self.cols,
+                                     self.encoding.name, self.digits)
+        return [[None if value is None else value + 1 for value in row] for row in board]
+
+
+class ClueHamiltonian:
+    def __init__(self, rows, cols=None, alpha=ALPHA, encoding=ENCODING, digits=None):
+        self.rows = rows
+        self.cols = rows if cols is None else cols
+        self.digits = digits or max(self.rows, self.cols)
+        self.alpha = alpha
+        self.encoding = get_encoding(encoding)
+        self.qubits_per_cell = self.encoding.qubits(self.digits)
+        self.num_qubits = self.rows * self.cols * self.qubits_per_cell
+
+        self.base = encoded_hamiltonian(alpha, self.rows, self.cols, self.encoding.name,
+                                        self.digits)
+        # Fila p = posición p de la etiqueta (y del bitstring), no qubit p; transpuesta y
+        # contigua para que seleccionar posiciones copie filas enteras
+        self._z = np.ascontiguousarray(self.base.paulis.z[:, ::-1].T)
+        self._coeffs = np.real(self.base.coeffs * (-1j) ** self.base.paulis.phase)
+        self._codewords = np.array([self.encoding.encode(digit, self.digits)
+                                    for digit in range(self.digits)], dtype=np.uint8)
+        self._indicators = {}
+
+    def _positions(self, cell):
+        return list(range(cell * self.qubits_per_cell, (cell + 1) * self.qubits_per_cell))
+
+    def _clues(self, puzzle):
+        """(celdas, dígitos de la codificación) de las pistas, validando el tablero."""
+        values = np.asarray(puzzle)
+        if values.shape != (self.rows, self.cols):
+            raise ValueError(f'Se esperaba un tablero de {self.rows}x{self.cols}, '
+                             f'se recibió uno de forma {values.shape}')
+        if values.min() < 0 or values.max() > self.digits:
+            raise ValueError(f'Los valores deben estar entre 0 y {self.digits}')
+        cells = np.flatnonzero(values)
+        return cells, values.ravel()[cells] - 1
+
+    def _indicator(self, cell, digit):
+        key = (cell, digit)
+        if key not in self._indicators:
+            self._indicators[key] = self.encoding.indicator(
+                self._positions(cell), digit, self.num_qubits)
+        return self._indicators[key]
+
+    def clue_delta(self, puzzle):
+        """alpha * sum (1 - P) sobre las pistas: cero solo si cada celda con pista vale su pista."""
+        cells, digits = self._clues(puzzle)
+        if len(cells) == 0:
+            return SparsePauliOp('I' * self.num_qubits, 0.0)
+        projectors = SparsePauliOp.sum([self._indicator(int(cell), int(digit))
+                                        for cell, digit in zip(cells, digits)])
+        identity = SparsePauliOp('I' * self.num_qubits, float(len(cells)))
+        return (self.alpha * (identity - projectors)).simplify()
+
+    def hamiltonian(self, puzzle):
+        """Operador completo del sudoku: base + delta de las pistas."""
+        return (self.base + self.clue_delta(puzzle)).simplify()
+
+    def reduce(self, puzzle, atol=1e-10):
+        """``ReducedHamiltonian`` con los qubits de las celdas con pista fijados."""
+        cells, digits = self._clues(puzzle)
+        q = self.qubits_per_cell
+        fixed_positions = (cells[:, None] * q + np.arange(q)).ravel()
+        fixed_bits = np.zeros(self.num_qubits, dtype=np.uint8)
+        fixed_bits[fixed_positions] = self._codewords[digits].ravel()
+        free = np.ones(self.num_qubits, dtype=bool)
+        free[fixed_positions] = False
+        free_positions = np.flatnonzero(free)
+
+        # Z_p con el bit p fijo vale 1 - 2 b_p: solo los bits en 1 cambian el signo
+        ones = fixed_positions[fixed_bits[fixed_positions] == 1]
+        flips = np.count_nonzero(self._z[ones], axis=0) % 2
+        coeffs = self._coeffs * (1 - 2 * flips)
+
+        # Los términos que coinciden en los qubits libres se suman: se ordenan
+        # por sus bits empaquetados en palabras de 64 bits (más rápido que np.unique(axis=0))
+        z = np.ascontiguousarray(self._z[free_positions].T)
+        m = len(free_positions)
+        packed = np.packbits(z, axis=1)
+        padded = np.zeros((len(z), -(-packed.shape[1] // 8) * 8), dtype=np.uint8)
+        padded[:, :packed.shape[1]] = packed
+        words = padded.view(np.uint64)
+        if m:
+            order = np.lexsort(words.T[::-1])
+        else:
+            # Sin qubits libres todos los términos son la misma constante
+            order = np.arange(len(words))
+        words = words[order]
+        starts = np.ones(len(words), dtype=bool)
+        starts[1:] = np.any(words[1:] != words[:-1], axis=1)
+        coeffs = np.bincount(np.cumsum(starts) - 1, weights=coeffs[order])
+        keep = np.abs(coeffs) > atol
+        z = z[order[starts][keep], ::-1]
+        if not keep.any() or m == 0:
+            operator = SparsePauliOp('I' * max(m, 1), coeffs[keep].sum())
+        else:
+            operator = SparsePauliOp(PauliList.from_symplectic(z, np.zeros_like(z)),
+                                     coeffs[keep])
+        return ReducedHamiltonian(operator, free_positions, fixed_bits, self.rows, self.cols,
+                                  self.encoding, self.digits)
+
+
+if __name__ == '__main__':
+    from energy import DiagonalHamiltonian
+    from sudoku_generator import generate_sudoku
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    encoding = sys.argv[3] if len(sys.argv) > 3 else ENCODING
+
+    start = time.perf_counter()
+    clue_hamiltonian = ClueHamiltonian(n, encoding=encoding)
+    print(f'Base {n}x{n} ({encoding}): {clue_hamiltonian.num_qubits} qubits, '
+          f'{len(clue_hamiltonian.base)} términos en {time.perf_counter() - start:.3f} s')
+
+    puzzles = [generate_sudoku(n, n * n // 2) for _ in range(count)]
+    for name, build in (('completo', clue_hamiltonian.hamiltonian),
+                        ('reducido', clue_hamiltonian.reduce)):
+        start = time.perf_counter()
+        operators = [build(puzzle) for puzzle in puzzles]
+        elapsed = (time.perf_counter() - start) / count
+        print(f'{name}: {elapsed * 1000:.2f} ms por sudoku')
+
+    # El operador reducido coincide con el completo en los estados que respetan las pistas
+    rng = np.random.default_rng(0)
+    puzzle, reduced = puzzles[0], operators[0]
+    full = DiagonalHamiltonian(clue_hamiltonian.hamiltonian(puzzle))
+    bitstrings = [''.join(map(str, row))
+                  for row in rng.integers(0, 2, size=(200, reduced.num_qubits))]
+    energies = DiagonalHamiltonian(reduced.operator).bitstring_energies(bitstrings)
+    expected = full.bitstring_energies([reduced.expand(b) for b in bitstrings])
+    print(f'Reducido: {reduced.num_qubits} qubits, {len(reduced.operator)} términos; '
+          f'energías iguales: {np.allclose(energies, expected)}')
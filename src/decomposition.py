@@ -0,0 +1,360 @@
+"""
+Resolución de sudokus grandes por subproblemas que caben en pocos qubits.
+
+Un 9x9 completo no cabe en un simulador: incluso con codificación binaria son
+más de 200 qubits. Aquí el tablero se completa con una asignación inicial y,
+en cada iteración, se elige un subconjunto de celdas libres (una fila, una
+columna, una subgrilla o un grupo conexo de celdas en conflicto) cuyo número de
+qubits no pase de ``budget``. Su operador reducido penaliza los conflictos
+dentro del subconjunto y, como términos lineales, los conflictos con las demás
+celdas, que quedan fijas en su valor actual. El subproblema se resuelve de
+forma exacta o con VQE/QAOA y se itera hasta que el tablero no tiene conflictos.
+"""
+import math
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+from qiskit.quantum_info import SparsePauliOp
+
+from cell_encodings import get_encoding
+from energy import DiagonalHamiltonian
+from profiling import stage
+
+QUBIT_BUDGET = 20
+ENCODING = 'binary'
+
+
+@lru_cache(maxsize=None)
+def peers(n):
+    """Para cada celda (índice fila * n + columna), las celdas que comparten fila, columna o subgrilla."""
+    m = math.isqrt(n)
+    result = []
+    for cell in range(n * n):
+        row, col = divmod(cell, n)
+        band, stack = row - row % m, col - col % m
+        group = {row * n + j for j in range(n)} | {i * n + col for i in range(n)}
+        group |= {(band + i) * n + stack + j for i in range(m) for j in range(m)}
+        group.discard(cell)
+        result.append(tuple(sorted(group)))
+    return tuple(result)
+
+
+def units(n):
+    """Celdas de cada fila, columna y subgrilla."""
+    m = math.isqrt(n)
+    result = [[row * n + col for col in range(n)] for row in range(n)]
+    result += [[row * n + col for row in range(n)] for col in range(n)]
+    result += [[(band + i) * n + stack + j for i in range(m) for j in range(m)]
+               for band in range(0, n, m) for stack in range(0, n, m)]
+    return result
+
+
+def candidate_domains(puzzle):
+    """
+    Dígitos posibles de cada celda según las pistas.
+
+    Se propagan hasta un punto fijo las celdas con un solo dígito posible y los
+    dígitos que en una unidad solo caben en una celda. Devuelve (valores
+    fijos, dominios de las celdas libres).
+    """
+    n = len(puzzle)
+    neighbours = peers(n)
+    fixed = {cell: value for cell, value in enumerate(v for row in puzzle for v in row) if value}
+    domains = {cell: set(range(1, n + 1)) - {fixed[p] for p in neighbours[cell] if p in fixed}
+               for cell in range(n * n) if cell not in fixed}
+
+    def assign(cell, value):
+        del domains[cell]
+        fixed[cell] = value
+        for p in neighbours[cell]:
+            if p in domains:
+                domains[p].discard(value)
+
+    changed = True
+    while changed:
+        if any(not domain for domain in domains.values()):
+            raise ValueError('El sudoku no tiene solución: una celda se quedó sin dígitos')
+        changed = False
+        for cell in [cell for cell, domain in domains.items() if len(domain) == 1]:
+            if cell in domains and len(domains[cell]) == 1:
+                assign(cell, next(iter(domains[cell])))
+                changed = True
+        for unit in units(n):
+            for digit in set(range(1, n + 1)) - {fixed.get(cell) for cell in unit}:
+                places = [cell for cell in unit if cell in domains and digit in domains[cell]]
+                if len(places) == 1:
+                    assign(places[0], digit)
+                    changed = True
+    return fixed, {cell: sorted(domain) for cell, domain in domains.items()}
+
+
+def cell_conflicts(values, n):
+    """Número de vecinas con el mismo valor, para cada celda."""
+    neighbours = np.array(peers(n))
+    values = np.asarray(values)
+    return np.sum(values[neighbours] == values[:, None], axis=1)
+
+
+def total_conflicts(values, n):
+    """Pares de vecinas con el mismo valor en todo el tablero."""
+    return int(cell_conflicts(values, n).sum() // 2)
+
+
+def initial_assignment(fixed, domains, n, rng):
+    """Asigna a cada celda libre el dígito de su dominio con menos conflictos hasta el momento."""
+    neighbours = peers(n)
+    values = np.zeros(n * n, dtype=int)
+    for cell, value in fixed.items():
+        values[cell] = value
+    for cell in rng.permutation(sorted(domains)):
+        domain = domains[cell]
+        used = [int(np.sum(values[list(neighbours[cell])] == d)) for d in domain]
+        best = min(used)
+        values[cell] = rng.choice([d for d, u in zip(domain, used) if u == best])
+    return values
+
+
+class Subproblem:
+    """
+    Operador reducido de un subconjunto de celdas libres.
+
+    Cada celda usa ``encoding.qubits(len(dominio))`` qubits consecutivos; el
+    índice k de la codificación representa el k-ésimo dígito de su dominio.
+    """
+
+    def __init__(self, cells, values, domains, n, encoding=ENCODING):
+        self.cells = list(cells)
+        self.domains = [domains[cell] for cell in self.cells]
+        self.encoding = get_encoding(encoding)
+        widths = [self.encoding.qubits(len(domain)) for domain in self.domains]
+        self.offsets = np.concatenate(([0], np.cumsum(widths))).astype(int)
+        self.num_qubits = int(self.offsets[-1])
+        self.operator = self._build(values, domains, n)
+
+    def _positions(self, index):
+        return list(range(self.offsets[index], self.offsets[index + 1]))
+
+    def _build(self, values, domains, n):
+        neighbours = peers(n)
+        total = self.num_qubits
+        inside = {cell: index for index, cell in enumerate(self.cells)}
+        indicators = [
+            {digit: self.encoding.indicator(self._positions(i), k, total)
+             for k, digit in enumerate(domain)}
+            for i, domain in enumerate(self.domains)]
+
+        ops = []
+        for i, cell in enumerate(self.cells):
+            # Las palabras de código inválidas cuestan más que cualquier conflicto
+            penalty = self.encoding.penalty(self._positions(i), len(self.domains[i]), total)
+            ops.append((len(neighbours[cell]) + 1) * penalty)
+
+            for p in neighbours[cell]:
+                j = inside.get(p)
+                if j is None:
+                    # Vecina fija (pista) o libre fuera del subconjunto: término lineal
+                    if p in domains and values[p] in indicators[i]:
+                        ops.append(indicators[i][values[p]])
+                elif j > i:
+                    for digit in indicators[i].keys() & indicators[j].keys():
+                        ops.append(indicators[i][digit].compose(indicators[j][digit]))
+        return SparsePauliOp.sum(ops).simplify()
+
+    def decode(self, bitstring):
+        """Dígito de cada celda del subconjunto, o None si la palabra de código es inválida."""
+        bits = [int(b) for b in bitstring.replace(' ', '')]
+        result = {}
+        for i, cell in enumerate(self.cells):
+            k = self.encoding.decode(bits[self.offsets[i]:self.offsets[i + 1]],
+                                     len(self.domains[i]))
+            result[cell] = None if k is None else self.domains[i][k]
+        return result
+
+
+def select_cells(values, domains, n, budget, encoding, rng):
+    """
+    Elige un subconjunto de celdas libres que cabe en ``budget`` qubits.
+
+    Los candidatos son cada fila, columna y subgrilla y un grupo conexo que
+    crece desde una celda en conflicto elegida al azar; en cada uno entran
+    primero las celdas con más conflictos.
+    """
+    encoding = get_encoding(encoding)
+    conflicts = cell_conflicts(values, n)
+    free = sorted(domains)
+    conflicted = [cell for cell in free if conflicts[cell]]
+    if not conflicted:
+        return []
+    width = {cell: encoding.qubits(len(domains[cell])) for cell in free}
+    # Desempate aleatorio entre celdas con el mismo número de conflictos
+    noise = dict(zip(free, rng.random(len(free))))
+
+    def fill(order):
+        chosen, qubits = [], 0
+        for cell in order:
+            if qubits + width[cell] <= budget:
+                chosen.append(cell)
+                qubits += width[cell]
+        return chosen
+
+    candidates = []
+    for unit in units(n):
+        cells = [cell for cell in unit if cell in domains]
+        candidates.append(fill(sorted(cells, key=lambda c: (-conflicts[c], noise[c]))))
+
+    # Grupo conexo: búsqueda en anchura por vecinas libres, primero las que tienen conflictos
+    neighbours = peers(n)
+    seed = conflicted[rng.integers(len(conflicted))]
+    cluster, qubits, frontier, seen = [], 0, [seed], {seed}
+    while frontier:
+        frontier.sort(key=lambda c: (-conflicts[c], noise[c]))
+        cell = frontier.pop(0)
+        if qubits + width[cell] > budget:
+            continue
+        cluster.append(cell)
+        qubits += width[cell]
+        for p in neighbours[cell]:
+            if p in domains and p not in seen:
+                seen.add(p)
+                frontier.append(p)
+    candidates.append(cluster)
+
+    # Elegir con probabilidad proporcional a las celdas en conflicto incluidas,
+    # para no volver siempre al mismo subconjunto cuando la búsqueda se estanca
+    scores = np.array([sum(conflicts[cell] > 0 for cell in cells) for cells in candidates],
+                      dtype=float)
+    return candidates[rng.choice(len(candidates), p=scores / scores.sum())]
+
+
+def perturb(values, domains, n, rng):
+    """Reasigna al azar las celdas libres de una unidad con conflictos."""
+    conflicts = cell_conflicts(values, n)
+    options = [unit for unit in units(n)
+               if any(conflicts[cell] and cell in domains for cell in unit)]
+    for cell in options[rng.integers(len(options))]:
+        if cell in domains:
+            values[cell] = rng.choice(domains[cell])
+
+
+def solve_exact(operator, rng):
+    """Bitstring de un estado fundamental elegido al azar entre los empatados."""
+    energies = DiagonalHamiltonian(operator).diagonal()
+    ground = np.flatnonzero(energies <= energies.min() + 1e-9)
+    return format(int(rng.choice(ground)), f'0{operator.num_qubits}b')
+
+
+def solve_variational(operator, method, backend=None, shots=4000, maxiter=100, seed=None):
+    """Resuelve el subproblema con VQE o QAOA y devuelve la muestra de menor energía."""
+    from qiskit import Aer
+    from qiskit.algorithms.optimizers import COBYLA, SPSA
+    from qiskit.circuit.library import QAOAAnsatz
+
+    from ansatz import constraint_ansatz
+    from batched_objective import BatchedObjective
+
+    if backend is None:
+        backend = Aer.get_backend('qasm_simulator')
+    rng = np.random.default_rng(seed)
+    with stage('ansatz'):
+        if method == 'qaoa':
+            ansatz = QAOAAnsatz(operator, reps=1).decompose()
+            optimizer = COBYLA(maxiter=maxiter)
+            initial_point = rng.uniform(0, np.pi, ansatz.num_parameters)
+        else:
+            ansatz, _ = constraint_ansatz(operator, layers=2)
+            optimizer = SPSA(maxiter=maxiter)
+            optimizer.set_max_evals_grouped(2)
+            initial_point = rng.uniform(-np.pi, np.pi, ansatz.num_parameters)
+
+    objective = BatchedObjective(ansatz, operator, backend, shots=shots, seed=seed)
+    with stage('optimize'):
+        result = optimizer.minimize(objective, initial_point)
+    with stage('measure'):
+        counts = objective.run_counts(result.x)[0]
+    bitstrings = list(counts)
+    energies = objective.hamiltonian.bitstring_energies(bitstrings)
+    return bitstrings[int(np.argmin(energies))]
+
+
+SUBPROBLEM_SOLVERS = ('exact', 'vqe', 'qaoa')
+
+
+def solve_by_decomposition(puzzle, budget=QUBIT_BUDGET, solver='exact', encoding=ENCODING,
+                           max_iterations=500, patience=20, seed=None, **solver_options):
+    """
+    Resuelve ``puzzle`` (lista de listas con 0 en las celdas vacías) por subproblemas.
+
+    Cada subproblema resuelto no aumenta los conflictos, así que la búsqueda
+    puede quedar en un mínimo local; tras ``patience`` iteraciones sin mejora se
+    reasigna al azar una unidad con conflictos. Devuelve (tablero,
+    estadísticas); el tablero puede tener conflictos si se agotan las iteraciones.
+    """
+    if solver not in SUBPROBLEM_SOLVERS:
+        raise ValueError(f'Solucionador desconocido: {solver}. Opciones: {SUBPROBLEM_SOLVERS}')
+    n = len(puzzle)
+    rng = np.random.default_rng(seed)
+    fixed, domains = candidate_domains(puzzle)
+    values = initial_assignment(fixed, domains, n, rng)
+
+    current = best = total_conflicts(values, n)
+    stalled = 0
+    stats = {'iterations': 0, 'perturbations': 0, 'max_qubits': 0, 'solver_seconds': 0.0,
+             'initial_conflicts': best}
+    for iteration in range(max_iterations):
+        cells = select_cells(values, domains, n, budget, encoding, rng)
+        if not cells:
+            break
+        with stage('create_hamiltonian'):
+            subproblem = Subproblem(cells, values, domains, n, encoding)
+        start = time.perf_counter()
+        with stage('solve_subproblem'):
+            if solver == 'exact':
+                bitstring = solve_exact(subproblem.operator, rng)
+            else:
+                bitstring = solve_variational(subproblem.operator, solver,
+                                              seed=None if seed is None else seed + iteration,
+                                              **solver_options)
+        stats['solver_seconds'] += time.perf_counter() - start
+        stats['iterations'] += 1
+        stats['max_qubits'] = max(stats['max_qubits'], subproblem.num_qubits)
+
+        previous = values.copy()
+        with stage('decode'):
+            for cell, digit in subproblem.decode(bitstring).items():
+                if digit is not None:
+                    values[cell] = digit
+
+        updated = total_conflicts(values, n)
+        if updated > current:
+            # Una muestra variacional peor que la asignación actual se descarta
+            values = previous
+        else:
+            current = updated
+        if current < best:
+            best, stalled = current, 0
+        else:
+            stalled += 1
+        if stalled >= patience and current:
+            perturb(values, domains, n, rng)
+            current = total_conflicts(values, n)
+            stats['perturbations'] += 1
+            stalled = 0
+
+    stats['conflicts'] = current
+    return values.reshape(n, n).tolist(), stats
+
+
+if __name__ == '__main__':
+    from puzzles import get_matrix, is_correct
+
+    filename = sys.argv[1] if len(sys.argv) > 1 else 'problem.txt'
+    solver = sys.argv[2] if len(sys.argv) > 2 else 'exact'
+
+    start = time.perf_counter()
+    board, stats = solve_by_decomposition(get_matrix(filename), solver=solver, seed=12345)
+    for row in board:
+        print(*row)
+    print(f'{stats} en {time.perf_counter() - start:.2f} s')
+    print(f'Correcto: {stats["conflicts"] == 0 and is_correct(board)}')
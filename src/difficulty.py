@@ -0,0 +1,228 @@
+"""
+Calificación de dificultad de sudokus y generación por nivel.
+
+``rate_batch`` resuelve un lote con las técnicas de ``propagation`` aplicadas
+de la más simple a la más costosa: mientras los singles desnudos avanzan no se
+usan los ocultos, y solo se ramifica cuando ninguno de los dos avanza. La
+ramificación sigue hasta hallar dos soluciones o agotar la búsqueda, de modo
+que también se verifica la unicidad. Cada tablero recibe:
+
+- ``level``: la técnica más costosa que necesitó (índice en ``LEVELS``):
+  ``easy`` solo singles desnudos, ``medium`` también ocultos, ``hard``
+  ramificación con hasta ``HARD_NODES`` nodos y ``expert`` más nodos;
+- ``score``: pasadas de singles desnudos + ``HIDDEN_WEIGHT`` por pasada de
+  ocultos + ``BRANCH_WEIGHT`` por nodo, para ordenar dentro de un nivel;
+- ``solutions``: 0, 1 o 2 (dos o más).
+
+Los nodos que cuentan para el nivel y el puntaje (``nodes``) son los
+expandidos hasta la primera solución; los de la verificación de unicidad
+dependen de cuánto del árbol queda por recorrer y se informan aparte en
+``search_nodes``.
+
+``generate`` produce sudokus de solución única de un nivel dado (y, si se
+pide, de un rango de puntaje): parte de soluciones aleatorias y quita pistas en
+orden aleatorio mientras el sudoku siga teniendo solución única y no supere el
+nivel; los que terminan en el nivel pedido se aceptan. Todos los tableros de un
+bloque se excavan y califican juntos y los bloques se reparten entre procesos;
+``write_puzzles`` los escribe con ``puzzles.PuzzleWriter`` para los benchmarks.
+"""
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from propagation import (CONTRADICTION, SOLVED, STUCK, _branch, _round, candidates, popcount,
+                         solve_batch)
+
+LEVELS = ('easy', 'medium', 'hard', 'expert')
+HIDDEN_WEIGHT = 3
+BRANCH_WEIGHT = 10
+# Nodos de ramificación hasta la primera solución con los que un sudoku todavía es 'hard'
+HARD_NODES = 5
+# Tableros que se excavan juntos por intento y procesos (None: uno por núcleo)
+BATCH_SIZE = 64
+PROCESSES = None
+# Intentos por bloque antes de devolver menos sudokus de los pedidos
+MAX_ATTEMPTS = 50
+
+
+def level_index(level):
+    if level not in LEVELS:
+        raise ValueError(f'Nivel desconocido: {level}. Opciones: {LEVELS}')
+    return LEVELS.index(level)
+
+
+def rate_batch(boards):
+    """Calificación de un lote (N, n, n); devuelve un diccionario de arreglos de largo N."""
+    masks = candidates(boards)
+    N = len(masks)
+    naked = np.zeros(N, dtype=np.int64)
+    hidden = np.zeros(N, dtype=np.int64)
+    status = np.full(N, STUCK)
+    active = np.arange(N)
+    while len(active):
+        current = masks[active]
+        updated, contradiction = _round(current, hidden=False)
+        changed = np.any(updated != current, axis=(1, 2))
+        naked[active[changed]] += 1
+        # Los singles ocultos solo se usan donde los desnudos ya no avanzan
+        stalled = np.flatnonzero(~changed & ~contradiction)
+        if len(stalled):
+            updated[stalled], contradiction[stalled] = _round(current[stalled])
+            changed[stalled] = np.any(updated[stalled] != current[stalled], axis=(1, 2))
+            hidden[active[stalled[changed[stalled]]]] += 1
+        masks[active] = updated
+        status[active[contradiction]] = CONTRADICTION
+        active = active[changed & ~contradiction]
+    status[(status == STUCK) & np.all(popcount(masks) == 1, axis=(1, 2))] = SOLVED
+
+    solutions = (status == SOLVED).astype(np.int64)
+    nodes = np.zeros(N, dtype=np.int64)
+    search_nodes = np.zeros(N, dtype=np.int64)
+    stuck = np.flatnonzero(status == STUCK)
+    if len(stuck):
+        _, solutions[stuck], search_nodes[stuck], nodes[stuck] = _branch(masks[stuck], limit=2)
+
+    level = np.where(hidden > 0, 1, 0)
+    level[stuck] = np.where(nodes[stuck] <= HARD_NODES, 2, 3)
+    return {'level': level, 'score': naked + HIDDEN_WEIGHT * hidden + BRANCH_WEIGHT * nodes,
+            'solutions': solutions, 'naked_rounds': naked, 'hidden_rounds': hidden,
+            'nodes': nodes, 'search_nodes': search_nodes,
+            'clues': np.count_nonzero(np.asarray(boards), axis=(1, 2))}
+
+
+def _pool_map(function, chunks, processes):
+    processes = min(processes or os.cpu_count() or 1, len(chunks))
+    if processes <= 1:
+        return [function(*chunk) for chunk in chunks]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(function, *zip(*chunks)))
+
+
+def _concatenate(ratings):
+    return {key: np.concatenate([rating[key] for rating in ratings]) for key in ratings[0]}
+
+
+def rate_many(boards, processes=PROCESSES, chunk_size=BATCH_SIZE * 16):
+    """``rate_batch`` por bloques repartidos entre procesos."""
+    boards = np.asarray(boards, dtype=np.uint8)
+    chunks = [(boards[start:start + chunk_size],)
+              for start in range(0, len(boards), chunk_size)]
+    return _concatenate(_pool_map(rate_batch, chunks, processes))
+
+
+def random_solutions(n, count, rng):
+    """
+    Soluciones aleatorias: subgrillas diagonales permutadas al azar y el resto resuelto.
+
+    Algunas combinaciones de subgrillas no se pueden completar (en 4x4, por
+    ejemplo); esos tableros se vuelven a sortear.
+    """
+    b = math.isqrt(n)
+    solutions = np.zeros((count, n, n), dtype=np.uint8)
+    missing = np.arange(count)
+    while len(missing):
+        boards = np.zeros((len(missing), n, n), dtype=np.uint8)
+        for box in range(b):
+            digits = np.argsort(rng.random((len(missing), n)), axis=1).astype(np.uint8) + 1
+            boards[:, box * b:(box + 1) * b, box * b:(box + 1) * b] = digits.reshape(-1, b, b)
+        solutions[missing], _ = solve_batch(boards)
+        missing = missing[~solutions[missing].all(axis=(1, 2))]
+    return solutions
+
+
+def _excavate(solutions, target, max_score, rng):
+    """Quita pistas mientras la solución siga única, sin pasar del nivel ni del puntaje."""
+    count, n, _ = solutions.shape
+    puzzles = solutions.copy()
+    rating = rate_batch(puzzles)
+    orders = np.argsort(rng.random((count, n * n)), axis=1)
+    boards = np.arange(count)
+    for step in range(n * n):
+        trial = puzzles.copy().reshape(count, -1)
+        trial[boards, orders[:, step]] = 0
+        trial = trial.reshape(count, n, n)
+        trial_rating = rate_batch(trial)
+        accept = (trial_rating['solutions'] == 1) & (trial_rating['level'] <= target)
+        if max_score is not None:
+            accept &= trial_rating['score'] <= max_score
+        puzzles[accept] = trial[accept]
+        for key, values in rating.items():
+            values[accept] = trial_rating[key][accept]
+    return puzzles, rating
+
+
+def _generate_chunk(n, target, count, min_score, max_score, seed):
+    rng = np.random.default_rng(seed)
+    accepted, ratings = [], []
+    for _ in range(MAX_ATTEMPTS):
+        puzzles, rating = _excavate(random_solutions(n, BATCH_SIZE, rng), target, max_score, rng)
+        keep = rating['level'] == target
+        if min_score is not None:
+            keep &= rating['score'] >= min_score
+        accepted.append(puzzles[keep])
+        ratings.append({key: values[keep] for key, values in rating.items()})
+        if sum(len(batch) for batch in accepted) >= count:
+            break
+    rating = _concatenate(ratings)
+    return np.concatenate(accepted)[:count], {key: values[:count] for key, values in rating.items()}
+
+
+def generate(n, level, count, min_score=None, max_score=None, processes=PROCESSES, seed=None):
+    """
+    ``count`` sudokus de n x n con solución única del nivel ``level``.
+
+    Devuelve (sudokus (count, n, n), calificaciones). Si tras ``MAX_ATTEMPTS``
+    intentos por bloque no se alcanzan, devuelve los que se encontraron.
+    """
+    target = level_index(level)
+    if math.isqrt(n) ** 2 != n:
+        raise ValueError('El tamaño del tablero debe ser un cuadrado perfecto.')
+    if count <= 0:
+        empty = np.zeros((0, n, n), dtype=np.uint8)
+        return empty, rate_batch(empty)
+    processes = min(processes or os.cpu_count() or 1, count)
+    seeds = np.random.SeedSequence(seed).spawn(processes)
+    shares = [count // processes + (i < count % processes) for i in range(processes)]
+    chunks = [(n, target, share, min_score, max_score, child)
+              for share, child in zip(shares, seeds)]
+    results = _pool_map(_generate_chunk, chunks, processes)
+    puzzles, ratings = zip(*results)
+    return np.concatenate(puzzles), _concatenate(ratings)
+
+
+def write_puzzles(filename, n, level, count, format='packed', processes=PROCESSES, seed=None):
+    """Como ``sudoku_generator.write_puzzles``, pero con sudokus únicos del nivel ``level``."""
+    from puzzles import PuzzleWriter
+
+    puzzles, _ = generate(n, level, count, processes=processes, seed=seed)
+    with PuzzleWriter(filename, n, format) as writer:
+        writer.write_batch(puzzles)
+    return writer.count
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 9
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    processes = int(sys.argv[3]) if len(sys.argv) > 3 else PROCESSES
+
+    print(f"{'nivel':<8} {'sudokus':>7} {'gen/s':>7} {'pistas':>7} {'puntaje':>8} "
+          f"{'nodos':>6} {'resolución/s':>13}")
+    for level in LEVELS:
+        start = time.perf_counter()
+        puzzles, rating = generate(n, level, count, processes=processes, seed=12345)
+        elapsed = time.perf_counter() - start
+        if not len(puzzles):
+            print(f'{level:<8} {0:>7}')
+            continue
+
+        # Rendimiento del solucionador clásico estratificado por nivel
+        start = time.perf_counter()
+        solve_batch(puzzles)
+        solve_rate = len(puzzles) / (time.perf_counter() - start)
+        print(f"{level:<8} {len(puzzles):>7} {len(puzzles) / elapsed:>7.1f} "
+              f"{rating['clues'].mean():>7.1f} {rating['score'].mean():>8.1f} "
+              f"{rating['nodes'].mean():>6.1f} {solve_rate:>13.0f}")
@@ -6,6 +6,9 @@ import copy
 from dimod.generators.constraints import combinations
 from hybrid.reference import KerberosSampler
 
+from profiling import profiled, stage
+from puzzles import get_matrix, is_correct
+
 
 def get_label(row, col, digit):
     """Returns a string of the cell coordinates and the cell value in a
@@ -14,63 +17,7 @@ def get_label(row, col, digit):
     return "{row},{col}_{digit}".format(**locals())
 
 
-def get_matrix(filename):
-    """Return a list of lists containing the content of the input text file.
-
-    Note: each line of the text file corresponds to a list. Each item in
-    the list is from splitting the line of text by the whitespace ' '.
-    """
-    with open(filename, "r") as f:
-        content = f.readlines()
-
-    lines = []
-    for line in content:
-        new_line = line.rstrip()    # Strip any whitespace after last value
-
-        if new_line:
-            new_line = list(map(int, new_line.split(' ')))
-            lines.append(new_line)
-
-    return lines
-
-
-def is_correct(matrix):
-    """Verify that the matrix satisfies the Sudoku constraints.
-
-    Args:
-      matrix(list of lists): list contains 'n' lists, where each of the 'n'
-        lists contains 'n' digits.
-    """
-    n = len(matrix)        # Number of rows/columns
-    m = int(math.sqrt(n))  # Number of subsquare rows/columns
-    unique_digits = set(range(1, n+1))  # Digits in a solution
-
-    # Verifying rows
-    for row in matrix:
-        if set(row) != unique_digits:
-            print("Error in row: ", row)
-            return False
-
-    # Verifying columns
-    for j in range(n):
-        col = [matrix[i][j] for i in range(n)]
-        if set(col) != unique_digits:
-            print("Error in col: ", col)
-            return False
-
-    # Verifying subsquares
-    subsquare_coords = [(i, j) for i in range(m) for j in range(m)]
-    for r_scalar in range(m):
-        for c_scalar in range(m):
-            subsquare = [matrix[i + r_scalar * m][j + c_scalar * m] for i, j
-                         in subsquare_coords]
-            if set(subsquare) != unique_digits:
-                print("Error in sub-square: ", subsquare)
-                return False
-
-    return True
-
-
+@profiled()
 def build_bqm(matrix):
     """Build BQM using Sudoku constraints"""
     # Set up
@@ -142,27 +89,29 @@ def build_bqm(matrix):
 
 def solve_sudoku(bqm, matrix):
     """Solve BQM and return matrix with solution."""
-    solution = KerberosSampler().sample(bqm,
-                                        max_iter=10,
-                                        convergence=3,
-                                        qpu_params={'label': 'Example - Sudoku'})
+    with stage('sample'):
+        solution = KerberosSampler().sample(bqm,
+                                            max_iter=10,
+                                            convergence=3,
+                                            qpu_params={'label': 'Example - Sudoku'})
     best_solution = solution.first.sample  # type: ignore
     solution_list = [k for k, v in best_solution.items() if v == 1]
 
     result = copy.deepcopy(matrix)
 
-    for label in solution_list:
-        coord, digit = label.split('_')
-        row, col = map(int, coord.split(','))
+    with stage('decode'):
+        for label in solution_list:
+            coord, digit = label.split('_')
+            row, col = map(int, coord.split(','))
 
-        if result[row][col] > 0:
-            # the returned solution is not optimal and either tried to
-            # overwrite one of the starting values, or returned more than
-            # one value for the position. In either case the solution is
-            # likely incorrect.
-            continue
+            if result[row][col] > 0:
+                # the returned solution is not optimal and either tried to
+                # overwrite one of the starting values, or returned more than
+                # one value for the position. In either case the solution is
+                # likely incorrect.
+                continue
 
-        result[row][col] = int(digit)
+            result[row][col] = int(digit)
 
     return result
 
@@ -0,0 +1,101 @@
+import time
+
+import numpy as np
+
+from sudoku_board import decode_boards, valid_boards
+
+
+class SolutionFound(Exception):
+    """Se lanza desde la función objetivo para detener el optimizador."""
+
+    def __init__(self, solution):
+        super().__init__(f"Tablero válido encontrado: {solution['board']}")
+        self.solution = solution
+
+
+class EarlyStopping:
+    """
+    Revisa las muestras de cada evaluación y detiene la optimización en cuanto
+    aparece un tablero válido con probabilidad mayor o igual a ``threshold``.
+
+    Se usa como ``callback`` de ``BatchedObjective``. Al detenerse, ``solution``
+    contiene el tablero, su probabilidad, los parámetros que lo produjeron, el
+    número de evaluaciones y el tiempo transcurrido hasta encontrarlo;
+    ``minimize_until_valid`` agrega los jobs y las iteraciones del optimizador.
+    """
+
+    def __init__(self, rows, cols, qubits_per_cell, threshold=0.01):
+        self.rows = rows
+        self.cols = cols
+        self.qubits_per_cell = qubits_per_cell
+        self.threshold = threshold
+        self.reset()
+
+    def reset(self):
+        self.start = time.perf_counter()
+        self.evaluations = 0
+        self.solution = None
+
+    def __call__(self, points, counts_list):
+        for point, counts in zip(points, counts_list):
+            self.evaluations += 1
+            bitstrings = list(counts)
+            weights = np.fromiter(counts.values(), dtype=float, count=len(bitstrings))
+            boards = decode_boards(bitstrings, self.rows, self.cols, self.qubits_per_cell)
+            valid = valid_boards(boards)
+            if not valid.any():
+                continue
+
+            best = np.argmax(np.where(valid, weights, -1))
+            probability = weights[best] / weights.sum()
+            if probability >= self.threshold:
+                self.solution = {
+                    'board': boards[best].tolist(),
+                    'bitstring': bitstrings[best],
+                    'probability': float(probability),
+                    'parameters': np.array(point),
+                    'evaluations': self.evaluations,
+                    'seconds': time.perf_counter() - self.start,
+                }
+                raise SolutionFound(self.solution)
+
+
+def minimize_until_valid(optimizer, objective, initial_point, stopper):
+    """
+    Ejecuta ``optimizer.minimize`` con ``stopper`` conectado a ``objective``.
+
+    La solución incluye ``iterations``: con optimizadores que llaman a
+    ``callback`` al final de cada iteración (SPSA), las iteraciones terminadas
+    antes de detenerse, sin contar la calibración; con los demás (COBYLA, que
+    evalúa un punto por iteración), las evaluaciones.
+
+    Returns:
+        tuple: (solución, None) si se encontró un tablero válido a tiempo, o
+        (None, resultado del optimizador) si se agotaron las iteraciones.
+    """
+    iterations = None
+    previous_optimizer_callback = getattr(optimizer, 'callback', None)
+    if hasattr(optimizer, 'callback'):
+        iterations = [0]
+
+        def count_iteration(*args):
+            iterations[0] += 1
+            if previous_optimizer_callback is not None:
+                previous_optimizer_callback(*args)
+
+        optimizer.callback = count_iteration
+    previous_callback = objective.callback
+    objective.callback = stopper
+    stopper.reset()
+    try:
+        result = optimizer.minimize(objective, initial_point)
+    except SolutionFound as found:
+        found.solution['jobs'] = objective.num_jobs
+        found.solution['iterations'] = (found.solution['evaluations'] if iterations is None
+                                        else iterations[0])
+        return found.solution, None
+    finally:
+        objective.callback = previous_callback
+        if iterations is not None:
+            optimizer.callback = previous_optimizer_callback
+    return None, result
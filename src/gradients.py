@@ -0,0 +1,264 @@
+import sys
+import time
+
+import numpy as np
+from scipy.optimize import minimize
+
+from qiskit.circuit import Parameter, ParameterExpression, QuantumCircuit
+from qiskit.algorithms.optimizers import ADAM, SPSA
+
+from batched_objective import BatchedObjective
+from energy import DiagonalHamiltonian
+from sudoku_board import decode_board, is_valid_board
+
+# Generadores P de las rotaciones R_P(θ) = exp(-iθP/2) soportadas
+ROTATION_GENERATORS = {
+    'rx': np.array([[0, 1], [1, 0]], dtype=complex),
+    'ry': np.array([[0, -1j], [1j, 0]], dtype=complex),
+    'rz': np.array([[1, 0], [0, -1]], dtype=complex),
+}
+
+
+def _parameter_of(operation):
+    """Devuelve el parámetro libre de una operación, o None si está ligada."""
+    for param in operation.params:
+        if isinstance(param, ParameterExpression):
+            if not isinstance(param, Parameter) or operation.name not in ROTATION_GENERATORS:
+                raise ValueError(
+                    f'Solo se soportan rotaciones {sorted(ROTATION_GENERATORS)} con un '
+                    f'parámetro libre, se encontró {operation.name}({param}).')
+            return param
+    return None
+
+
+def expand_parameters(ansatz):
+    """
+    Copia el ansatz dando un parámetro propio a cada aparición de un parámetro.
+
+    ``sudoku_ansatz`` reutiliza el mismo θ en varias rotaciones, y la regla de
+    desplazamiento de parámetros solo es exacta por compuerta. Devuelve el
+    circuito expandido y, para cada aparición, el índice del parámetro original
+    (en el orden de ``ansatz.parameters``), de modo que el gradiente original es
+    la suma de los gradientes de sus apariciones.
+    """
+    index = {param: i for i, param in enumerate(ansatz.parameters)}
+    num_occurrences = sum(
+        _parameter_of(instruction.operation) is not None for instruction in ansatz.data)
+    width = len(str(num_occurrences))
+
+    expanded = QuantumCircuit(*ansatz.qregs, *ansatz.cregs)
+    occurrences = []
+    for instruction in ansatz.data:
+        operation = instruction.operation
+        param = _parameter_of(operation)
+        if param is not None:
+            # Nombres con ceros a la izquierda para que el orden de
+            # expanded.parameters coincida con el orden de aparición
+            operation = operation.copy()
+            operation.params = [Parameter(f'φ{len(occurrences):0{width}d}')]
+            occurrences.append(index[param])
+        expanded.append(operation, instruction.qubits, instruction.clbits)
+
+    return expanded, np.array(occurrences, dtype=int)
+
+
+class ParameterShiftGradient:
+    """
+    Gradiente por desplazamiento de parámetros evaluado con muestreo.
+
+    El punto central y los 2K puntos desplazados (K apariciones de parámetros)
+    se ejecutan en un solo job por medio de ``BatchedObjective``.
+    """
+
+    def __init__(self, ansatz, hamiltonian, backend, shots=20000, seed=None):
+        expanded, self.occurrences = expand_parameters(ansatz)
+        self.num_parameters = ansatz.num_parameters
+        self.objective = BatchedObjective(
+            expanded, hamiltonian, backend, shots=shots, seed=seed)
+
+    @property
+    def num_evaluations(self):
+        return self.objective.num_evaluations
+
+    def value_and_gradient(self, x):
+        base = np.asarray(x, dtype=float)[self.occurrences]
+        shifts = np.pi / 2 * np.eye(len(base))
+        values = self.objective(np.vstack([base, base + shifts, base - shifts]))
+
+        k = len(base)
+        partial = (values[1:k + 1] - values[k + 1:]) / 2
+        gradient = np.bincount(self.occurrences, weights=partial,
+                               minlength=self.num_parameters)
+        return values[0], gradient
+
+    def __call__(self, x):
+        return self.value_and_gradient(x)[1]
+
+
+def _apply(state, matrix, qubits):
+    """Aplica una matriz de k qubits (convención little-endian de Qiskit) al tensor de estado."""
+    k = len(qubits)
+    num_qubits = state.ndim
+    axes = [num_qubits - 1 - q for q in reversed(qubits)]
+    tensor = matrix.reshape((2,) * 2 * k)
+    result = np.tensordot(tensor, state, axes=(list(range(k, 2 * k)), axes))
+    return np.moveaxis(result, list(range(k)), axes)
+
+
+class AdjointGradient:
+    """
+    Energía exacta y gradiente por el método adjunto sobre el vector de estado.
+
+    Se simula el circuito una vez hacia adelante y una vez hacia atrás, por lo
+    que el costo del gradiente completo es el de unas tres simulaciones, sin
+    importar el número de parámetros. Solo es viable para circuitos que caben
+    en memoria como vector de estado.
+    """
+
+    def __init__(self, ansatz, hamiltonian):
+        self.index = {param: i for i, param in enumerate(ansatz.parameters)}
+        self.num_parameters = ansatz.num_parameters
+        self.num_qubits = ansatz.num_qubits
+        self.diagonal = DiagonalHamiltonian(hamiltonian).diagonal().reshape(
+            (2,) * self.num_qubits)
+        self.instructions = []
+        for instruction in ansatz.data:
+            if instruction.operation.name == 'barrier':
+                continue
+            qubits = [ansatz.find_bit(qubit).index for qubit in instruction.qubits]
+            self.instructions.append((instruction.operation, qubits))
+        self.num_evaluations = 0
+
+    def _matrix(self, operation, x):
+        param = _parameter_of(operation)
+        if param is None:
+            return operation.to_matrix()
+        return type(operation)(x[self.index[param]]).to_matrix()
+
+    def value_and_gradient(self, x):
+        x = np.asarray(x, dtype=float)
+        state = np.zeros((2,) * self.num_qubits, dtype=complex)
+        state[(0,) * self.num_qubits] = 1
+
+        matrices = []
+        for operation, qubits in self.instructions:
+            matrix = self._matrix(operation, x)
+            state = _apply(state, matrix, qubits)
+            matrices.append(matrix)
+
+        energy = float(np.sum(np.abs(state) ** 2 * self.diagonal))
+        adjoint = self.diagonal * state
+        gradient = np.zeros(self.num_parameters)
+
+        for (operation, qubits), matrix in zip(reversed(self.instructions), reversed(matrices)):
+            param = _parameter_of(operation)
+            if param is not None:
+                generator = -0.5j * ROTATION_GENERATORS[operation.name]
+                derivative = _apply(state, generator, qubits)
+                gradient[self.index[param]] += 2 * np.real(np.vdot(adjoint, derivative))
+            inverse = matrix.conj().T
+            state = _apply(state, inverse, qubits)
+            adjoint = _apply(adjoint, inverse, qubits)
+
+        self.num_evaluations += 1
+        return energy, gradient
+
+    def __call__(self, x):
+        return self.value_and_gradient(x)[1]
+
+
+def optimize(ansatz, hamiltonian, initial_point, method='l_bfgs_b', gradient='parameter_shift',
+             backend=None, shots=20000, maxiter=100, seed=None):
+    """
+    Minimiza la energía del ansatz con un optimizador basado en gradientes.
+
+    Args:
+        method (str): 'l_bfgs_b' o 'adam'.
+        gradient (str): 'parameter_shift' (muestreo en ``backend``) o 'adjoint'
+            (vector de estado exacto).
+
+    Returns:
+        tuple: (parámetros óptimos, energía final, estimador de gradiente). El
+        estimador expone ``num_evaluations`` con las ejecuciones de circuito usadas.
+    """
+    if gradient == 'parameter_shift':
+        estimator = ParameterShiftGradient(
+            ansatz, hamiltonian, backend, shots=shots, seed=seed)
+    elif gradient == 'adjoint':
+        estimator = AdjointGradient(ansatz, hamiltonian)
+    else:
+        raise ValueError(f'Gradiente desconocido: {gradient}')
+
+    if method == 'l_bfgs_b':
+        result = minimize(estimator.value_and_gradient, initial_point, jac=True,
+                          method='L-BFGS-B', options={'maxiter': maxiter})
+        return result.x, result.fun, estimator
+    if method == 'adam':
+        optimizer = ADAM(maxiter=maxiter, lr=0.1)
+        result = optimizer.minimize(
+            lambda x: estimator.value_and_gradient(x)[0], initial_point, jac=estimator)
+        return result.x, result.fun, estimator
+    raise ValueError(f'Optimizador desconocido: {method}')
+
+
+def compare_optimizers(rows, cols, backend, alpha, qubits_per_cell, shots=20000, maxiter=100,
+                       spsa_maxiter=250, seed=None):
+    """
+    Compara SPSA contra L-BFGS-B y Adam con gradientes analíticos.
+
+    Para cada estrategia devuelve la energía final, las ejecuciones de circuito
+    hasta la convergencia, el tiempo y si el bitstring más probable del estado
+    final es un tablero válido.
+    """
+    from ansatz import constraint_ansatz
+    from restrictions import create_hamiltonian
+
+    H = create_hamiltonian(alpha, rows, qubits_per_cell, cols)
+    ansatz, _ = constraint_ansatz(H, layers=2)
+    rng = np.random.default_rng(seed)
+    initial_point = rng.uniform(-np.pi, np.pi, ansatz.num_parameters)
+    sampler = BatchedObjective(ansatz, H, backend, shots=shots, seed=seed)
+
+    report = []
+
+    def record(name, x, energy, evaluations, elapsed):
+        counts = sampler.run_counts(x)[0]
+        board = decode_board(max(counts, key=counts.get), rows, cols, qubits_per_cell)
+        report.append({'strategy': name, 'energy': float(energy), 'evaluations': evaluations,
+                       'seconds': elapsed, 'valid': is_valid_board(board)})
+
+    start = time.perf_counter()
+    objective = BatchedObjective(ansatz, H, backend, shots=shots, seed=seed)
+    spsa = SPSA(maxiter=spsa_maxiter)
+    spsa.set_max_evals_grouped(2)
+    result = spsa.minimize(objective, initial_point)
+    record('spsa', result.x, result.fun, objective.num_evaluations,
+           time.perf_counter() - start)
+
+    for method, gradient in (('l_bfgs_b', 'parameter_shift'), ('adam', 'parameter_shift'),
+                             ('l_bfgs_b', 'adjoint'), ('adam', 'adjoint')):
+        start = time.perf_counter()
+        x, energy, estimator = optimize(ansatz, H, initial_point, method=method,
+                                        gradient=gradient, backend=backend, shots=shots,
+                                        maxiter=maxiter, seed=seed)
+        record(f'{method}+{gradient}', x, energy, estimator.num_evaluations,
+               time.perf_counter() - start)
+
+    return report
+
+
+if __name__ == '__main__':
+    from qiskit import Aer
+
+    from vqe_local import ALPHA, QUBITS_PER_CELL, SUDOKU_COLS, SUDOKU_ROWS
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else SUDOKU_ROWS
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else SUDOKU_COLS
+
+    backend = Aer.get_backend('qasm_simulator')
+    report = compare_optimizers(rows, cols, backend, ALPHA, QUBITS_PER_CELL, seed=12345)
+
+    print(f"{'estrategia':<28}{'energía':>12}{'circuitos':>12}{'tiempo (s)':>12}  válido")
+    for entry in report:
+        print(f"{entry['strategy']:<28}{entry['energy']:>12.2f}{entry['evaluations']:>12}"
+              f"{entry['seconds']:>12.2f}  {entry['valid']}")
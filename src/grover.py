@@ -1,14 +1,12 @@
 # Implementación del algoritmo de Grover para un sudoku de 2 x 2 por Avery Parkinson
 # https://averyparkinson23.medium.com/solving-sudoku-using-quantum-computing-cbc8a397a504
 
-import matplotlib.pyplot as plt
 import numpy as np
 
 from qiskit import Aer, QuantumCircuit, ClassicalRegister, QuantumRegister, execute
-from qiskit.quantum_info import Statevector
 
-from qiskit.visualization import plot_histogram
-from sympy import plot
+from artifacts import get_writer
+from profiling import stage
 
 
 def XOR(qc, a, b, output):
@@ -67,42 +65,44 @@ def diffuser(nqubits):
 
 
 def main():
-    clause_list = ((0, 1), (0, 2), (1, 3), (2, 3))
-    var_qubits = QuantumRegister(4, name='v')
-    clause_qubits = QuantumRegister(4, name='c')
-    output_qubit = QuantumRegister(1, name='out')
-    c_bits = ClassicalRegister(4, name='cbits')
-    qc = QuantumCircuit(var_qubits, clause_qubits, output_qubit, c_bits)
+    with stage('build_circuit'):
+        clause_list = ((0, 1), (0, 2), (1, 3), (2, 3))
+        var_qubits = QuantumRegister(4, name='v')
+        clause_qubits = QuantumRegister(4, name='c')
+        output_qubit = QuantumRegister(1, name='out')
+        c_bits = ClassicalRegister(4, name='cbits')
+        qc = QuantumCircuit(var_qubits, clause_qubits, output_qubit, c_bits)
 
-    sudoku_oracle(qc, clause_list, var_qubits, clause_qubits, output_qubit)
+        sudoku_oracle(qc, clause_list, var_qubits, clause_qubits, output_qubit)
 
-    qc.initialize([1, -1]/np.sqrt(2), output_qubit)  # type: ignore
+        qc.initialize([1, -1]/np.sqrt(2), output_qubit)  # type: ignore
 
-    qc.h(var_qubits)
-    qc.barrier()
+        qc.h(var_qubits)
+        qc.barrier()
 
-    sudoku_oracle(qc, clause_list, var_qubits, clause_qubits, output_qubit)
+        sudoku_oracle(qc, clause_list, var_qubits, clause_qubits, output_qubit)
 
-    qc.barrier()
-    qc.append(diffuser(4), [0, 1, 2, 3])
+        qc.barrier()
+        qc.append(diffuser(4), [0, 1, 2, 3])
 
-    sudoku_oracle(qc, clause_list, var_qubits, clause_qubits, output_qubit)
-    qc.barrier()
+        sudoku_oracle(qc, clause_list, var_qubits, clause_qubits, output_qubit)
+        qc.barrier()
 
-    qc.append(diffuser(4), [0, 1, 2, 3])
+        qc.append(diffuser(4), [0, 1, 2, 3])
 
-    qc.measure(var_qubits, c_bits)
+        qc.measure(var_qubits, c_bits)
 
-    qc.draw(output='mpl')
-
-    plt.show()
+    # Los dibujos solo se generan si se configuró un directorio de artefactos
+    artifacts = get_writer()
+    artifacts.draw_circuit(qc, 'grover_2x2', output='mpl')
 
     backend = Aer.get_backend('qasm_simulator')
-    job = execute(qc, backend, shots=1000)
-    result = job.result()
-    counts = result.get_counts()
-    plot_histogram(counts)
-    plt.show()
+    with stage('simulate'):
+        job = execute(qc, backend, shots=1000)
+        result = job.result()
+        counts = result.get_counts()
+    print(counts)
+    artifacts.plot_histogram(counts, 'grover_2x2_counts')
 
 
 if __name__ == '__main__':
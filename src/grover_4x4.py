@@ -2,14 +2,12 @@
 # basado en la implementación de Avery Parkinson:
 # https://averyparkinson23.medium.com/solving-sudoku-using-quantum-computing-cbc8a397a504
 
-import matplotlib.pyplot as plt
 import numpy as np
 
-from qiskit import Aer, QuantumCircuit, ClassicalRegister, QuantumRegister, execute
-from qiskit.quantum_info import Statevector
+from qiskit import QuantumCircuit, ClassicalRegister, QuantumRegister
 
-from qiskit.visualization import plot_histogram
-from sympy import plot
+from artifacts import get_writer
+from profiling import stage
 
 
 def XOR(qc, a, b, output):
@@ -182,41 +180,41 @@ def diffuser(nqubits):
 
 
 def main():
-    # 16 celdas * 2 qubits por celda
-    var_qubits = QuantumRegister(32, name='v')
-    clause_qubits = QuantumRegister(768, name='c')  # 768 qubits para cláusulas
-    output_qubit = QuantumRegister(1, name='out')  # 1 qubit de salida
-    auxiliary_qubits = QuantumRegister(8, name='aux')  # 8 qubits auxiliares
-    c_bits = ClassicalRegister(32, name='cbits')
+    with stage('build_circuit'):
+        # 16 celdas * 2 qubits por celda
+        var_qubits = QuantumRegister(32, name='v')
+        clause_qubits = QuantumRegister(768, name='c')  # 768 qubits para cláusulas
+        output_qubit = QuantumRegister(1, name='out')  # 1 qubit de salida
+        auxiliary_qubits = QuantumRegister(8, name='aux')  # 8 qubits auxiliares
+        c_bits = ClassicalRegister(32, name='cbits')
 
-    qc = QuantumCircuit(var_qubits, clause_qubits,
-                        auxiliary_qubits, output_qubit)
+        qc = QuantumCircuit(var_qubits, clause_qubits,
+                            auxiliary_qubits, output_qubit)
 
-    sudoku_oracle(qc, auxiliary_qubits, var_qubits,
-                  clause_qubits, output_qubit)
+        sudoku_oracle(qc, auxiliary_qubits, var_qubits,
+                      clause_qubits, output_qubit)
 
-    qc.initialize([1, -1]/np.sqrt(2), output_qubit)  # type: ignore
+        qc.initialize([1, -1]/np.sqrt(2), output_qubit)  # type: ignore
 
-    qc.h(var_qubits)
-    qc.barrier()
+        qc.h(var_qubits)
+        qc.barrier()
 
-    sudoku_oracle(qc, auxiliary_qubits, var_qubits,
-                  clause_qubits, output_qubit)
+        sudoku_oracle(qc, auxiliary_qubits, var_qubits,
+                      clause_qubits, output_qubit)
 
-    qc.barrier()
-    qc.append(diffuser(4), [0, 1, 2, 3])
+        qc.barrier()
+        qc.append(diffuser(4), [0, 1, 2, 3])
 
-    sudoku_oracle(qc, auxiliary_qubits, var_qubits,
-                  clause_qubits, output_qubit)
-    qc.barrier()
+        sudoku_oracle(qc, auxiliary_qubits, var_qubits,
+                      clause_qubits, output_qubit)
+        qc.barrier()
 
-    qc.append(diffuser(4), [0, 1, 2, 3])
+        qc.append(diffuser(4), [0, 1, 2, 3])
 
-    qc.measure(var_qubits, c_bits)
+        qc.measure(var_qubits, c_bits)
 
-    qc.draw(output='mpl')
-
-    plt.show()
+    # Los dibujos solo se generan si se configuró un directorio de artefactos
+    get_writer().draw_circuit(qc, 'grover_4x4', output='mpl')
 
     # Este circuito no es posible ejecutarlo con la tecnología actual
     # ya que el número de qubits es demasiado grande, por eso no se
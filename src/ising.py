@@ -0,0 +1,153 @@
+"""
+Conversión entre el operador de Qiskit y el BQM de D-Wave.
+
+``restrictions`` produce un ``SparsePauliOp`` con términos Z y ZZ, y
+``dwave_sudoku_solver.build_bqm`` un ``dimod.BinaryQuadraticModel``. Ambos son
+el mismo modelo de Ising, E(s) = offset + sum_i h_i s_i + sum_k J_k s_a s_b,
+que ``IsingModel`` guarda en arreglos de NumPy: ``h`` (lineal), ``rows``,
+``cols`` y ``couplings`` (cuadrático en formato COO) y ``offset``, más la
+tabla ``labels`` que asigna a cada índice su variable del BQM o su qubit.
+
+Convención de espín: s = +1 es el autovalor de Z para |0> y s = -1 para |1>,
+es decir s_q = 1 - 2 * b_q con b_q el bit medido en el qubit q.
+"""
+import sys
+
+import numpy as np
+from qiskit.quantum_info import SparsePauliOp
+
+
+class IsingModel:
+    def __init__(self, h, rows, cols, couplings, offset=0.0, labels=None):
+        self.h = np.asarray(h, dtype=float)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.couplings = np.asarray(couplings, dtype=float)
+        self.offset = float(offset)
+        self.labels = list(range(len(self.h))) if labels is None else list(labels)
+        if len(self.labels) != len(self.h):
+            raise ValueError('Debe haber una etiqueta por variable')
+        self.index = {label: i for i, label in enumerate(self.labels)}
+
+    @property
+    def num_variables(self):
+        return len(self.h)
+
+    @property
+    def num_interactions(self):
+        return len(self.couplings)
+
+    def energies(self, spins):
+        """Energía de cada fila de una matriz de espines (muestras x variables)."""
+        spins = np.atleast_2d(np.asarray(spins, dtype=float))
+        quadratic = spins[:, self.rows] * spins[:, self.cols] @ self.couplings
+        return self.offset + spins @ self.h + quadratic
+
+    def bitstring_to_spins(self, bitstring):
+        """Bitstring de Qiskit (qubit 0 a la derecha) a espines en el orden de ``labels``."""
+        bits = np.frombuffer(bitstring.replace(' ', '').encode(), dtype=np.uint8) - ord('0')
+        return 1 - 2 * bits[::-1].astype(int)
+
+    def spins_to_bitstring(self, spins):
+        bits = (1 - np.asarray(spins, dtype=int)) // 2
+        return ''.join(str(b) for b in bits[::-1])
+
+    def sample_to_spins(self, sample):
+        """Muestra de dimod ({etiqueta: espín}) a un vector en el orden de ``labels``."""
+        return np.array([sample[label] for label in self.labels], dtype=int)
+
+    def spins_to_sample(self, spins):
+        return {label: int(s) for label, s in zip(self.labels, spins)}
+
+
+def from_sparse_pauli_op(operator, labels=None):
+    """
+    Modelo de Ising de un ``SparsePauliOp`` con términos I, Z y ZZ.
+
+    La variable q es el qubit q de Qiskit; ``labels`` permite renombrarlas.
+    Los términos de más de dos qubits (p. ej. la codificación binaria de
+    ``cell_encodings``) no tienen equivalente cuadrático y producen ValueError.
+    """
+    if np.any(operator.paulis.x):
+        raise ValueError('El operador debe ser diagonal (solo términos Z e I).')
+    z = operator.paulis.z
+    weights = z.sum(axis=1)
+    if np.any(weights > 2):
+        raise ValueError(f'El operador tiene términos de {int(weights.max())} qubits; '
+                         'un modelo de Ising solo admite términos de uno o dos')
+    # La fase de cada Pauli se incorpora al coeficiente, como en energy.DiagonalHamiltonian
+    coeffs = np.real(operator.coeffs * (-1j) ** operator.paulis.phase)
+
+    h = np.zeros(operator.num_qubits)
+    linear = weights == 1
+    np.add.at(h, np.argmax(z[linear], axis=1), coeffs[linear])
+
+    quadratic = weights == 2
+    pairs = np.nonzero(z[quadratic])[1].reshape(-1, 2)
+    offset = coeffs[weights == 0].sum()
+    return IsingModel(h, pairs[:, 0], pairs[:, 1], coeffs[quadratic], offset, labels)
+
+
+def to_sparse_pauli_op(model):
+    """``SparsePauliOp`` del modelo; la variable i es el qubit i."""
+    terms = [('', [], model.offset)]
+    terms += [('Z', [i], h) for i, h in enumerate(model.h) if h]
+    terms += [('ZZ', [int(a), int(b)], j)
+              for a, b, j in zip(model.rows, model.cols, model.couplings) if j]
+    return SparsePauliOp.from_sparse_list(terms, model.num_variables).simplify()
+
+
+def from_bqm(bqm):
+    """Modelo de Ising de un ``dimod.BinaryQuadraticModel`` (BINARY se convierte a SPIN)."""
+    h, (rows, cols, couplings), offset, labels = bqm.spin.to_numpy_vectors(
+        return_labels=True)
+    return IsingModel(h, rows, cols, couplings, offset, labels)
+
+
+def to_bqm(model):
+    """``dimod.BinaryQuadraticModel`` de espines con las etiquetas del modelo."""
+    import dimod
+
+    return dimod.BinaryQuadraticModel.from_numpy_vectors(
+        model.h, (model.rows, model.cols, model.couplings), model.offset,
+        dimod.SPIN, variable_order=model.labels)
+
+
+def bqm_to_sparse_pauli_op(bqm):
+    """Operador de Qiskit de un BQM; devuelve (operador, etiquetas por qubit)."""
+    model = from_bqm(bqm)
+    return to_sparse_pauli_op(model), model.labels
+
+
+def sparse_pauli_op_to_bqm(operator, labels=None):
+    return to_bqm(from_sparse_pauli_op(operator, labels))
+
+
+if __name__ == '__main__':
+    from energy import DiagonalHamiltonian
+    from restrictions import create_hamiltonian
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    cols = int(sys.argv[2]) if len(sys.argv) > 2 else rows
+
+    H = create_hamiltonian(100, rows, 2, cols)
+    model = from_sparse_pauli_op(H)
+    back = to_sparse_pauli_op(model)
+    print(f'{H.num_qubits} qubits, {len(H)} términos -> '
+          f'{model.num_variables} variables, {model.num_interactions} acoplamientos')
+    print(f'Ida y vuelta igual: {back.equiv(H.simplify())}')
+
+    # Las energías coinciden muestra a muestra
+    rng = np.random.default_rng(0)
+    bits = rng.integers(0, 2, size=(1000, H.num_qubits))
+    spins = 1 - 2 * bits
+    print('Energías iguales:', np.allclose(model.energies(spins), DiagonalHamiltonian(H).energies(bits)))
+
+    try:
+        import dimod  # noqa: F401
+    except ImportError:
+        print('dimod no está instalado: se omite la conversión a BQM')
+    else:
+        bqm = to_bqm(model)
+        print(f'BQM: {bqm.num_variables} variables, {bqm.num_interactions} interacciones; '
+              f'ida y vuelta igual: {to_sparse_pauli_op(from_bqm(bqm)).equiv(back)}')
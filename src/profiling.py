@@ -0,0 +1,207 @@
+"""
+Perfilado por etapas de los solucionadores.
+
+Cada script envuelve sus etapas (crear el Hamiltoniano, construir el ansatz,
+transpilar, simular, decodificar...) en ``with stage('nombre'):``.
+Por defecto el perfilado está desactivado y ``stage`` no mide nada. Se activa
+con ``configure(enabled=True)``, con ``solve.py --profile`` o con la variable
+de entorno ``SUDOKU_PROFILE`` (``1`` activa la tabla y cualquier otro valor es
+además la ruta de la traza).
+
+Por cada ejecución de una etapa se registran el tiempo de pared, el tiempo de
+CPU del proceso, el pico de memoria reservada por Python (``tracemalloc``) y la
+variación del RSS (``psutil``). Las etapas se pueden anidar. Al terminar se
+imprime una tabla agregada por ruta de etapas y, si se pidió, se escribe una
+traza: en formato Chrome (``chrome://tracing``, Perfetto o speedscope) o, si la
+ruta termina en ``.folded``, en pilas colapsadas para ``flamegraph.pl``.
+"""
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - psutil está en requirements.txt
+    psutil = None
+
+
+def _rss():
+    if psutil is None:
+        return 0
+    return psutil.Process().memory_info().rss
+
+
+class _Frame:
+    __slots__ = ('name', 'path', 'start', 'cpu', 'rss', 'traced', 'peak')
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+
+
+class Profiler:
+    def __init__(self, enabled=False, trace=None, trace_memory=True):
+        self.enabled = enabled
+        self.trace = trace
+        self.trace_memory = trace_memory
+        self.records = []
+        self._stack = []
+        self._origin = time.perf_counter()
+        self._started_tracemalloc = False
+
+    def start(self):
+        if self.enabled and self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self):
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def stage(self, name):
+        """Contexto que mide la etapa ``name``; sin efecto si el perfilado está desactivado."""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._measure(name)
+
+    @contextlib.contextmanager
+    def _measure(self, name):
+        parent = self._stack[-1] if self._stack else None
+        frame = _Frame(name, name if parent is None else f'{parent.path};{name}')
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            traced, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent.peak = max(parent.peak, peak)
+            # El pico de tracemalloc es global: se reinicia y el del padre se guarda aparte
+            tracemalloc.reset_peak()
+            frame.traced, frame.peak = traced, traced
+        self._stack.append(frame)
+        frame.rss = _rss()
+        frame.cpu = time.process_time()
+        frame.start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            cpu = time.process_time() - frame.cpu
+            rss = _rss() - frame.rss
+            peak = 0
+            if tracing and tracemalloc.is_tracing():
+                frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+                peak = frame.peak - frame.traced
+                if parent is not None:
+                    parent.peak = max(parent.peak, frame.peak)
+                tracemalloc.reset_peak()
+            self._stack.pop()
+            self.records.append({'stage': frame.path, 'name': name, 'depth': len(self._stack),
+                                 'start': frame.start - self._origin, 'wall': end - frame.start,
+                                 'cpu': cpu, 'peak': peak, 'rss': rss})
+
+    def summary(self):
+        """Totales por ruta de etapas, en el orden en que cada etapa apareció por primera vez."""
+        totals = {}
+        for record in sorted(self.records, key=lambda record: record['start']):
+            total = totals.setdefault(record['stage'], {
+                'stage': record['stage'], 'depth': record['depth'], 'calls': 0,
+                'wall': 0.0, 'cpu': 0.0, 'peak': 0, 'rss': 0})
+            total['calls'] += 1
+            total['wall'] += record['wall']
+            total['cpu'] += record['cpu']
+            total['peak'] = max(total['peak'], record['peak'])
+            total['rss'] += record['rss']
+        return list(totals.values())
+
+    def format_table(self):
+        lines = [f"{'etapa':<36} {'llamadas':>8} {'pared (s)':>10} {'CPU (s)':>9} "
+                 f"{'pico (MB)':>10} {'ΔRSS (MB)':>10}"]
+        for total in self.summary():
+            label = '  ' * total['depth'] + total['stage'].rsplit(';', 1)[-1]
+            lines.append(f"{label:<36} {total['calls']:>8} {total['wall']:>10.3f} "
+                         f"{total['cpu']:>9.3f} {total['peak'] / 2**20:>10.2f} "
+                         f"{total['rss'] / 2**20:>10.2f}")
+        return '\n'.join(lines)
+
+    def write_trace(self, path):
+        """Escribe la traza en formato Chrome o, con extensión ``.folded``, en pilas colapsadas."""
+        if path.endswith('.folded'):
+            # Tiempo propio de cada ruta en microsegundos: el total menos el de sus hijas
+            own = {}
+            for record in self.records:
+                microseconds = round(record['wall'] * 1e6)
+                own[record['stage']] = own.get(record['stage'], 0) + microseconds
+                if ';' in record['stage']:
+                    parent = record['stage'].rsplit(';', 1)[0]
+                    own[parent] = own.get(parent, 0) - microseconds
+            with open(path, 'w', encoding='utf-8') as f:
+                for stack, value in own.items():
+                    f.write(f'{stack} {max(value, 0)}\n')
+            return path
+
+        events = [{'name': record['name'], 'ph': 'X', 'pid': os.getpid(), 'tid': 0,
+                   'ts': record['start'] * 1e6, 'dur': record['wall'] * 1e6,
+                   'args': {'cpu_s': record['cpu'], 'peak_bytes': record['peak'],
+                            'rss_delta_bytes': record['rss']}}
+                  for record in self.records]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return path
+
+    def report(self, file=sys.stderr):
+        """Imprime la tabla y escribe la traza, si hay etapas registradas."""
+        if not self.enabled or not self.records:
+            return
+        print(self.format_table(), file=file)
+        if self.trace:
+            print(f'Traza de perfilado en {self.write_trace(self.trace)}', file=file)
+
+
+_profiler = None
+
+
+def configure(enabled=False, trace=None, trace_memory=True):
+    """Reemplaza el perfilador global. ``trace`` implica ``enabled``."""
+    global _profiler
+    if _profiler is not None:
+        _profiler.stop()
+    _profiler = Profiler(enabled or trace is not None, trace, trace_memory)
+    _profiler.start()
+    return _profiler
+
+
+def get_profiler():
+    if _profiler is None:
+        setting = os.environ.get('SUDOKU_PROFILE')
+        configure(setting not in (None, '', '0'),
+                  None if setting in (None, '', '0', '1') else setting)
+    return _profiler
+
+
+def stage(name):
+    return get_profiler().stage(name)
+
+
+def profiled(name=None):
+    """Decorador que mide cada llamada a la función como la etapa ``name`` (o su nombre)."""
+    def decorator(function):
+        label = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with get_profiler().stage(label):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@atexit.register
+def _report():
+    if _profiler is not None:
+        _profiler.report()
+        _profiler.stop()
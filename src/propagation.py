@@ -0,0 +1,279 @@
+"""
+Solucionador clásico por propagación de restricciones, vectorizado sobre lotes.
+
+Los candidatos de N tableros de n x n se guardan en un arreglo (N, n, n) de
+máscaras de bits: el bit d de una celda indica que el dígito d + 1 todavía es
+posible. ``propagate`` aplica a todos los tableros a la vez, hasta que ninguno
+cambie:
+
+- singles desnudos: el dígito de una celda con un solo candidato se elimina de
+  las demás celdas de su fila, columna y subgrilla;
+- singles ocultos: si un dígito solo cabe en una celda de una unidad, esa
+  celda toma ese dígito.
+
+Un tablero termina resuelto (todas las celdas con un candidato), en
+contradicción (una celda sin candidatos, un dígito repetido o sin lugar en una
+unidad) o estancado. Solo los estancados pasan a ``_branch``: búsqueda en
+profundidad por tablero que elige la celda con menos candidatos; las búsquedas
+de todos los estancados avanzan juntas y sus hijos se propagan en un lote.
+``solve_many`` reparte bloques de tableros entre procesos.
+"""
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Procesos de solve_many (None: uno por núcleo) y tableros por bloque
+PROCESSES = None
+CHUNK_SIZE = 2048
+# Las máscaras son uint32: hasta 25x25
+MAX_SIZE = 25
+
+SOLVED = 1
+STUCK = 0
+CONTRADICTION = -1
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(2**16)], dtype=np.uint8)
+
+
+def popcount(masks):
+    masks = np.asarray(masks, dtype=np.uint32)
+    return _POPCOUNT[masks & 0xFFFF] + _POPCOUNT[masks >> 16]
+
+
+def _check_size(n):
+    if n > MAX_SIZE or math.isqrt(n) ** 2 != n:
+        raise ValueError(f'El tamaño del tablero debe ser un cuadrado perfecto de hasta '
+                         f'{MAX_SIZE}, se recibió {n}')
+
+
+def candidates(boards):
+    """Máscaras (N, n, n) de candidatos: la pista sola o todos los dígitos si la celda está vacía."""
+    boards = np.asarray(boards)
+    n = boards.shape[-1]
+    _check_size(n)
+    if boards.size and (boards.min() < 0 or boards.max() > n):
+        raise ValueError(f'Los valores deben estar entre 0 y {n}')
+    full = np.uint32((1 << n) - 1)
+    shift = np.maximum(boards.astype(np.int64) - 1, 0)
+    return np.where(boards > 0, np.left_shift(1, shift).astype(np.uint32), full)
+
+
+def to_boards(masks):
+    """Dígitos 1..n de las celdas con un solo candidato; 0 en las demás."""
+    single = popcount(masks) == 1
+    digits = np.log2(np.where(single, masks, 1)).astype(np.uint8) + 1
+    return np.where(single, digits, 0).astype(np.uint8)
+
+
+def _boxes(values):
+    """(N, n, n, ...) -> (N, subgrillas, celdas de la subgrilla, ...); es su propia inversa."""
+    N, n = values.shape[:2]
+    b = math.isqrt(n)
+    rest = values.shape[3:]
+    values = values.reshape(N, b, b, b, b, *rest).swapaxes(2, 3)
+    return values.reshape(N, n, n, *rest)
+
+
+def _round(masks, hidden=True):
+    """
+    Una pasada de singles desnudos y, si ``hidden``, ocultos.
+
+    Devuelve (máscaras, contradicción).
+    """
+    N, n, _ = masks.shape
+    single = (masks & (masks - 1)) == 0
+    singles = np.where(single, masks, 0)
+
+    # Singles desnudos; dos singles con el mismo dígito en una unidad son contradicción
+    seen = []
+    contradiction = np.zeros(N, dtype=bool)
+    for units, placed in ((singles, single), (singles.swapaxes(1, 2), single.swapaxes(1, 2)),
+                          (_boxes(singles), _boxes(single))):
+        union = np.bitwise_or.reduce(units, axis=2)
+        contradiction |= np.any(popcount(union) != placed.sum(axis=2), axis=1)
+        seen.append(union)
+    taken = seen[0][:, :, None] | seen[1][:, None, :] | _boxes(
+        np.broadcast_to(seen[2][:, :, None], (N, n, n)))
+    masks = np.where(single, masks, masks & ~taken)
+    if not hidden:
+        return masks, contradiction | np.any(masks == 0, axis=(1, 2))
+
+    # Singles ocultos: dígitos con un único lugar en su fila, columna o subgrilla
+    bits = ((masks[..., None] >> np.arange(n, dtype=np.uint32)) & 1).astype(np.uint8)
+    places = (bits.sum(axis=2), bits.sum(axis=1), _boxes(bits).sum(axis=2))
+    contradiction |= np.any([np.any(count == 0, axis=(1, 2)) for count in places], axis=0)
+    unique = ((places[0] == 1)[:, :, None, :] | (places[1] == 1)[:, None, :, :]
+              | _boxes(np.broadcast_to((places[2] == 1)[:, :, None, :], (N, n, n, n))))
+    hidden = (bits.astype(bool) & unique) @ (1 << np.arange(n, dtype=np.int64))
+    hidden = hidden.astype(np.uint32)
+    # Una celda no puede ser el único lugar de dos dígitos distintos
+    contradiction |= np.any(popcount(hidden) > 1, axis=(1, 2))
+    masks = np.where(hidden != 0, hidden, masks)
+    contradiction |= np.any(masks == 0, axis=(1, 2))
+    return masks, contradiction
+
+
+def propagate(masks):
+    """
+    Propaga hasta el punto fijo todos los tableros del lote.
+
+    Devuelve (máscaras, estado) con estado ``SOLVED``, ``STUCK`` o
+    ``CONTRADICTION`` por tablero. Solo se vuelven a procesar los tableros que
+    cambiaron en la pasada anterior.
+    """
+    masks = np.array(masks, dtype=np.uint32)
+    status = np.full(len(masks), STUCK)
+    active = np.arange(len(masks))
+    while len(active):
+        updated, contradiction = _round(masks[active])
+        changed = np.any(updated != masks[active], axis=(1, 2))
+        masks[active] = updated
+        status[active[contradiction]] = CONTRADICTION
+        active = active[changed & ~contradiction]
+    done = (status == STUCK) & np.all(popcount(masks) == 1, axis=(1, 2))
+    status[done] = SOLVED
+    return masks, status
+
+
+def _branch(masks, limit=1):
+    """
+    Búsqueda en profundidad sobre cada tablero estancado de ``masks``.
+
+    Cada tablero tiene su propia pila; en cada paso se toma el tope de todas las
+    pilas, se ramifica la celda con menos candidatos de cada estado y todos los
+    hijos se propagan en un solo lote. La búsqueda de un tablero termina al
+    encontrar ``limit`` soluciones (con ``limit=2`` se verifica la unicidad) o
+    al agotar su pila. Devuelve (primera solución o None por tablero, número de
+    soluciones halladas, nodos expandidos por tablero, nodos expandidos hasta
+    la primera solución o, sin solución, todos).
+    """
+    K, n, _ = masks.shape
+    stacks = [[state] for state in masks]
+    solutions = [None] * K
+    found = np.zeros(K, dtype=np.int64)
+    nodes = np.zeros(K, dtype=np.int64)
+    first_nodes = np.zeros(K, dtype=np.int64)
+    pending = list(range(K))
+    while pending:
+        states = np.array([stacks[i].pop() for i in pending])
+        nodes[pending] += 1
+        counts = popcount(states).reshape(len(states), -1).astype(np.int64)
+        cells = np.argmin(np.where(counts > 1, counts, n + 1), axis=1)
+        branches = states.reshape(len(states), -1)[np.arange(len(states)), cells]
+        parent, digit = np.nonzero((branches[:, None] >> np.arange(n, dtype=np.uint32)) & 1)
+        children = states[parent].reshape(len(parent), -1)
+        children[np.arange(len(parent)), cells[parent]] = np.left_shift(1, digit)
+        children, status = propagate(children.reshape(-1, n, n))
+
+        for k, board in enumerate(pending):
+            own = np.flatnonzero(parent == k)
+            solved = own[status[own] == SOLVED]
+            if len(solved) and solutions[board] is None:
+                solutions[board] = children[solved[0]]
+                first_nodes[board] = nodes[board]
+            found[board] += len(solved)
+            if found[board] >= limit:
+                stacks[board] = []
+            else:
+                # El primer dígito se explora primero
+                stacks[board].extend(children[own[status[own] == STUCK]][::-1])
+        pending = [board for board in pending if stacks[board]]
+    unsolved = found == 0
+    first_nodes[unsolved] = nodes[unsolved]
+    return solutions, np.minimum(found, limit), nodes, first_nodes
+
+
+def solve_batch(boards):
+    """
+    Resuelve un lote (N, n, n) de sudokus.
+
+    Devuelve (soluciones, estadísticas): las soluciones son un arreglo (N, n, n)
+    de uint8 con ceros en los tableros sin solución.
+    """
+    masks, status = propagate(candidates(boards))
+    stats = {'boards': len(masks), 'propagated': int(np.sum(status == SOLVED)),
+             'branched': 0, 'nodes': 0, 'unsolvable': int(np.sum(status == CONTRADICTION))}
+    stuck = np.flatnonzero(status == STUCK)
+    if len(stuck):
+        solutions, _, nodes, _ = _branch(masks[stuck])
+        stats['nodes'] = int(nodes.sum())
+        for i, solved in zip(stuck, solutions):
+            if solved is None:
+                stats['unsolvable'] += 1
+                masks[i] = 0
+            else:
+                stats['branched'] += 1
+                masks[i] = solved
+    masks[status == CONTRADICTION] = 0
+    return to_boards(masks), stats
+
+
+def _merge_stats(stats_list):
+    return {key: sum(stats[key] for stats in stats_list) for key in stats_list[0]}
+
+
+def solve_many(boards, processes=PROCESSES, chunk_size=CHUNK_SIZE):
+    """``solve_batch`` por bloques de ``chunk_size`` tableros repartidos entre procesos."""
+    boards = np.asarray(boards, dtype=np.uint8)
+    chunks = [boards[start:start + chunk_size] for start in range(0, len(boards), chunk_size)]
+    processes = min(processes or os.cpu_count() or 1, len(chunks))
+    if processes <= 1:
+        results = [solve_batch(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(solve_batch, chunks))
+    solutions, stats_list = zip(*results)
+    return np.concatenate(solutions), _merge_stats(stats_list)
+
+
+def solve_board(matrix):
+    """Resuelve un tablero como lista de listas; devuelve None si no tiene solución."""
+    solutions, _ = solve_batch(np.array([matrix]))
+    return None if not solutions[0].any() else solutions[0].tolist()
+
+
+if __name__ == '__main__':
+    import copy
+    import tempfile
+
+    from difficulty import LEVELS, generate
+    from puzzles import PuzzleWriter, iter_puzzle_batches
+    from sudoku_board import valid_boards
+    from sudoku_generator import fill_rest_of_board
+
+    processes = int(sys.argv[2]) if len(sys.argv) > 2 else PROCESSES
+    if len(sys.argv) > 1:
+        filename = sys.argv[1]
+    else:
+        # Sin archivo: corpus reproducible de 9x9 con solución única, 100 por nivel
+        filename = os.path.join(tempfile.mkdtemp(), 'corpus.sdk')
+        with PuzzleWriter(filename, 9) as writer:
+            for level in LEVELS:
+                writer.write_batch(generate(9, level, 100, processes=processes, seed=12345)[0])
+
+    puzzles = np.concatenate(list(iter_puzzle_batches(filename)))
+    print(f'{len(puzzles)} sudokus de {puzzles.shape[1]}x{puzzles.shape[2]} en {filename}')
+
+    start = time.perf_counter()
+    solutions, stats = solve_many(puzzles, processes)
+    elapsed = time.perf_counter() - start
+    clues = puzzles > 0
+    correct = valid_boards(solutions) & np.all((solutions == puzzles) | ~clues, axis=(1, 2))
+    correct &= solutions.all(axis=(1, 2))
+    print(f'{elapsed:.2f} s, {len(puzzles) / elapsed:,.0f} sudokus/s '
+          f'({processes or os.cpu_count()} procesos); correctos: {int(correct.sum())}')
+    print(f"Solo propagación: {stats['propagated']}, con ramificación: {stats['branched']} "
+          f"({stats['nodes']} nodos), sin solución: {stats['unsolvable']}")
+
+    # Backtracking de referencia sobre una muestra repartida en todo el corpus
+    sample = puzzles[::max(1, len(puzzles) // 40)].tolist()
+    start = time.perf_counter()
+    for puzzle in sample:
+        fill_rest_of_board(copy.deepcopy(puzzle), len(puzzle))
+    elapsed = time.perf_counter() - start
+    print(f'fill_rest_of_board: {len(sample) / elapsed:,.1f} sudokus/s '
+          f'en una muestra de {len(sample)}')
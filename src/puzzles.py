@@ -0,0 +1,266 @@
+"""
+Lectura y escritura de sudokus.
+
+Además de ``get_matrix`` (un tablero en el formato de problem.txt) hay un
+lector en flujo para corpus grandes en tres formatos:
+
+- ``grid``: el formato de problem.txt, n líneas de n enteros separados por
+  espacios por tablero (las líneas en blanco entre tableros se ignoran).
+- ``line``: un tablero por línea, n * n caracteres con '0' o '.' en las celdas
+  vacías (hasta 9x9).
+- ``packed``: binario con una cabecera de 8 bytes (``PACKED_MAGIC``, versión,
+  n y dos bytes reservados) y luego un registro de ceil(n * n / 2) bytes por
+  tablero, 4 bits por celda con la primera celda en el nibble alto. El archivo
+  se lee con ``numpy.memmap``, así que un millón de tableros se decodifica por bloques
+  sin cargarlo entero en memoria.
+"""
+import math
+import os
+import sys
+
+
+def get_matrix(filename):
+    """Return a list of lists containing the content of the input text file.
+
+    Note: each line of the text file corresponds to a list. Each item in
+    the list is from splitting the line of text by the whitespace ' '.
+    """
+    with open(filename, "r") as f:
+        content = f.readlines()
+
+    lines = []
+    for line in content:
+        new_line = line.rstrip()    # Strip any whitespace after last value
+
+        if new_line:
+            new_line = list(map(int, new_line.split(' ')))
+            lines.append(new_line)
+
+    return lines
+
+
+def is_correct(matrix):
+    """Verify that the matrix satisfies the Sudoku constraints.
+
+    Args:
+      matrix(list of lists): list contains 'n' lists, where each of the 'n'
+        lists contains 'n' digits.
+    """
+    n = len(matrix)        # Number of rows/columns
+    m = int(math.sqrt(n))  # Number of subsquare rows/columns
+    unique_digits = set(range(1, n+1))  # Digits in a solution
+
+    # Verifying rows
+    for row in matrix:
+        if set(row) != unique_digits:
+            print("Error in row: ", row)
+            return False
+
+    # Verifying columns
+    for j in range(n):
+        col = [matrix[i][j] for i in range(n)]
+        if set(col) != unique_digits:
+            print("Error in col: ", col)
+            return False
+
+    # Verifying subsquares
+    subsquare_coords = [(i, j) for i in range(m) for j in range(m)]
+    for r_scalar in range(m):
+        for c_scalar in range(m):
+            subsquare = [matrix[i + r_scalar * m][j + c_scalar * m] for i, j
+                         in subsquare_coords]
+            if set(subsquare) != unique_digits:
+                print("Error in sub-square: ", subsquare)
+                return False
+
+    return True
+
+
+PACKED_MAGIC = b'SDK4'
+PACKED_VERSION = 1
+PACKED_HEADER_SIZE = 8
+FORMATS = ('grid', 'line', 'packed')
+
+
+def _record_size(n):
+    return (n * n + 1) // 2
+
+
+def detect_format(filename):
+    """Formato de un archivo según su cabecera o su primera línea no vacía."""
+    with open(filename, 'rb') as f:
+        if f.read(len(PACKED_MAGIC)) == PACKED_MAGIC:
+            return 'packed'
+        f.seek(0)
+        for line in f:
+            line = line.strip()
+            if line:
+                return 'grid' if b' ' in line else 'line'
+    return 'line'
+
+
+def _iter_grid(f, batch_size):
+    import numpy as np
+
+    batch, board, n = [], [], None
+    for line in f:
+        line = line.strip()
+        if not line:
+            continue
+        row = list(map(int, line.split()))
+        if n is None:
+            n = len(row)
+        board.append(row)
+        if len(board) == n:
+            batch.append(board)
+            board = []
+            if len(batch) == batch_size:
+                yield np.array(batch, dtype=np.uint8)
+                batch = []
+    if board:
+        raise ValueError(f'Tablero incompleto al final del archivo: {len(board)} de {n} filas')
+    if batch:
+        yield np.array(batch, dtype=np.uint8)
+
+
+def _iter_line(f, batch_size):
+    import numpy as np
+
+    def decode(lines):
+        size = len(lines[0])
+        n = math.isqrt(size)
+        if n * n != size or any(len(line) != size for line in lines):
+            raise ValueError('Todas las líneas deben tener n * n caracteres')
+        cells = np.frombuffer(b''.join(lines).replace(b'.', b'0'), dtype=np.uint8) - ord('0')
+        return cells.reshape(-1, n, n)
+
+    lines = []
+    for line in f:
+        line = line.strip()
+        if line:
+            lines.append(line)
+            if len(lines) == batch_size:
+                yield decode(lines)
+                lines = []
+    if lines:
+        yield decode(lines)
+
+
+def _iter_packed(f, batch_size):
+    import numpy as np
+
+    header = f.read(PACKED_HEADER_SIZE)
+    if len(header) < PACKED_HEADER_SIZE or header[:4] != PACKED_MAGIC:
+        raise ValueError('El archivo no tiene la cabecera del formato packed')
+    if header[4] != PACKED_VERSION:
+        raise ValueError(f'Versión de formato packed no soportada: {header[4]}')
+    n = header[5]
+    record = _record_size(n)
+    size = os.fstat(f.fileno()).st_size - PACKED_HEADER_SIZE
+    if size % record:
+        raise ValueError('El archivo packed está truncado')
+    if size == 0:
+        return
+
+    # np.memmap mantiene el mapeo abierto mientras vivan los bloques decodificados
+    data = np.memmap(f, dtype=np.uint8, mode='r', offset=PACKED_HEADER_SIZE)
+    for start in range(0, size // record, batch_size):
+        chunk = data[start * record:(start + batch_size) * record].reshape(-1, record)
+        cells = np.empty((len(chunk), 2 * record), dtype=np.uint8)
+        cells[:, 0::2] = chunk >> 4
+        cells[:, 1::2] = chunk & 0x0F
+        yield cells[:, :n * n].reshape(-1, n, n)
+
+
+def iter_puzzle_batches(filename, format=None, batch_size=4096):
+    """Genera arreglos (tableros x n x n) de uint8 con hasta ``batch_size`` tableros cada uno."""
+    format = format or detect_format(filename)
+    if format not in FORMATS:
+        raise ValueError(f'Formato desconocido: {format}. Opciones: {FORMATS}')
+    mode = 'r' if format == 'grid' else 'rb'
+    with open(filename, mode) as f:
+        reader = {'grid': _iter_grid, 'line': _iter_line, 'packed': _iter_packed}[format]
+        yield from reader(f, batch_size)
+
+
+def iter_puzzles(filename, format=None, batch_size=4096):
+    """Genera los tableros del archivo uno a uno, como listas de listas."""
+    for batch in iter_puzzle_batches(filename, format, batch_size):
+        yield from batch.tolist()
+
+
+class PuzzleWriter:
+    """
+    Escritor en flujo para los formatos de ``iter_puzzles``.
+
+    Con ``append=True`` los tableros se agregan al final de un archivo
+    existente; en el formato packed el lado del tablero debe coincidir.
+    """
+
+    def __init__(self, filename, n, format='packed', append=False):
+        if format not in FORMATS:
+            raise ValueError(f'Formato desconocido: {format}. Opciones: {FORMATS}')
+        if format == 'packed' and n > 15 or format == 'line' and n > 9:
+            raise ValueError(f'El formato {format} no admite tableros de {n}x{n}')
+        self.n = n
+        self.format = format
+        self.count = 0
+        exists = append and os.path.exists(filename) and os.path.getsize(filename) > 0
+        if format == 'packed' and exists:
+            with open(filename, 'rb') as f:
+                header = f.read(PACKED_HEADER_SIZE)
+            if header[:4] != PACKED_MAGIC or header[5] != n:
+                raise ValueError(f'{filename} no es un archivo packed de {n}x{n}')
+        self._file = open(filename, 'ab' if append else 'wb')
+        if format == 'packed' and not exists:
+            self._file.write(PACKED_MAGIC + bytes([PACKED_VERSION, n, 0, 0]))
+
+    def write_batch(self, boards):
+        """Escribe un arreglo o lista de tableros (tableros x n x n)."""
+        import numpy as np
+
+        cells = np.asarray(boards, dtype=np.uint8).reshape(-1, self.n * self.n)
+        if self.format == 'packed':
+            if cells.shape[1] % 2:
+                cells = np.concatenate([cells, np.zeros((len(cells), 1), np.uint8)], axis=1)
+            self._file.write((cells[:, 0::2] << 4 | cells[:, 1::2]).tobytes())
+        elif self.format == 'line':
+            text = np.concatenate([cells + ord('0'), np.full((len(cells), 1), ord('\n'),
+                                                           dtype=np.uint8)], axis=1)
+            self._file.write(text.tobytes())
+        else:
+            lines = []
+            for board in cells.reshape(-1, self.n, self.n).tolist():
+                lines.extend(' '.join(map(str, row)) for row in board)
+                lines.append('')
+            self._file.write(('\n'.join(lines) + '\n').encode())
+        self.count += len(cells)
+
+    def write(self, board):
+        self.write_batch([board])
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == '__main__':
+    import time
+
+    if len(sys.argv) < 2:
+        print(f'Usage: python {sys.argv[0]} <archivo> [<formato>]')
+        sys.exit(1)
+
+    filename = sys.argv[1]
+    format = sys.argv[2] if len(sys.argv) > 2 else None
+    start = time.perf_counter()
+    count = sum(len(batch) for batch in iter_puzzle_batches(filename, format))
+    elapsed = time.perf_counter() - start
+    megabytes = os.path.getsize(filename) / 1e6
+    print(f'{count} tableros ({format or detect_format(filename)}) en {elapsed:.2f} s: '
+          f'{count / elapsed:,.0f} tableros/s, {megabytes / elapsed:.1f} MB/s')
@@ -1,17 +1,36 @@
+import time
+
+import numpy as np
+
 from qiskit import Aer
-from qiskit.utils import QuantumInstance
-from qiskit.algorithms import QAOA
 from qiskit.algorithms.optimizers import COBYLA
+from qiskit.circuit.library import QAOAAnsatz
 from qiskit.opflow import PauliSumOp
 
 
+from batched_objective import BatchedObjective
+from early_stopping import EarlyStopping, minimize_until_valid
+from profiling import stage
+from repair import repair_samples
 from restrictions import create_hamiltonian
+from run_store import RUN_STORE_PATH, RunStore
+from sudoku_board import decode_board, is_valid_board
+from telemetry import JsonlWriter, format_summary, read_jsonl, summarize
 
 QUBITS_PER_CELL = 4
 SUDOKU_ROWS = 2
 SUDOKU_COLS = 2
 ALPHA = 100
 TOTAL_QUBITS = SUDOKU_COLS * SUDOKU_ROWS, QUBITS_PER_CELL
+QAOA_REPS = 1
+# Probabilidad mínima de un tablero válido para detener COBYLA antes de tiempo (None desactiva)
+EARLY_STOP_THRESHOLD = 0.05
+# Número de bitstrings más medidos que se intentan reparar (0 desactiva)
+REPAIR_TOP_N = 20
+# Base SQLite donde se agrega cada ejecución (None desactiva)
+RUN_STORE = RUN_STORE_PATH
+# Archivo JSONL con la telemetría de cada evaluación (None desactiva)
+TELEMETRY = None
 
 
 def convert_to_paulisumop(sparse_op):
@@ -26,43 +45,98 @@ def store_intermediate_result(eval_count, parameters, mean, std):
     optimal_params = parameters
 
 
-if __name__ == '__main__':
-    H = create_hamiltonian(ALPHA, SUDOKU_ROWS, QUBITS_PER_CELL, SUDOKU_COLS)
-
-    H_converted = convert_to_paulisumop(H)
+def solve(rows=SUDOKU_ROWS, cols=SUDOKU_COLS):
+    """Resuelve un tablero vacío de rows x cols con QAOA y devuelve el tablero decodificado."""
+    start = time.perf_counter()
+    with stage('create_hamiltonian'):
+        H = create_hamiltonian(ALPHA, rows, QUBITS_PER_CELL, cols)
 
     backend = Aer.get_backend('qasm_simulator')
 
-    quantum_instance = QuantumInstance(backend, shots=20000)
-
     optimizer = COBYLA(maxiter=500)
 
-    optimal_params = []
-    qaoa = QAOA(optimizer, quantum_instance=quantum_instance,
-                callback=store_intermediate_result)
-
-    result = qaoa.compute_minimum_eigenvalue(H_converted)
-
-    counts = result.eigenstate
+    with stage('ansatz'):
+        ansatz = QAOAAnsatz(H, reps=QAOA_REPS).decompose()
+    telemetry = JsonlWriter(TELEMETRY) if TELEMETRY else None
+    try:
+        objective = BatchedObjective(ansatz, H, backend, shots=20000, telemetry=telemetry)
+        initial_point = np.random.uniform(0, np.pi, ansatz.num_parameters)
+
+        with stage('optimize'):
+            if EARLY_STOP_THRESHOLD is None:
+                result = optimizer.minimize(objective, initial_point)
+            else:
+                stopper = EarlyStopping(rows, cols, QUBITS_PER_CELL,
+                                        threshold=EARLY_STOP_THRESHOLD)
+                found, result = minimize_until_valid(
+                    optimizer, objective, initial_point, stopper)
+    finally:
+        # Cerrar el archivo aunque la optimización falle, para no perder eventos
+        if telemetry is not None:
+            telemetry.close()
+    if telemetry is not None:
+        print(format_summary(summarize(read_jsonl(TELEMETRY))))
+
+    if result is None:
+        print(f"Tablero válido {found['board']} con probabilidad "
+              f"{found['probability']:.3f} tras {found['iterations']} iteraciones "
+              f"en {found['seconds']:.2f} s")
+        optimal_params = found['parameters']
+    else:
+        optimal_params = result.x
+
+    optimize_seconds = time.perf_counter() - start
+    with stage('measure'):
+        counts = objective.run_counts(optimal_params)[0]
 
     # La configuración de qubits más probable es nuestra solución
     solution = max(counts, key=counts.get)  # type: ignore
 
+    # Si no es un tablero válido, reparar las muestras más frecuentes
+    if REPAIR_TOP_N and not is_valid_board(
+            decode_board(solution, rows, cols, QUBITS_PER_CELL)):
+        with stage('repair'):
+            repaired = repair_samples(counts, H, rows, cols, QUBITS_PER_CELL,
+                                      top_n=REPAIR_TOP_N)
+        if repaired:
+            print(f"Reparado con {repaired[0]['steps']} cambios de bit desde "
+                  f"{repaired[0]['original']}")
+            solution = repaired[0]['bitstring']
+
     print(solution)
 
     # Decodificar la solución en formato de Sudoku
-    sudoku_solution = []
-
-    for i in range(SUDOKU_ROWS):
-        row = []
-        for j in range(SUDOKU_COLS):
-            idx = i * SUDOKU_COLS + j
-            number = solution[idx * QUBITS_PER_CELL:idx *
-                              QUBITS_PER_CELL + QUBITS_PER_CELL]
-            number = int(number, 2)
-            row.append(number)
-        sudoku_solution.append(row)
+    with stage('decode'):
+        sudoku_solution = []
+
+        for i in range(rows):
+            row = []
+            for j in range(cols):
+                idx = i * cols + j
+                number = solution[idx * QUBITS_PER_CELL:idx *
+                                  QUBITS_PER_CELL + QUBITS_PER_CELL]
+                number = int(number, 2)
+                row.append(number)
+            sudoku_solution.append(row)
+
+    if RUN_STORE:
+        config = {'alpha': ALPHA, 'qubits_per_cell': QUBITS_PER_CELL, 'qaoa_reps': QAOA_REPS,
+                  'early_stop_threshold': EARLY_STOP_THRESHOLD, 'repair_top_n': REPAIR_TOP_N}
+        energy, _ = objective.hamiltonian.expectation(counts)
+        with stage('store'), RunStore(RUN_STORE) as store:
+            run_id = store.append(
+                'qaoa', config, hamiltonian=H, rows=rows, cols=cols, energy=energy,
+                valid=is_valid_board(sudoku_solution), board=sudoku_solution,
+                parameters=optimal_params, trace=objective.history,
+                evaluations=objective.num_evaluations, jobs=objective.num_jobs,
+                total_shots=objective.total_shots, seconds=time.perf_counter() - start,
+                timings={'optimize': optimize_seconds})
+        print(f'Ejecución {run_id} guardada en {RUN_STORE}')
+
+    return sudoku_solution
 
+
+if __name__ == '__main__':
     # Imprimir la solución
-    for row in sudoku_solution:
+    for row in solve():
         print(row)
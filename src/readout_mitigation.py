@@ -0,0 +1,291 @@
+"""
+Mitigación de errores de lectura con calibración por qubit.
+
+En un backend ruidoso (o un simulador con modelo de ruido) cada qubit se lee
+mal con cierta probabilidad: P(1|0) = p01 y P(0|1) = p10. Con el modelo
+tensorizado, que supone errores independientes entre qubits, la matriz de
+asignación de n qubits es el producto tensorial de n matrices de 2x2. Alcanza
+con dos circuitos de calibración (todos en 0 y todos en 1) sin importar el
+número de qubits, y la inversa se aplica qubit por qubit, sin formar nunca la
+matriz de 2^n x 2^n.
+
+``ReadoutCalibration.correct`` devuelve los conteos corregidos sobre los
+bitstrings medidos: la inversa es exacta en esos bitstrings y la masa que
+asigna al resto (casi siempre negativa) se agrupa en una sola entrada. Esa
+cuasi-distribución se proyecta a la distribución de probabilidad más cercana
+(Smolin, Gambetta y Smith, 2012) y la entrada agrupada se descarta; así la
+negatividad de los bitstrings no medidos se descuenta de los medidos en lugar
+de renormalizarlos, lo que sesgaría la corrección con pocos shots. Los
+conteos corregidos sirven tal cual para la energía
+(``DiagonalHamiltonian.expectation``), ``EarlyStopping`` y la decodificación.
+
+``get_calibration`` calibra una vez por backend y número de qubits y guarda el
+resultado en memoria y en ``CALIBRATION_CACHE_DIR``; en un dispositivo real la
+calibración deriva, por lo que la copia en disco vence a las
+``CALIBRATION_MAX_AGE`` horas. ``noisy_backend`` arma un ``AerSimulator`` local
+con errores de lectura distintos por qubit para probar todo sin hardware.
+"""
+import hashlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from qiskit import QuantumCircuit, transpile
+
+from energy import bitstrings_to_array
+from result_cache import backend_settings
+
+CALIBRATION_SHOTS = 10000
+# Directorio de la caché de calibraciones en la raíz del repositorio (None: solo en memoria)
+CALIBRATION_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                     '.cache', 'readout')
+CALIBRATION_MAX_AGE = 24
+# Hasta este número de qubits la inversa se aplica sobre el vector denso de
+# 2^n probabilidades; por encima, sobre los pares de bitstrings medidos
+DENSE_QUBITS = 20
+# Elementos por bloque de la matriz inversa restringida a los bitstrings medidos
+BLOCK_SIZE = 2**22
+
+_calibrations = {}
+
+
+def nearest_probabilities(values):
+    """
+    Distribución de probabilidad más cercana (en norma 2) a una cuasi-distribución.
+
+    Algoritmo de Smolin, Gambetta y Smith: se anulan los valores más pequeños
+    mientras la negatividad acumulada, repartida entre los restantes, no alcance
+    para dejarlos positivos, y el resto se desplaza en partes iguales.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values / values.sum()
+    order = np.argsort(values)
+    ascending = values[order]
+    # Negatividad que se reparte si se anulan los i valores más pequeños
+    accumulated = np.concatenate(([0.0], np.cumsum(ascending)[:-1]))
+    remaining = len(values) - np.arange(len(values))
+    drop = ascending + accumulated / remaining < 0
+    dropped = len(values) if drop.all() else int(np.argmin(drop))
+    result = np.zeros_like(values)
+    if dropped < len(values):
+        kept = order[dropped:]
+        result[kept] = values[kept] + accumulated[dropped] / remaining[dropped]
+    return result
+
+
+class ReadoutCalibration:
+    """Probabilidades de error de lectura p01 = P(1|0) y p10 = P(0|1) de cada qubit."""
+
+    def __init__(self, p01, p10, shots=None, timestamp=None):
+        self.p01 = np.asarray(p01, dtype=float)
+        self.p10 = np.asarray(p10, dtype=float)
+        if self.p01.shape != self.p10.shape:
+            raise ValueError('p01 y p10 deben tener un valor por qubit')
+        if np.any(self.p01 + self.p10 >= 1):
+            raise ValueError('La matriz de asignación de algún qubit no es invertible '
+                             '(p01 + p10 >= 1)')
+        self.shots = shots
+        self.timestamp = time.time() if timestamp is None else timestamp
+
+    @property
+    def num_qubits(self):
+        return len(self.p01)
+
+    def assignment_matrices(self):
+        """Matrices A[medido, preparado] de cada qubit, de forma (n, 2, 2)."""
+        return np.stack([[1 - self.p01, self.p10], [self.p01, 1 - self.p10]]).transpose(2, 0, 1)
+
+    def inverse_matrices(self):
+        return np.linalg.inv(self.assignment_matrices())
+
+    def quasi_probabilities(self, bits, probabilities):
+        """Inversa tensorizada aplicada a la distribución medida, leída en ``bits``."""
+        inverse = self.inverse_matrices()
+        n = self.num_qubits
+        if n <= DENSE_QUBITS:
+            indices = bits.astype(np.int64) @ (1 << np.arange(n, dtype=np.int64))
+            vector = np.zeros(2 ** n)
+            vector[indices] = probabilities
+            for q in range(n):
+                pairs = vector.reshape(-1, 2, 2 ** q)
+                pairs[:] = np.einsum('ij,ajb->aib', inverse[q], pairs)
+            return vector[indices]
+
+        # Elemento (i, j) de la inversa: producto sobre los qubits de Ainv_q[b_iq, b_jq]
+        result = np.empty(len(bits))
+        step = max(1, BLOCK_SIZE // len(bits))
+        for start in range(0, len(bits), step):
+            block = bits[start:start + step]
+            matrix = np.ones((len(block), len(bits)))
+            for q in range(n):
+                matrix *= inverse[q][block[:, q, None], bits[None, :, q]]
+            result[start:start + step] = matrix @ probabilities
+        return result
+
+    def correct(self, counts):
+        """Conteos corregidos (flotantes) sobre los bitstrings medidos."""
+        bitstrings = list(counts)
+        weights = np.fromiter(counts.values(), dtype=float, count=len(bitstrings))
+        shots = weights.sum()
+        bits = bitstrings_to_array(bitstrings, self.num_qubits)
+        quasi = self.quasi_probabilities(bits, weights / shots)
+        # La última entrada es la masa de la inversa fuera de los bitstrings medidos
+        corrected = nearest_probabilities(np.append(quasi, 1 - quasi.sum()))[:-1] * shots
+        return {bitstring: float(value)
+                for bitstring, value in zip(bitstrings, corrected) if value > 0}
+
+    def to_dict(self):
+        return {'p01': self.p01.tolist(), 'p10': self.p10.tolist(), 'shots': self.shots,
+                'timestamp': self.timestamp}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['p01'], data['p10'], data.get('shots'), data.get('timestamp'))
+
+
+def calibration_circuits(num_qubits):
+    """Dos circuitos: todos los qubits en 0 y todos en 1."""
+    zeros = QuantumCircuit(num_qubits, name='cal_0')
+    ones = QuantumCircuit(num_qubits, name='cal_1')
+    ones.x(range(num_qubits))
+    for circuit in (zeros, ones):
+        circuit.measure_all()
+    return [zeros, ones]
+
+
+def calibrate(backend, num_qubits, shots=CALIBRATION_SHOTS, seed=None):
+    """Mide p01 y p10 de cada qubit en un solo job de dos circuitos."""
+    circuits = transpile(calibration_circuits(num_qubits), backend)
+    run_options = {'shots': shots}
+    if seed is not None:
+        run_options['seed_simulator'] = seed
+    result = backend.run(circuits, **run_options).result()
+    ones_rate = []
+    for i in range(2):
+        counts = result.get_counts(i)
+        weights = np.fromiter(counts.values(), dtype=float, count=len(counts))
+        bits = bitstrings_to_array(list(counts), num_qubits)
+        ones_rate.append(weights @ bits / weights.sum())
+    return ReadoutCalibration(ones_rate[0], 1 - ones_rate[1], shots)
+
+
+def _cache_key(backend, num_qubits, shots):
+    data = json.dumps([backend_settings(backend), num_qubits, shots])
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def get_calibration(backend, num_qubits, shots=CALIBRATION_SHOTS, seed=None,
+                    cache_dir=CALIBRATION_CACHE_DIR, max_age=CALIBRATION_MAX_AGE):
+    """Calibración del backend, calibrando solo si no está en memoria ni en disco (vigente)."""
+    key = _cache_key(backend, num_qubits, shots)
+    calibration = _calibrations.get(key)
+    path = os.path.join(cache_dir, f'{key}.json') if cache_dir else None
+    if calibration is None and path is not None and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            calibration = ReadoutCalibration.from_dict(json.load(f))
+    if calibration is not None and time.time() - calibration.timestamp > max_age * 3600:
+        calibration = None
+
+    if calibration is None:
+        calibration = calibrate(backend, num_qubits, shots, seed)
+        if path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            temporary = f'{path}.{os.getpid()}.tmp'
+            with open(temporary, 'w', encoding='utf-8') as f:
+                json.dump(calibration.to_dict(), f)
+            os.replace(temporary, path)
+    _calibrations[key] = calibration
+    return calibration
+
+
+def noisy_backend(num_qubits, p01=0.02, p10=0.05, spread=0.5, seed=None):
+    """
+    ``AerSimulator`` local con solo errores de lectura.
+
+    Cada qubit toma p01 y p10 uniformes en ``[p (1 - spread), p (1 + spread)]``,
+    de modo que las tasas difieren entre qubits como en un dispositivo real.
+    """
+    from qiskit_aer import AerSimulator
+    from qiskit_aer.noise import NoiseModel, ReadoutError
+
+    rng = np.random.default_rng(seed)
+    noise_model = NoiseModel()
+    for q in range(num_qubits):
+        e01 = p01 * rng.uniform(1 - spread, 1 + spread)
+        e10 = p10 * rng.uniform(1 - spread, 1 + spread)
+        noise_model.add_readout_error(ReadoutError([[1 - e01, e01], [e10, 1 - e10]]), [q])
+    return AerSimulator(noise_model=noise_model)
+
+
+if __name__ == '__main__':
+    from sudoku_board import decode_boards, valid_boards
+
+    # Tablero de 2x4 con dos qubits por celda, como vqe.py
+    rows, cols, qubits_per_cell = 2, 4, 2
+    # Dígitos 1..4; cada celda guarda el dígito - 1 en binario, como vqe.py
+    solution = [[1, 2, 3, 4], [3, 4, 1, 2]]
+    # Probabilidad ideal del tablero válido y umbral de EarlyStopping
+    ideal = float(sys.argv[1]) if len(sys.argv) > 1 else 0.12
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    trials = int(sys.argv[3]) if len(sys.argv) > 3 else 40
+    target = 0.9
+    budgets = (50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000)
+
+    num_qubits = rows * cols * qubits_per_cell
+    bitstring = ''.join(format(value - 1, f'0{qubits_per_cell}b')
+                        for row in solution for value in row)
+    # Estado cerca de la solución: cada qubit se aparta con la misma probabilidad,
+    # de modo que el tablero válido tiene probabilidad ``ideal``
+    flip = 1 - ideal ** (1 / num_qubits)
+    circuit = QuantumCircuit(num_qubits)
+    for position, bit in enumerate(bitstring):
+        # Posición p del bitstring = qubit n - 1 - p
+        angle = 2 * np.arcsin(np.sqrt(flip))
+        circuit.ry(np.pi - angle if bit == '1' else angle, num_qubits - 1 - position)
+    circuit.measure_all()
+
+    backend = noisy_backend(num_qubits, seed=1)
+    start = time.perf_counter()
+    calibration = get_calibration(backend, num_qubits, seed=1, cache_dir=None)
+    print(f'Calibración de {num_qubits} qubits en {time.perf_counter() - start:.2f} s: '
+          f'p01 medio {calibration.p01.mean():.3f}, p10 medio {calibration.p10.mean():.3f}')
+    start = time.perf_counter()
+    get_calibration(backend, num_qubits, seed=1, cache_dir=None)
+    print(f'Segunda llamada (caché): {(time.perf_counter() - start) * 1000:.2f} ms')
+
+    def valid_probability(counts):
+        bitstrings = list(counts)
+        weights = np.fromiter(counts.values(), dtype=float, count=len(bitstrings))
+        valid = valid_boards(decode_boards(bitstrings, rows, cols, qubits_per_cell) + 1)
+        return weights[valid].max() / weights.sum() if valid.any() else 0.0
+
+    transpiled = transpile(circuit, backend)
+    print(f'Probabilidad ideal del tablero válido {ideal}, umbral {threshold}, '
+          f'{trials} repeticiones por presupuesto')
+    print(f"{'shots':>6} {'P(éxito) crudo':>15} {'P(éxito) mitigado':>18} "
+          f"{'P medida cruda':>15} {'P mitigada':>11}")
+    needed = {}
+    for shots in budgets:
+        memory = backend.run(transpiled, shots=shots * trials, memory=True,
+                             seed_simulator=shots).result().get_memory()
+        raw, mitigated = [], []
+        for trial in range(trials):
+            bitstrings, frequencies = np.unique(memory[trial * shots:(trial + 1) * shots],
+                                                return_counts=True)
+            counts = dict(zip(bitstrings.tolist(), frequencies.tolist()))
+            raw.append(valid_probability(counts))
+            mitigated.append(valid_probability(calibration.correct(counts)))
+        success = {'crudo': np.mean(np.array(raw) >= threshold),
+                   'mitigado': np.mean(np.array(mitigated) >= threshold)}
+        for name, value in success.items():
+            if value >= target:
+                needed.setdefault(name, shots)
+        print(f"{shots:>6} {success['crudo']:>15.2f} {success['mitigado']:>18.2f} "
+              f"{np.mean(raw):>15.4f} {np.mean(mitigated):>11.4f}")
+
+    for name in ('crudo', 'mitigado'):
+        shots = needed.get(name)
+        print(f'{name}: ' + (f'{shots} shots para P(éxito) >= {target}' if shots else
+                             f'no alcanza P(éxito) >= {target} con {budgets[-1]} shots'))
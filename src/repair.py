@@ -0,0 +1,98 @@
+import numpy as np
+
+from energy import DiagonalHamiltonian, bitstrings_to_array
+from sudoku_board import count_conflicts
+
+
+def _boards_from_bits(bits, rows, cols, qubits_per_cell):
+    """Decodifica una matriz de bits (columna q = qubit q) en tableros."""
+    # El carácter i del bitstring corresponde al qubit n - 1 - i
+    chars = bits[:, ::-1].reshape(len(bits), rows * cols, qubits_per_cell)
+    weights = 2 ** np.arange(qubits_per_cell - 1, -1, -1)
+    return (chars @ weights).reshape(-1, rows, cols)
+
+
+def _bits_to_bitstring(bits):
+    return ''.join(str(b) for b in bits[::-1])
+
+
+def repair_samples(counts, hamiltonian, rows, cols, qubits_per_cell, top_n=10, max_steps=50,
+                   tabu_tenure=None, conflict_weight=None):
+    """
+    Repara con búsqueda tabú de cambios de un bit los bitstrings más medidos.
+
+    Toma los ``top_n`` bitstrings de ``counts`` y los mejora todos a la vez: en
+    cada paso se evalúan los ``n`` vecinos de cada muestra y se aplica el mejor
+    cambio que no sea tabú (o que mejore el mejor puntaje visto). El puntaje es
+    la energía del Hamiltoniano diagonal más ``conflict_weight`` por cada valor
+    repetido en filas, columnas o subgrillas (por defecto, el mayor coeficiente
+    del Hamiltoniano), ya que hay estados de energía mínima que no son tableros
+    válidos. Una muestra se detiene al llegar a un tablero válido.
+
+    Returns:
+        list: un diccionario por tablero válido alcanzado, con el tablero, el
+        bitstring reparado y el original, los conteos del original, la energía y
+        el número de cambios de bit (``steps``), ordenados por energía y pasos.
+    """
+    if not isinstance(hamiltonian, DiagonalHamiltonian):
+        hamiltonian = DiagonalHamiltonian(hamiltonian)
+    num_qubits = hamiltonian.num_qubits
+    if tabu_tenure is None:
+        tabu_tenure = max(1, num_qubits // 4)
+    if conflict_weight is None:
+        conflict_weight = np.max(np.abs(hamiltonian.coeffs))
+
+    def score(candidates):
+        boards = _boards_from_bits(candidates, rows, cols, qubits_per_cell)
+        conflicts = count_conflicts(boards)
+        return hamiltonian.energies(candidates) + conflict_weight * conflicts, conflicts == 0
+
+    originals = sorted(counts, key=counts.get, reverse=True)[:top_n]
+    bits = bitstrings_to_array(originals, num_qubits).astype(np.int8)
+    num_samples = len(bits)
+
+    scores, done = score(bits)
+    best_scores = scores.copy()
+    tabu_until = np.zeros((num_samples, num_qubits), dtype=int)
+    steps = np.zeros(num_samples, dtype=int)
+    flips = np.eye(num_qubits, dtype=np.int8)
+
+    for step in range(1, max_steps + 1):
+        active = np.flatnonzero(~done)
+        if len(active) == 0:
+            break
+
+        # Vecinos de todas las muestras activas: (activas, n, n)
+        neighbors = bits[active, None, :] ^ flips[None, :, :]
+        neighbor_scores, neighbor_valid = score(neighbors.reshape(-1, num_qubits))
+        neighbor_scores = neighbor_scores.reshape(len(active), num_qubits)
+        neighbor_valid = neighbor_valid.reshape(len(active), num_qubits)
+
+        allowed = (tabu_until[active] < step) | (neighbor_scores < best_scores[active, None])
+        neighbor_scores = np.where(allowed, neighbor_scores, np.inf)
+        moves = np.argmin(neighbor_scores, axis=1)
+        rows_idx = np.arange(len(active))
+        movable = np.isfinite(neighbor_scores[rows_idx, moves])
+        active, moves, rows_idx = active[movable], moves[movable], rows_idx[movable]
+
+        bits[active, moves] ^= 1
+        scores[active] = neighbor_scores[rows_idx, moves]
+        best_scores[active] = np.minimum(best_scores[active], scores[active])
+        tabu_until[active, moves] = step + tabu_tenure
+        steps[active] += 1
+        done[active] = neighbor_valid[rows_idx, moves]
+
+    boards = _boards_from_bits(bits, rows, cols, qubits_per_cell)
+    energies = hamiltonian.energies(bits)
+    repaired = []
+    for i in np.flatnonzero(done):
+        repaired.append({
+            'board': boards[i].tolist(),
+            'bitstring': _bits_to_bitstring(bits[i]),
+            'original': originals[i],
+            'counts': counts[originals[i]],
+            'energy': float(energies[i]),
+            'steps': int(steps[i]),
+        })
+    repaired.sort(key=lambda entry: (entry['energy'], entry['steps']))
+    return repaired
@@ -1,4 +1,7 @@
 import math
+from collections import Counter
+
+import numpy as np
 from qiskit.quantum_info import SparsePauliOp, Pauli
 
 
@@ -14,15 +17,15 @@ def single_qubit_z(qubit_index, total_qubits):
 
 def one_number_per_cell(alpha, rows, cols, qubits_per_cell):
     total_qubits = rows * cols * qubits_per_cell
+    identidad = SparsePauliOp(Pauli('I' * total_qubits))
     ops = []
     for row in range(rows):
         for col in range(cols):
-            z0 = single_qubit_z(
-                qubit_idx(row, col, 0, cols, qubits_per_cell), total_qubits)
-            z1 = single_qubit_z(
-                qubit_idx(row, col, 1, cols, qubits_per_cell), total_qubits)
-            identidad = SparsePauliOp(Pauli('I' * total_qubits))
-            cell_penalty = (z0 + z1 - identidad) ** 2
+            # Suma de los Z de todos los qubits de la celda (con 2 qubits: z0 + z1 - I)
+            z_sum = sum(single_qubit_z(
+                qubit_idx(row, col, num, cols, qubits_per_cell), total_qubits)
+                for num in range(qubits_per_cell))
+            cell_penalty = (z_sum - (qubits_per_cell - 1) * identidad) ** 2
             ops.append(alpha * cell_penalty)
     return sum(ops)
 
@@ -85,21 +88,113 @@ def unique_number_per_subgrid(alpha, rows, cols, qubits_per_cell):
     return sum(ops)
 
 
-def create_hamiltonian(alpha, rows, qubits_per_cell, cols=None):
+def cell_groups(rows, cols):
+    """Índices de celda de cada fila, columna y subgrilla (subgrillas de isqrt(rows))."""
+    groups = [[row * cols + col for col in range(cols)] for row in range(rows)]
+    groups += [[row * cols + col for row in range(rows)] for col in range(cols)]
+    subgrid_size = math.isqrt(rows)
+    if subgrid_size > 1:
+        for subgrid_row in range(0, rows, subgrid_size):
+            for subgrid_col in range(0, cols, subgrid_size):
+                groups.append([(subgrid_row + i) * cols + subgrid_col + j
+                               for i in range(subgrid_size) for j in range(subgrid_size)])
+    return groups
+
+
+def encoded_hamiltonian(alpha, rows, cols, encoding, digits=None):
+    """
+    Hamiltoniano con una codificación de ``cell_encodings``.
+
+    Para cada celda se penalizan las palabras de código inválidas y, para cada
+    grupo y dígito d, los pares de celdas que valen d: con S_d la suma de los
+    proyectores "la celda vale d" del grupo, sum_{i<j} P_i P_j = (S_d² - S_d) / 2.
+    """
+    from cell_encodings import get_encoding
+
+    if digits is None:
+        digits = max(rows, cols)
+    encoding = get_encoding(encoding)
+    qubits_per_cell = encoding.qubits(digits)
+    total_qubits = rows * cols * qubits_per_cell
+
+    def positions(cell):
+        return list(range(cell * qubits_per_cell, (cell + 1) * qubits_per_cell))
+
+    ops = [encoding.penalty(positions(cell), digits, total_qubits)
+           for cell in range(rows * cols)]
+
+    indicators = [[encoding.indicator(positions(cell), digit, total_qubits)
+                   for digit in range(digits)] for cell in range(rows * cols)]
+    for group in cell_groups(rows, cols):
+        for digit in range(digits):
+            s = SparsePauliOp.sum([indicators[cell][digit] for cell in group]).simplify()
+            ops.append(0.5 * (s.compose(s) - s))
+
+    return (alpha * SparsePauliOp.sum(ops)).simplify()
+
+
+def split_identity(operator):
+    """Separa el término identidad: devuelve (operador sin identidad, constante)."""
+    identity = ~np.any(operator.paulis.z | operator.paulis.x, axis=1)
+    offset = np.sum(operator.coeffs[identity]).real
+    rest = operator[~identity]
+    if len(rest) == 0:
+        rest = SparsePauliOp(Pauli('I' * operator.num_qubits), [0])
+    return rest, offset
+
+
+def compact_operator(operator, atol=1e-10):
+    """Combina términos de Pauli repetidos y descarta coeficientes menores que ``atol``."""
+    return operator.simplify(atol=atol)
+
+
+def operator_stats(operator):
+    """Número de términos, constante identidad y localidad (qubits no triviales por término)."""
+    weights = np.sum(operator.paulis.z | operator.paulis.x, axis=1)
+    identity = weights == 0
+    locality = dict(sorted(Counter(int(w) for w in weights[~identity]).items()))
+    return {
+        'qubits': operator.num_qubits,
+        'terms': len(operator),
+        'identity_terms': int(np.sum(identity)),
+        'identity_offset': float(np.sum(operator.coeffs[identity]).real),
+        'locality': locality,
+        'max_locality': max(locality, default=0),
+    }
+
+
+def create_hamiltonian(alpha, rows, qubits_per_cell, cols=None, compact=True,
+                       encoding=None, digits=None):
+    """
+    Sin ``encoding`` se construye el Hamiltoniano original. Con ``encoding``
+    ('one_hot', 'binary' o 'domain_wall') los qubits por celda los fija la
+    codificación; si se pasa ``qubits_per_cell`` debe coincidir.
+    """
     if cols is None:
         cols = rows
+    if encoding is not None:
+        from cell_encodings import get_encoding
+
+        expected = get_encoding(encoding).qubits(digits or max(rows, cols))
+        if qubits_per_cell is not None and qubits_per_cell != expected:
+            raise ValueError(f'La codificación {encoding} usa {expected} qubits por celda, '
+                             f'no {qubits_per_cell}')
+        return encoded_hamiltonian(alpha, rows, cols, encoding, digits)
+
     H = one_number_per_cell(alpha, rows, cols, qubits_per_cell) \
         + unique_number_per_row(alpha, rows, cols, qubits_per_cell) \
         + unique_number_per_column(alpha, rows, cols, qubits_per_cell) \
         + unique_number_per_subgrid(alpha, rows, cols, qubits_per_cell)
+    if compact:
+        H = compact_operator(H)
     return H
 
 
 if __name__ == '__main__':
     import sys
 
-    if len(sys.argv) > 1:
-        print(f'Usage: python {sys.argv[0]} <rows> [<cols>] [<alpha>]')
+    if len(sys.argv) < 2:
+        print(f'Usage: python {sys.argv[0]} <rows> [<cols>] [<alpha>] [<qubits_per_cell>]')
         sys.exit(1)
 
     rows = int(sys.argv[1])
@@ -112,9 +207,10 @@ if __name__ == '__main__':
         alpha = int(sys.argv[3])
 
     qubits_per_cell = 4
+    if len(sys.argv) > 4:
+        qubits_per_cell = int(sys.argv[4])
 
-    H = one_number_per_cell(alpha, rows, cols, qubits_per_cell) \
-        + unique_number_per_row(alpha, rows, cols, qubits_per_cell) \
-        + unique_number_per_column(alpha, rows, cols, qubits_per_cell) \
-        + unique_number_per_subgrid(alpha, rows, cols, qubits_per_cell)
-    print(H)
+    raw = create_hamiltonian(alpha, rows, qubits_per_cell, cols, compact=False)
+    H = create_hamiltonian(alpha, rows, qubits_per_cell, cols)
+    print(f'Antes de compactar:  {operator_stats(raw)}')
+    print(f'Después de compactar: {operator_stats(H)}')
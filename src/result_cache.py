@@ -0,0 +1,155 @@
+"""
+Caché en disco de conteos, direccionada por el contenido del circuito ejecutado.
+
+La llave es el SHA-256 del QPY del circuito ligado junto con el backend, los
+shots, la semilla y la configuración de ruido, así que repetir un experimento
+o volver a un punto de parámetros ya visitado no vuelve a gastar tiempo de
+backend. Cada entrada es un JSON pequeño; el orden LRU se guarda en la fecha
+de modificación de los archivos, por lo que sobrevive entre ejecuciones.
+"""
+import hashlib
+import io
+import json
+import os
+from collections import OrderedDict
+
+from qiskit import qpy
+
+
+def circuit_fingerprint(circuit):
+    """Bytes QPY del circuito, sin el nombre autogenerado ni metadatos."""
+    circuit = circuit.copy()
+    circuit.name = 'circuit'
+    circuit.metadata = {}
+    buffer = io.BytesIO()
+    qpy.dump(circuit, buffer)
+    return buffer.getvalue()
+
+
+def backend_settings(backend):
+    """Nombre del backend y modelo de ruido (si lo hay) en forma canónica."""
+    name = backend.name if isinstance(backend.name, str) else backend.name()
+    noise_model = getattr(backend.options, 'noise_model', None)
+    noise = noise_model.to_dict(serializable=True) if noise_model is not None else None
+    return json.dumps({'backend': name, 'noise': noise}, sort_keys=True, default=str)
+
+
+class ResultCache:
+    def __init__(self, directory='.cache/results', max_entries=100000):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        for name in os.listdir(directory):
+            if name.endswith('.json'):
+                path = os.path.join(directory, name)
+                entries.append((os.path.getmtime(path), name[:-len('.json')]))
+        self._lru = OrderedDict((key, None) for _, key in sorted(entries))
+
+    @staticmethod
+    def key(circuit, settings, shots, seed=None):
+        digest = hashlib.sha256(circuit_fingerprint(circuit))
+        digest.update(json.dumps([settings, shots, seed]).encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, key):
+        """Devuelve los conteos guardados o None, y actualiza las estadísticas."""
+        if key not in self._lru:
+            self.misses += 1
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                counts = json.load(f)
+        except FileNotFoundError:
+            del self._lru[key]
+            self.misses += 1
+            return None
+        os.utime(path)
+        self._lru.move_to_end(key)
+        self.hits += 1
+        return counts
+
+    def put(self, key, counts):
+        path = self._path(key)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(counts, f)
+        os.replace(temporary, path)
+        self._lru[key] = None
+        self._lru.move_to_end(key)
+
+        while len(self._lru) > self.max_entries:
+            oldest, _ = self._lru.popitem(last=False)
+            try:
+                os.remove(self._path(oldest))
+            except FileNotFoundError:
+                pass
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate,
+                'entries': len(self._lru)}
+
+
+class _CachedResult:
+    def __init__(self, counts_list):
+        self._counts_list = counts_list
+
+    def get_counts(self, index):
+        return self._counts_list[index]
+
+
+class _CachedJob:
+    def __init__(self, cache, keys, cached, job, missing):
+        self._cache = cache
+        self._keys = keys
+        self._cached = cached
+        self._job = job
+        self._missing = missing
+
+    def result(self):
+        counts_list = list(self._cached)
+        if self._job is not None:
+            result = self._job.result()
+            for position, index in enumerate(self._missing):
+                counts = result.get_counts(position)
+                self._cache.put(self._keys[index], counts)
+                counts_list[index] = counts
+        return _CachedResult(counts_list)
+
+
+class CachingProvider:
+    """
+    Envuelve un proveedor de ``async_executor`` y solo envía los circuitos que
+    no están en la caché.
+    """
+
+    def __init__(self, provider, cache, seed=None):
+        self.provider = provider
+        self.cache = cache
+        self.seed = seed
+        self.settings = backend_settings(provider.backend)
+
+    @property
+    def backend(self):
+        return self.provider.backend
+
+    def run(self, circuits, shots):
+        keys = [self.cache.key(circuit, self.settings, shots, self.seed) for circuit in circuits]
+        cached = [self.cache.get(key) for key in keys]
+        missing = [i for i, counts in enumerate(cached) if counts is None]
+        job = None
+        if missing:
+            job = self.provider.run([circuits[i] for i in missing], shots)
+        return _CachedJob(self.cache, keys, cached, job, missing)
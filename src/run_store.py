@@ -0,0 +1,183 @@
+"""
+Registro de ejecuciones en SQLite, solo de agregado.
+
+Cada ejecución de un solucionador variacional agrega una fila a ``runs`` con
+su configuración, la huella del Hamiltoniano, los parámetros finales, el mejor
+tablero, la energía, los tiempos y los shots, y una fila por evaluación a
+``trace``. Nunca se actualizan ni se borran filas anteriores: agregar es un
+INSERT en una transacción (con WAL), y las consultas usan los índices por
+Hamiltoniano, método, tamaño de tablero, energía y fecha.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+# Relativa a la raíz del repositorio, no al directorio de trabajo
+RUN_STORE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              'vars', 'runs.sqlite')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created REAL NOT NULL,
+    method TEXT NOT NULL,
+    rows INTEGER,
+    cols INTEGER,
+    hamiltonian TEXT,
+    config TEXT NOT NULL,
+    energy REAL,
+    valid INTEGER,
+    board TEXT,
+    parameters BLOB,
+    evaluations INTEGER,
+    jobs INTEGER,
+    total_shots INTEGER,
+    seconds REAL,
+    timings TEXT
+);
+CREATE TABLE IF NOT EXISTS trace (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    step INTEGER NOT NULL,
+    energy REAL NOT NULL,
+    std REAL,
+    PRIMARY KEY (run_id, step)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS runs_hamiltonian ON runs(hamiltonian, energy);
+CREATE INDEX IF NOT EXISTS runs_method ON runs(method, rows, cols);
+CREATE INDEX IF NOT EXISTS runs_energy ON runs(energy);
+CREATE INDEX IF NOT EXISTS runs_created ON runs(created);
+"""
+
+_ORDER_BY = {'energy': 'energy', 'created': 'created', 'seconds': 'seconds', 'id': 'id'}
+
+
+def hamiltonian_fingerprint(operator):
+    """SHA-256 de los términos (etiqueta, coeficiente) del operador simplificado y ordenado."""
+    operator = operator.simplify()
+    terms = sorted(zip(operator.paulis.to_labels(),
+                       np.round(operator.coeffs.real, 12).tolist(),
+                       np.round(operator.coeffs.imag, 12).tolist()))
+    return hashlib.sha256(json.dumps(terms).encode()).hexdigest()
+
+
+class RunStore:
+    def __init__(self, path=RUN_STORE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_SCHEMA)
+
+    def append(self, method, config, hamiltonian=None, rows=None, cols=None, energy=None,
+               valid=None, board=None, parameters=None, trace=(), evaluations=None,
+               jobs=None, total_shots=None, seconds=None, timings=None):
+        """
+        Agrega una ejecución y devuelve su id.
+
+        ``hamiltonian`` puede ser un ``SparsePauliOp`` o su huella; ``trace`` es
+        una secuencia de (energía, desviación estándar) por evaluación.
+        """
+        if hamiltonian is not None and not isinstance(hamiltonian, str):
+            hamiltonian = hamiltonian_fingerprint(hamiltonian)
+        if parameters is not None:
+            parameters = np.asarray(parameters, dtype=np.float64).tobytes()
+        values = (time.time(), method, rows, cols, hamiltonian,
+                  json.dumps(config, sort_keys=True, default=str),
+                  None if energy is None else float(energy),
+                  None if valid is None else int(bool(valid)),
+                  None if board is None else json.dumps(board),
+                  parameters, evaluations, jobs, total_shots, seconds,
+                  None if timings is None else json.dumps(timings))
+        with self._db:
+            cursor = self._db.execute(
+                'INSERT INTO runs (created, method, rows, cols, hamiltonian, config, energy, '
+                'valid, board, parameters, evaluations, jobs, total_shots, seconds, timings) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', values)
+            run_id = cursor.lastrowid
+            self._db.executemany(
+                'INSERT INTO trace (run_id, step, energy, std) VALUES (?, ?, ?, ?)',
+                ((run_id, step, float(energy), None if std is None else float(std))
+                 for step, (energy, std) in enumerate(trace)))
+        return run_id
+
+    @staticmethod
+    def _decode(row):
+        run = dict(row)
+        run['config'] = json.loads(run['config'])
+        for key in ('board', 'timings'):
+            if run[key] is not None:
+                run[key] = json.loads(run[key])
+        if run['parameters'] is not None:
+            run['parameters'] = np.frombuffer(run['parameters'], dtype=np.float64)
+        if run['valid'] is not None:
+            run['valid'] = bool(run['valid'])
+        return run
+
+    def runs(self, method=None, hamiltonian=None, rows=None, cols=None, valid=None,
+             order_by='id', limit=None):
+        """Ejecuciones que cumplen todos los filtros dados, ordenadas por ``order_by``."""
+        if order_by not in _ORDER_BY:
+            raise ValueError(f'Orden desconocido: {order_by}. Opciones: {sorted(_ORDER_BY)}')
+        filters = {'method': method, 'hamiltonian': hamiltonian, 'rows': rows, 'cols': cols,
+                   'valid': None if valid is None else int(bool(valid))}
+        conditions = [f'{column} = ?' for column, value in filters.items() if value is not None]
+        query = 'SELECT * FROM runs'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += f' ORDER BY {_ORDER_BY[order_by]}'
+        if limit is not None:
+            query += f' LIMIT {int(limit)}'
+        arguments = [value for value in filters.values() if value is not None]
+        return [self._decode(row) for row in self._db.execute(query, arguments)]
+
+    def get(self, run_id):
+        row = self._db.execute('SELECT * FROM runs WHERE id = ?', (run_id,)).fetchone()
+        return None if row is None else self._decode(row)
+
+    def best(self, hamiltonian):
+        """Ejecución de menor energía para un Hamiltoniano (operador o huella)."""
+        if not isinstance(hamiltonian, str):
+            hamiltonian = hamiltonian_fingerprint(hamiltonian)
+        runs = self.runs(hamiltonian=hamiltonian, order_by='energy', limit=1)
+        return runs[0] if runs else None
+
+    def trace(self, run_id):
+        """Arreglo (evaluaciones x 2) con la energía y su desviación estándar."""
+        rows = self._db.execute('SELECT energy, std FROM trace WHERE run_id = ? ORDER BY step',
+                                (run_id,)).fetchall()
+        return np.array([(energy, np.nan if std is None else std) for energy, std in rows],
+                        dtype=float).reshape(-1, 2)
+
+    def __len__(self):
+        return self._db.execute('SELECT COUNT(*) FROM runs').fetchone()[0]
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else RUN_STORE_PATH
+    method = sys.argv[2] if len(sys.argv) > 2 else None
+
+    with RunStore(path) as store:
+        print(f'{len(store)} ejecuciones en {path}')
+        for run in store.runs(method=method, order_by='energy', limit=20):
+            energy = float('nan') if run['energy'] is None else run['energy']
+            print(f"#{run['id']:<5} {run['method']:<6} {run['rows']}x{run['cols']} "
+                  f"energía {energy:>10.2f}  válido {run['valid']}  "
+                  f"evaluaciones {run['evaluations']}  {run['seconds'] or 0:.1f} s  "
+                  f"{(run['hamiltonian'] or '')[:12]}")
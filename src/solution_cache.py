@@ -0,0 +1,297 @@
+"""
+Caché de soluciones por forma canónica del sudoku.
+
+Dos tableros son equivalentes si uno se obtiene del otro renombrando dígitos,
+permutando bandas (grupos de filas de subgrillas), filas dentro de una banda,
+pilas, columnas dentro de una pila o trasponiendo. ``canonical_form`` elige
+como representante el tablero lexicográficamente mínimo de la clase (con los
+dígitos renombrados por orden de aparición y 0 para las celdas vacías) y
+devuelve la transformación que lleva a él. ``SolutionCache`` guarda la
+solución en el marco canónico, de modo que un sudoku repetido o simétrico a
+uno ya resuelto se responde invirtiendo la transformación, sin correr el
+solucionador.
+"""
+import dbm
+import itertools
+import math
+import os
+import sys
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+# Por encima de 9x9 las permutaciones de columnas (m! * m!^m) son demasiadas
+MAX_SIZE = 9
+
+
+@lru_cache(maxsize=None)
+def _line_orders(n):
+    """Órdenes de filas (o columnas) que respetan las bandas: (m! * m!^m, n)."""
+    m = math.isqrt(n)
+    within = list(itertools.permutations(range(m)))
+    orders = []
+    for bands in itertools.permutations(range(m)):
+        for inner in itertools.product(within, repeat=m):
+            orders.append([band * m + inner[slot][i]
+                           for slot, band in enumerate(bands) for i in range(m)])
+    return np.array(orders, dtype=np.intp)
+
+
+def _relabel(values, n):
+    """
+    Renombra cada fila de ``values`` por orden de aparición de los dígitos.
+
+    Devuelve los valores renombrados y la permutación usada (0 queda fijo; los
+    dígitos ausentes van al final en orden creciente).
+    """
+    k, length = values.shape
+    first = np.empty((k, n + 1), dtype=np.intp)
+    first[:, 0] = -1
+    for digit in range(1, n + 1):
+        present = values == digit
+        first[:, digit] = np.where(present.any(axis=1), present.argmax(axis=1), length + digit)
+    order = np.argsort(first, axis=1)
+    mapping = np.empty_like(order)
+    mapping[np.arange(k)[:, None], order] = np.arange(n + 1)
+    return np.take_along_axis(mapping, values, axis=1), mapping
+
+
+def _next_rows(rows, m):
+    if len(rows) % m == 0:
+        used = {row // m for row in rows}
+        return [band * m + i for band in range(m) if band not in used for i in range(m)]
+    band = rows[-1] // m
+    return [band * m + i for i in range(m) if band * m + i not in rows]
+
+
+def _check_board(grid):
+    n = grid.shape[0]
+    if grid.shape != (n, n) or not 1 < n <= MAX_SIZE or math.isqrt(n) ** 2 != n:
+        raise ValueError(
+            f'La forma canónica requiere un tablero cuadrado de lado 4 o 9, no {grid.shape}')
+
+
+def canonical_form(board):
+    """
+    Devuelve (tablero canónico, transformación).
+
+    La transformación es (traspuesto, orden de filas, orden de columnas,
+    renombre) con ``canónico[i][j] = renombre[B[filas[i]][columnas[j]]]``,
+    donde B es el tablero (traspuesto si corresponde). El mínimo se construye
+    fila por fila: en cada paso solo sobreviven los órdenes de filas y las
+    permutaciones de columnas que producen la menor fila posible.
+    """
+    grid = np.asarray(board, dtype=np.intp)
+    _check_board(grid)
+    n = grid.shape[0]
+    m = math.isqrt(n)
+    col_orders = _line_orders(n)
+    weights = (n + 1) ** np.arange(n - 1, -1, -1)
+
+    states = [(transpose, (), np.arange(len(col_orders))) for transpose in (False, True)]
+    for _ in range(n):
+        # Si las filas restantes están vacías el resto del mínimo son ceros
+        transpose, rows, col_idx = states[0]
+        g = grid.T if transpose else grid
+        if not g[[row for row in range(n) if row not in rows]].any():
+            while len(rows) < n:
+                rows += (_next_rows(rows, m)[0],)
+            states = [(transpose, rows, col_idx)]
+            break
+
+        candidates = []
+        best = None
+        for transpose, rows, col_idx in states:
+            g = grid.T if transpose else grid
+            for row in _next_rows(rows, m):
+                sequence = rows + (row,)
+                values = g[list(sequence)][:, col_orders[col_idx]]
+                values = values.transpose(1, 0, 2).reshape(len(col_idx), -1)
+                labels, _ = _relabel(values, n)
+                keys = labels[:, -n:] @ weights
+                key = keys.min()
+                if best is None or key < best:
+                    best = key
+                candidates.append((key, transpose, sequence, col_idx[keys == key]))
+        states = [(transpose, sequence, col_idx)
+                  for key, transpose, sequence, col_idx in candidates if key == best]
+
+    transpose, rows, col_idx = states[0]
+    g = grid.T if transpose else grid
+    cols = col_orders[col_idx[0]]
+    labels, mapping = _relabel(g[np.ix_(rows, cols)].reshape(1, -1), n)
+    canonical = labels.reshape(n, n).tolist()
+    return canonical, (transpose, list(rows), cols.tolist(), mapping[0].tolist())
+
+
+def apply_transform(board, transform):
+    """Lleva un tablero al marco canónico."""
+    transpose, rows, cols, mapping = transform
+    grid = np.asarray(board, dtype=np.intp)
+    if transpose:
+        grid = grid.T
+    return np.asarray(mapping)[grid[np.ix_(rows, cols)]].tolist()
+
+
+def invert_transform(board, transform):
+    """Lleva un tablero del marco canónico al marco original."""
+    transpose, rows, cols, mapping = transform
+    inverse = np.empty(len(mapping), dtype=np.intp)
+    inverse[mapping] = np.arange(len(mapping))
+    grid = np.empty((len(rows), len(cols)), dtype=np.intp)
+    grid[np.ix_(rows, cols)] = inverse[np.asarray(board, dtype=np.intp)]
+    if transpose:
+        grid = grid.T
+    return grid.tolist()
+
+
+def _pack(board):
+    """Tablero a bytes: dos celdas por byte hasta 9x9."""
+    values = np.asarray(board, dtype=np.uint8).ravel()
+    if len(values) % 2:
+        values = np.append(values, np.uint8(0))
+    return bytes(values[0::2] << 4 | values[1::2])
+
+
+def _unpack(data, n):
+    packed = np.frombuffer(data, dtype=np.uint8)
+    values = np.empty(2 * len(packed), dtype=np.intp)
+    values[0::2] = packed >> 4
+    values[1::2] = packed & 0x0F
+    return values[:n * n].reshape(n, n).tolist()
+
+
+def is_solution_of(puzzle, solution):
+    """La solución respeta las pistas y todas las filas, columnas y subgrillas."""
+    from puzzles import is_correct
+
+    n = len(puzzle)
+    if any(len(row) != n for row in solution) or len(solution) != n:
+        return False
+    if any(clue and clue != value
+           for clue_row, row in zip(puzzle, solution) for clue, value in zip(clue_row, row)):
+        return False
+    if not all(1 <= value <= n for row in solution for value in row):
+        return False
+    return is_correct(solution)
+
+
+class SolutionCache:
+    """
+    Soluciones por forma canónica: LRU en memoria sobre un ``dbm`` en disco.
+
+    Las llaves y valores en disco son los tableros canónicos empaquetados a
+    4 bits por celda (41 bytes para un 9x9).
+    """
+
+    def __init__(self, path='.cache/solutions', max_memory=10000):
+        self.path = path
+        self.max_memory = max_memory
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = dbm.open(path, 'c')
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def get(self, puzzle):
+        """Solución en el marco de ``puzzle`` o None si su clase no está guardada."""
+        canonical, transform = canonical_form(puzzle)
+        key = _pack(canonical)
+        value = self._memory.get(key)
+        if value is None:
+            value = self._db.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._remember(key, value)
+        self.hits += 1
+        return invert_transform(_unpack(value, len(puzzle)), transform)
+
+    def put(self, puzzle, solution):
+        if not is_solution_of(puzzle, solution):
+            raise ValueError('La solución no corresponde al sudoku')
+        canonical, transform = canonical_form(puzzle)
+        key = _pack(canonical)
+        value = _pack(apply_transform(solution, transform))
+        self._db[key] = value
+        self._remember(key, value)
+
+    def solve(self, puzzle, solver):
+        """Devuelve la solución guardada o corre ``solver`` y guarda su resultado si es válido."""
+        solution = self.get(puzzle)
+        if solution is not None:
+            return solution
+        solution = solver(puzzle)
+        if solution is not None and is_solution_of(puzzle, solution):
+            self.put(puzzle, solution)
+        return solution
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate,
+                'memory_entries': len(self._memory)}
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def random_symmetry(board, rng):
+    """Aplica una transformación de simetría aleatoria (para probar la caché)."""
+    n = len(board)
+    orders = _line_orders(n)
+    rows = orders[rng.integers(len(orders))]
+    cols = orders[rng.integers(len(orders))]
+    mapping = np.concatenate(([0], rng.permutation(n) + 1))
+    return apply_transform(board, (bool(rng.integers(2)), rows.tolist(), cols.tolist(),
+                                   mapping.tolist()))
+
+
+if __name__ == '__main__':
+    import copy
+    import tempfile
+    import time
+
+    from puzzles import get_matrix
+    from sudoku_generator import fill_rest_of_board
+
+    filename = sys.argv[1] if len(sys.argv) > 1 else 'problem.txt'
+    puzzle = get_matrix(filename)
+    rng = np.random.default_rng(12345)
+
+    def backtracking(board):
+        board = copy.deepcopy(board)
+        return board if fill_rest_of_board(board, len(board)) else None
+
+    with tempfile.TemporaryDirectory() as directory:
+        with SolutionCache(os.path.join(directory, 'solutions')) as cache:
+            start = time.perf_counter()
+            cache.solve(puzzle, backtracking)
+            print(f'Primera resolución: {(time.perf_counter() - start) * 1000:.1f} ms')
+
+            for _ in range(5):
+                variant = random_symmetry(puzzle, rng)
+                start = time.perf_counter()
+                solution = cache.solve(variant, backtracking)
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f'Variante simétrica: {elapsed:.1f} ms, '
+                      f'correcta {is_solution_of(variant, solution)}')
+            print(f'Caché: {cache.stats()}')
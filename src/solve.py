@@ -0,0 +1,203 @@
+"""
+Punto de entrada único para los solucionadores de Sudoku del proyecto.
+
+Uso: python solve.py <método> [archivo] [--solution-cache PATH] [--timing]
+                     [--profile] [--profile-trace FILE] [--fallback MÉTODO]
+
+Sale con 0 si el método resolvió el tablero, 1 si no, 2 si el método no admite
+el tablero y 3 si la solución vino del método de respaldo de ``--fallback``.
+
+Los módulos pesados (qiskit, Aer, dimod, matplotlib) solo se importan dentro
+de la función del método elegido, de modo que ``--help`` y el método clásico
+arrancan sin pagar su tiempo de importación.
+"""
+import argparse
+import contextlib
+import copy
+import sys
+import time
+
+_START = time.perf_counter()
+
+
+def solve_classical(matrix):
+    from sudoku_generator import fill_rest_of_board
+
+    result = copy.deepcopy(matrix)
+    if not fill_rest_of_board(result, len(result)):
+        return None
+    return result
+
+
+def solve_propagation(matrix):
+    from propagation import solve_board
+
+    return solve_board(matrix)
+
+
+def solve_dwave(matrix):
+    from dwave_sudoku_solver import build_bqm, solve_sudoku
+
+    return solve_sudoku(build_bqm(matrix), matrix)
+
+
+def check_variational_board(matrix, module):
+    """
+    Los solucionadores variacionales resuelven un tablero vacío de a lo sumo
+    ``SUDOKU_ROWS`` x ``SUDOKU_COLS``: sin este control ignorarían las pistas.
+    """
+    rows, cols = len(matrix), len(matrix[0])
+    if any(value for line in matrix for value in line):
+        raise ValueError(f'{module.__name__} no usa las pistas: el tablero debe estar vacío')
+    if rows > module.SUDOKU_ROWS or cols > module.SUDOKU_COLS:
+        raise ValueError(f'{module.__name__} admite tableros de hasta {module.SUDOKU_ROWS}x'
+                         f'{module.SUDOKU_COLS}, se recibió {rows}x{cols}')
+
+
+def solve_vqe(matrix):
+    import vqe_local
+
+    check_variational_board(matrix, vqe_local)
+    return vqe_local.solve(len(matrix), len(matrix[0]))
+
+
+def solve_qaoa(matrix):
+    import qaoa_local
+
+    check_variational_board(matrix, qaoa_local)
+    return qaoa_local.solve(len(matrix), len(matrix[0]))
+
+
+def solve_decomposition(matrix):
+    from decomposition import solve_by_decomposition
+
+    board, stats = solve_by_decomposition(matrix)
+    print(stats, file=sys.stderr)
+    # La búsqueda local puede agotar las iteraciones en sudokus difíciles
+    return board if stats['conflicts'] == 0 else None
+
+
+def solve_grover(matrix):
+    # Demostración fija de 2x2: no usa el tablero de entrada
+    from grover import main
+
+    main()
+    return None
+
+
+# Métodos clásicos que se pueden usar como respaldo con --fallback
+FALLBACKS = ('classical', 'propagation')
+# Código de salida cuando la solución la dio el método de respaldo
+FALLBACK_EXIT = 3
+
+# Nombre del método -> (función, descripción)
+SOLVERS = {
+    'classical': (solve_classical, 'backtracking clásico, sin dependencias pesadas'),
+    'propagation': (solve_propagation,
+                    'propagación de restricciones vectorizada con ramificación (NumPy)'),
+    'dwave': (solve_dwave, 'BQM resuelto con KerberosSampler de D-Wave'),
+    'vqe': (solve_vqe, 'VQE en el simulador local de Aer (solo tableros vacíos de 2x2)'),
+    'qaoa': (solve_qaoa, 'QAOA en el simulador local de Aer (solo tableros vacíos de 2x2)'),
+    'decomposition': (solve_decomposition,
+                      'subproblemas exactos de hasta 20 qubits, para tableros de 9x9'),
+    'grover': (solve_grover, 'demostración de Grover para un sudoku de 2x2'),
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description='Resuelve un sudoku con el método indicado.',
+        epilog='Métodos: ' + '; '.join(f'{name}: {description}'
+                                       for name, (_, description) in SOLVERS.items()))
+    parser.add_argument('method', choices=sorted(SOLVERS))
+    parser.add_argument('filename', nargs='?', default='problem.txt',
+                        help='tablero en el formato de problem.txt (por defecto: %(default)s)')
+    parser.add_argument('--artifacts', metavar='DIR',
+                        help='escribe dibujos de circuitos e histogramas en DIR (por defecto no se dibuja)')
+    parser.add_argument('--solution-cache', metavar='PATH',
+                        help='responde sudokus repetidos o simétricos desde la caché en PATH')
+    parser.add_argument('--timing', action='store_true',
+                        help='muestra los tiempos de arranque, importación y resolución')
+    parser.add_argument('--profile', action='store_true',
+                        help='mide tiempo, CPU y memoria de cada etapa y muestra una tabla')
+    parser.add_argument('--profile-trace', metavar='FILE',
+                        help='además escribe la traza de etapas en FILE (formato Chrome, '
+                             'o pilas colapsadas si termina en .folded); implica --profile')
+    parser.add_argument('--fallback', choices=FALLBACKS,
+                        help='si el método no encuentra solución, resuelve con este método '
+                             'clásico, lo indica en la salida y sale con código '
+                             f'{FALLBACK_EXIT}')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    startup = time.perf_counter() - _START
+
+    if args.artifacts is not None:
+        from artifacts import configure
+
+        configure(args.artifacts)
+
+    # Etapa raíz de la tabla de perfilado; sin --profile no se importa el perfilador
+    root_stage = contextlib.nullcontext()
+    if args.profile or args.profile_trace is not None:
+        from profiling import configure as configure_profiling
+
+        profiler = configure_profiling(enabled=True, trace=args.profile_trace)
+        root_stage = profiler.stage(args.method)
+
+    from puzzles import get_matrix, is_correct
+
+    matrix = get_matrix(args.filename)
+    solver, _ = SOLVERS[args.method]
+
+    modules_before = set(sys.modules)
+    start = time.perf_counter()
+    try:
+        with root_stage:
+            if args.solution_cache is not None:
+                from solution_cache import MAX_SIZE, SolutionCache
+
+                with SolutionCache(args.solution_cache) as cache:
+                    # La forma canónica solo está definida para tableros de 4x4 y 9x9
+                    if len(matrix) in (4, MAX_SIZE):
+                        result = cache.solve(matrix, solver)
+                    else:
+                        result = solver(matrix)
+            else:
+                result = solver(matrix)
+    except ValueError as error:
+        # Tablero que el método no admite
+        print(f'Error: {error}', file=sys.stderr)
+        return 2
+    elapsed = time.perf_counter() - start
+
+    fallback = None
+    if result is None and args.fallback is not None:
+        fallback, _ = SOLVERS[args.fallback]
+        result = fallback(matrix)
+        if result is not None:
+            print(f'Respaldo: {args.method} no encontró solución; tablero de {args.fallback}')
+
+    if result is not None:
+        for line in result:
+            print(*line, sep=" ")
+        # Solo se verifican tableros con dígitos 1..n (los variacionales decodifican desde 0)
+        n = len(result)
+        if all(1 <= value <= n for line in result for value in line) and is_correct(result):
+            print("The solution is correct")
+
+    if args.timing:
+        imported = len(set(sys.modules) - modules_before)
+        print(f'arranque: {startup * 1000:.1f} ms, '
+              f'resolución (incluye {imported} módulos importados): {elapsed * 1000:.1f} ms',
+              file=sys.stderr)
+
+    if result is None:
+        return 1
+    return FALLBACK_EXIT if fallback is not None else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
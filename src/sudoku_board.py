@@ -0,0 +1,102 @@
+import math
+
+import numpy as np
+
+
+def decode_board(bitstring, rows, cols, qubits_per_cell):
+    """
+    Decodifica un bitstring medido en un tablero de rows x cols.
+
+    Sigue la misma convención que los scripts variacionales: la celda ``idx``
+    ocupa los caracteres ``[idx * qubits_per_cell, (idx + 1) * qubits_per_cell)``
+    leídos de izquierda a derecha y su valor es el entero binario correspondiente.
+    """
+    bitstring = bitstring.replace(' ', '')
+    board = []
+    for i in range(rows):
+        row = []
+        for j in range(cols):
+            idx = i * cols + j
+            bits = bitstring[idx * qubits_per_cell:(idx + 1) * qubits_per_cell]
+            row.append(int(bits, 2))
+        board.append(row)
+    return board
+
+
+def is_valid_board(board):
+    """
+    Verifica que todos los valores sean dígitos 1..max(rows, cols) y que no haya
+    valores repetidos en filas, columnas ni subgrillas.
+
+    Las subgrillas siguen la convención de ``restrictions``: cuadrados de
+    ``isqrt(rows)`` x ``isqrt(rows)``.
+    """
+    rows = len(board)
+    cols = len(board[0])
+    digits = max(rows, cols)
+
+    if any(not 1 <= value <= digits for row in board for value in row):
+        return False
+
+    for row in board:
+        if len(set(row)) != cols:
+            return False
+
+    for j in range(cols):
+        if len({board[i][j] for i in range(rows)}) != rows:
+            return False
+
+    subgrid_size = math.isqrt(rows)
+    for subgrid_row in range(rows // subgrid_size):
+        for subgrid_col in range(cols // subgrid_size):
+            values = [board[subgrid_row * subgrid_size + i][subgrid_col * subgrid_size + j]
+                      for i in range(subgrid_size) for j in range(subgrid_size)]
+            if len(set(values)) != len(values):
+                return False
+
+    return True
+
+
+def decode_boards(bitstrings, rows, cols, qubits_per_cell):
+    """Versión vectorizada de ``decode_board``: devuelve un arreglo (muestras x rows x cols)."""
+    joined = ''.join(bitstring.replace(' ', '') for bitstring in bitstrings)
+    bits = (np.frombuffer(joined.encode(), dtype=np.uint8) - ord('0')).astype(np.int64)
+    bits = bits.reshape(-1, rows * cols, qubits_per_cell)
+    weights = 2 ** np.arange(qubits_per_cell - 1, -1, -1)
+    return (bits @ weights).reshape(-1, rows, cols)
+
+
+def _repeats(values, axis):
+    """Número de valores repetidos en cada grupo a lo largo de ``axis``, sumado por tablero."""
+    ordered = np.sort(values, axis=axis)
+    return np.sum(np.diff(ordered, axis=axis) == 0, axis=(1, 2))
+
+
+def _subgrids(boards):
+    """Reordena los tableros en (muestras x subgrillas x celdas de la subgrilla)."""
+    num_boards, rows, cols = boards.shape
+    subgrid_size = math.isqrt(rows)
+    grid_rows = rows // subgrid_size
+    grid_cols = cols // subgrid_size
+    subgrids = boards[:, :grid_rows * subgrid_size, :grid_cols * subgrid_size]
+    subgrids = subgrids.reshape(num_boards, grid_rows, subgrid_size, grid_cols, subgrid_size)
+    return subgrids.transpose(0, 1, 3, 2, 4).reshape(
+        num_boards, grid_rows * grid_cols, subgrid_size * subgrid_size)
+
+
+def count_conflicts(boards):
+    """
+    Cuenta, para cada tablero, los valores fuera de 1..max(rows, cols) y los
+    repetidos en filas, columnas y subgrillas.
+
+    Un tablero es válido si y solo si su número de conflictos es cero.
+    """
+    boards = np.asarray(boards)
+    out_of_range = np.sum((boards < 1) | (boards > max(boards.shape[1:])), axis=(1, 2))
+    return (out_of_range + _repeats(boards, axis=2) + _repeats(boards, axis=1)
+            + _repeats(_subgrids(boards), axis=2))
+
+
+def valid_boards(boards):
+    """Versión vectorizada de ``is_valid_board`` sobre un arreglo (muestras x rows x cols)."""
+    return count_conflicts(boards) == 0
@@ -1,5 +1,6 @@
 import random
 import math
+import sys
 
 
 def initialize_board(n):
@@ -87,6 +88,9 @@ def permute_numbers(board):
 
         intercambio[i] = propuesta
 
+    # Las celdas vacías (0) se mantienen vacías
+    intercambio[0] = 0
+
     # Luego intercambie los números
     for i in range(n):
         for j in range(n):
@@ -104,3 +108,24 @@ def generate_sudoku(n, num_to_remove):
     remove_numbers_from_board(board, n, num_to_remove)
     permute_numbers(board)
     return board
+
+
+def write_puzzles(filename, n, num_to_remove, count, format='packed'):
+    """Genera ``count`` sudokus y los escribe en flujo con ``puzzles.PuzzleWriter``."""
+    from puzzles import PuzzleWriter
+
+    with PuzzleWriter(filename, n, format) as writer:
+        for _ in range(count):
+            writer.write(generate_sudoku(n, num_to_remove))
+    return writer.count
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 5:
+        print(f'Usage: python {sys.argv[0]} <n> <num_to_remove> <count> <archivo> [<formato>]')
+        sys.exit(1)
+
+    n, num_to_remove, count = map(int, sys.argv[1:4])
+    format = sys.argv[5] if len(sys.argv) > 5 else 'packed'
+    written = write_puzzles(sys.argv[4], n, num_to_remove, count, format)
+    print(f'{written} sudokus escritos en {sys.argv[4]} ({format})')
@@ -0,0 +1,146 @@
+"""
+Telemetría por evaluación de la función objetivo.
+
+``BatchedObjective`` (y sus derivados) registran, si se les da un destino de
+telemetría, un evento por punto evaluado con la energía media y su desviación,
+el número de evaluación, la norma de los parámetros, los shots y el tiempo de
+pared repartido en ligar parámetros (bind), transpilar, simular y
+posprocesar. El tiempo de cada job se reparte en partes iguales entre sus
+puntos. La transpilación del ansatz se hace una sola vez y queda en un evento
+``setup`` aparte.
+
+Los destinos son ``RingBuffer`` (en memoria, con capacidad fija) y
+``JsonlWriter`` (un JSON por línea, con escritura en bloques). ``summarize``
+resume una secuencia de eventos.
+"""
+import json
+import math
+import sys
+from collections import deque
+
+import numpy as np
+
+PHASES = ('bind', 'transpile', 'simulate', 'postprocess')
+
+
+class RingBuffer:
+    """Guarda los últimos ``capacity`` eventos en memoria."""
+
+    def __init__(self, capacity=10000):
+        self.events = deque(maxlen=capacity)
+
+    def record(self, event):
+        self.events.append(event)
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def close(self):
+        pass
+
+
+class JsonlWriter:
+    """Escribe cada evento como una línea JSON; vacía el búfer cada ``flush_every`` eventos."""
+
+    def __init__(self, path, flush_every=100, append=False):
+        self.path = path
+        self.flush_every = flush_every
+        self._buffer = []
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def record(self, event):
+        self._buffer.append(event)
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write(''.join(json.dumps(event) + '\n' for event in self._buffer))
+            self._file.flush()
+            self._buffer = []
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def evaluation_events(points, stats, timings, first_evaluation, shots):
+    """Un evento por punto; los tiempos del job (``timings``) se reparten entre los puntos."""
+    share = {phase: timings.get(phase, 0.0) / len(points) for phase in PHASES}
+    norms = np.linalg.norm(points, axis=1)
+    return [{'event': 'evaluation', 'evaluation': first_evaluation + i,
+             'energy': float(mean), 'std': float(std), 'param_norm': float(norm),
+             'shots': shots, **share}
+            for i, ((mean, std), norm) in enumerate(zip(stats, norms))]
+
+
+def summarize(events):
+    """
+    Resume los eventos: mejor energía, tasa de convergencia y reparto del tiempo.
+
+    La tasa de convergencia es la pendiente de log(E - E_mín) por evaluación
+    sobre la curva de mejor energía hasta el momento (negativa si converge),
+    ajustada por mínimos cuadrados hasta la última mejora.
+    """
+    energies, times = [], dict.fromkeys(PHASES, 0.0)
+    for event in events:
+        for phase in PHASES:
+            times[phase] += event.get(phase, 0.0)
+        if event.get('event') == 'evaluation':
+            energies.append(event['energy'])
+
+    total = sum(times.values())
+    summary = {'evaluations': len(energies), 'seconds': total,
+               'time_fraction': {phase: (t / total if total else 0.0)
+                                 for phase, t in times.items()}}
+    if not energies:
+        return summary
+
+    best_so_far = np.minimum.accumulate(energies)
+    best = best_so_far[-1]
+    summary.update(first_energy=energies[0], best_energy=float(best),
+                   best_evaluation=int(np.argmin(energies)))
+
+    # Excedente sobre el mínimo, hasta la evaluación del mínimo (excluida)
+    gap = best_so_far[:summary['best_evaluation']] - best
+    steps = np.flatnonzero(gap > 0)
+    if len(steps) >= 2:
+        slope, _ = np.polyfit(steps, np.log(gap[steps]), 1)
+        summary['convergence_rate'] = float(slope)
+        summary['evaluations_per_e_fold'] = float(-1 / slope) if slope < 0 else math.inf
+    return summary
+
+
+def format_summary(summary):
+    lines = [f"Evaluaciones: {summary['evaluations']}, tiempo registrado: "
+             f"{summary['seconds']:.2f} s"]
+    if 'best_energy' in summary:
+        lines.append(f"Energía: {summary['first_energy']:.2f} -> {summary['best_energy']:.2f} "
+                     f"(mejor en la evaluación {summary['best_evaluation']})")
+    if 'convergence_rate' in summary:
+        lines.append(f"Convergencia: {summary['convergence_rate']:.4f} por evaluación "
+                     f"(una e-fold cada {summary['evaluations_per_e_fold']:.1f} evaluaciones)")
+    lines.append('Tiempo: ' + ', '.join(f'{phase} {fraction:.1%}'
+                                        for phase, fraction in summary['time_fraction'].items()))
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print(f'Usage: python {sys.argv[0]} <telemetría.jsonl>')
+        sys.exit(1)
+
+    print(format_summary(summarize(read_jsonl(sys.argv[1]))))
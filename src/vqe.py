@@ -1,24 +1,45 @@
 import math
 import os
 import sys
-import pickle
+import time
 
-from qiskit import IBMQ, QuantumRegister, transpile, assemble
-from qiskit.utils import QuantumInstance
+import numpy as np
+
+from qiskit import IBMQ, QuantumRegister
 from qiskit.circuit import Parameter, QuantumCircuit
 from qiskit.circuit.library import RYGate, CXGate
-from qiskit.algorithms import VQE
 from qiskit.algorithms.optimizers import SPSA
 from qiskit.opflow import PauliSumOp
 
 
+from ansatz import constraint_ansatz
+from artifacts import get_writer
+from async_executor import AsyncExecutor, AsyncObjective, BackendProvider
+from profiling import stage
+from readout_mitigation import get_calibration
 from restrictions import create_hamiltonian
+from result_cache import CachingProvider, ResultCache
+from run_store import RUN_STORE_PATH, RunStore
+from sudoku_board import is_valid_board
 
 QUBITS_PER_CELL = 2
 SUDOKU_ROWS = 2
 SUDOKU_COLS = 4
 ALPHA = 1000
 TOTAL_QUBITS = SUDOKU_COLS * SUDOKU_ROWS * QUBITS_PER_CELL
+ANSATZ_LAYERS = 2
+# Circuitos por job y jobs simultáneos en la cola del backend remoto
+MAX_CIRCUITS_PER_JOB = 100
+MAX_JOBS_IN_FLIGHT = 4
+# Directorio de la caché de conteos por circuito (None desactiva). Los conteos
+# del backend remoto no tienen semilla: con la caché activa, las ejecuciones
+# repetidas reproducen las muestras guardadas en lugar de tomar otras nuevas
+RESULT_CACHE_DIR = None
+# Base SQLite donde se agrega cada ejecución (None desactiva)
+RUN_STORE = RUN_STORE_PATH
+# Corregir los conteos por errores de lectura con una calibración por qubit,
+# hecha una vez por backend y guardada en caché
+READOUT_MITIGATION = False
 
 
 def create_subgrids(num_rows, num_cols, subgrid_rows=None, subgrid_cols=None):
@@ -108,9 +129,9 @@ if __name__ == '__main__':
 
     from config import api_key
 
-    H = create_hamiltonian(ALPHA, SUDOKU_ROWS, SUDOKU_COLS)
-
-    H_converted = convert_to_paulisumop(H)
+    start = time.perf_counter()
+    with stage('create_hamiltonian'):
+        H = create_hamiltonian(ALPHA, SUDOKU_ROWS, QUBITS_PER_CELL, SUDOKU_COLS)
 
     # Cargar la cuenta de IBM Q
     IBMQ.save_account(api_key, overwrite=True)
@@ -119,44 +140,68 @@ if __name__ == '__main__':
     provider = IBMQ.get_provider(hub='ibm-q')
     backend = provider.get_backend('ibmq_qasm_simulator')
 
-    quantum_instance = QuantumInstance(backend, shots=20000)
+    mitigation = None
+    if READOUT_MITIGATION:
+        with stage('calibrate'):
+            mitigation = get_calibration(backend, TOTAL_QUBITS)
 
     optimizer = SPSA(maxiter=250)
-    ansatz, params = sudoku_ansatz(SUDOKU_ROWS, SUDOKU_COLS)
-
-    print(ansatz.draw())
-
-    optimal_params = []
-    vqe = VQE(ansatz, optimizer, quantum_instance=quantum_instance,
-              callback=store_intermediate_result)
-
-    result = vqe.compute_minimum_eigenvalue(H_converted)
-
-    # Guardar los parámetros óptimos en un archivo
-    with open('optimal_params.pkl', 'wb') as f:
-        pickle.dump(optimal_params, f)
-
-    # Preparar el estado cuántico óptimo
-    optimal_circuit = ansatz.bind_parameters(optimal_params)
-    # Añadir mediciones
-    optimal_circuit.measure_all()
-
-    # Realizar mediciones
-    transpiled_circuit = transpile(optimal_circuit, backend)
-    qobj = assemble(transpiled_circuit, backend, shots=20000)
-    measurement_result = backend.run(qobj).result()
-    counts = measurement_result.get_counts(optimal_circuit)
+    # Los dos puntos perturbados de cada iteración viajan en el mismo job
+    optimizer.set_max_evals_grouped(2)
+    with stage('ansatz'):
+        ansatz, params = constraint_ansatz(H, layers=ANSATZ_LAYERS)
+
+    get_writer().draw_circuit(ansatz, 'ansatz')
+
+    executor_provider = BackendProvider(backend)
+    if RESULT_CACHE_DIR:
+        cache = ResultCache(RESULT_CACHE_DIR)
+        executor_provider = CachingProvider(executor_provider, cache)
+
+    with AsyncExecutor(executor_provider, max_circuits_per_job=MAX_CIRCUITS_PER_JOB,
+                       max_jobs_in_flight=MAX_JOBS_IN_FLIGHT) as executor:
+        objective = AsyncObjective(ansatz, H, executor, shots=20000, mitigation=mitigation)
+        initial_point = np.random.uniform(-np.pi, np.pi, ansatz.num_parameters)
+        with stage('optimize'):
+            result = optimizer.minimize(objective, initial_point)
+        optimal_params = result.x
+
+        # Medir el estado óptimo
+        with stage('measure'):
+            counts = objective.run_counts(optimal_params)[0]
+
+    print(f'Energía: {result.fun}, evaluaciones: {objective.num_evaluations}, '
+          f'jobs: {objective.num_jobs}')
+    if RESULT_CACHE_DIR:
+        print(f'Caché de resultados: {cache.stats()}')
 
     # La configuración de qubits más probable es nuestra solución
     solution = max(counts, key=counts.get)
 
     # Decodificar la solución en formato de Sudoku
-    sudoku_solution = []
-    for i in range(SUDOKU_COLS * SUDOKU_ROWS):
-        bits = solution[i * QUBITS_PER_CELL: (i + 1) * QUBITS_PER_CELL]
-        # Convertir de binario a decimal y ajustar el rango 1-4
-        number = int(bits, 2) + 1
-        sudoku_solution.append(number)
+    with stage('decode'):
+        sudoku_solution = []
+        for i in range(SUDOKU_COLS * SUDOKU_ROWS):
+            bits = solution[i * QUBITS_PER_CELL: (i + 1) * QUBITS_PER_CELL]
+            # Convertir de binario a decimal y ajustar el rango 1-4
+            number = int(bits, 2) + 1
+            sudoku_solution.append(number)
+
+    if RUN_STORE:
+        # El mismo tablero 1..4 que se imprime, fila por fila
+        board = [sudoku_solution[row * SUDOKU_COLS:(row + 1) * SUDOKU_COLS]
+                 for row in range(SUDOKU_ROWS)]
+        config = {'alpha': ALPHA, 'qubits_per_cell': QUBITS_PER_CELL,
+                  'ansatz_layers': ANSATZ_LAYERS, 'backend': backend.name(),
+                  'readout_mitigation': READOUT_MITIGATION}
+        with stage('store'), RunStore(RUN_STORE) as store:
+            run_id = store.append(
+                'vqe', config, hamiltonian=H, rows=SUDOKU_ROWS, cols=SUDOKU_COLS,
+                energy=result.fun, valid=is_valid_board(board), board=board,
+                parameters=optimal_params, trace=objective.history,
+                evaluations=objective.num_evaluations, jobs=objective.num_jobs,
+                total_shots=objective.total_shots, seconds=time.perf_counter() - start)
+        print(f'Ejecución {run_id} guardada en {RUN_STORE}')
 
     # Imprimir la solución del Sudoku
     for i, val in enumerate(sudoku_solution):
@@ -1,24 +1,55 @@
 import math
 import os
 import sys
-import pickle
+import time
+
+import numpy as np
 
 from qiskit import QuantumRegister, transpile, assemble, Aer
-from qiskit.utils import QuantumInstance
 from qiskit.circuit import Parameter, QuantumCircuit
 from qiskit.circuit.library import RYGate, CXGate
-from qiskit.algorithms import VQE
 from qiskit.algorithms.optimizers import SPSA
 from qiskit.opflow import PauliSumOp
+from qiskit.utils import algorithm_globals
 
 
+from adaptive_shots import AdaptiveShots
+from batched_objective import BatchedObjective
+from early_stopping import EarlyStopping, minimize_until_valid
+from gradients import optimize
+from profiling import stage
+from ansatz import constraint_ansatz
+from artifacts import get_writer
+from repair import repair_samples
 from restrictions import create_hamiltonian
+from result_cache import ResultCache
+from run_store import RUN_STORE_PATH, RunStore
+from sudoku_board import decode_board, is_valid_board
+from telemetry import JsonlWriter, format_summary, read_jsonl, summarize
 
 QUBITS_PER_CELL = 2
 SUDOKU_ROWS = 2
 SUDOKU_COLS = 2
 ALPHA = 100
 TOTAL_QUBITS = SUDOKU_COLS * SUDOKU_ROWS, QUBITS_PER_CELL
+ANSATZ_LAYERS = 2
+# None usa SPSA; 'parameter_shift' o 'adjoint' usan L-BFGS-B con gradientes
+GRADIENT = None
+# Probabilidad mínima de un tablero válido para detener SPSA antes de tiempo (None desactiva)
+EARLY_STOP_THRESHOLD = 0.05
+# Número de bitstrings más medidos que se intentan reparar (0 desactiva)
+REPAIR_TOP_N = 20
+# Directorio de la caché de conteos por lote (None desactiva); solo se usa con SEED
+RESULT_CACHE_DIR = None
+# Semilla del punto inicial, de SPSA y del simulador; con una semilla fija las
+# ejecuciones repetidas se sirven desde la caché (None: aleatorio)
+SEED = None
+# Shots iniciales de la asignación adaptativa (None: siempre 20000 shots)
+MIN_SHOTS = None
+# Base SQLite donde se agrega cada ejecución (None desactiva)
+RUN_STORE = RUN_STORE_PATH
+# Archivo JSONL con la telemetría de cada evaluación (None desactiva)
+TELEMETRY = None
 
 
 def create_subgrids(num_rows, num_cols, subgrid_rows=None, subgrid_cols=None):
@@ -100,59 +131,138 @@ def store_intermediate_result(eval_count, parameters, mean, std):
     optimal_params = parameters
 
 
-if __name__ == '__main__':
-    H = create_hamiltonian(ALPHA, SUDOKU_ROWS, QUBITS_PER_CELL, SUDOKU_COLS)
-
-    H_converted = convert_to_paulisumop(H)
+def solve(rows=SUDOKU_ROWS, cols=SUDOKU_COLS):
+    """Resuelve un tablero vacío de rows x cols con VQE y devuelve el tablero decodificado."""
+    start = time.perf_counter()
+    with stage('create_hamiltonian'):
+        H = create_hamiltonian(ALPHA, rows, QUBITS_PER_CELL, cols)
 
     backend = Aer.get_backend('qasm_simulator')
 
-    quantum_instance = QuantumInstance(backend, shots=20000)
-
-    optimizer = SPSA(maxiter=250)
-    ansatz, params = sudoku_ansatz(SUDOKU_ROWS, SUDOKU_COLS)
-
-    print(ansatz.draw())
-
-    optimal_params = []
-    vqe = VQE(ansatz, optimizer, quantum_instance=quantum_instance,
-              callback=store_intermediate_result)
-
-    result = vqe.compute_minimum_eigenvalue(H_converted)
-
-    # Guardar los parámetros óptimos en un archivo
-    with open('optimal_params.pkl', 'wb') as f:
-        pickle.dump(optimal_params, f)
-
-    # Preparar el estado cuántico óptimo
-    optimal_circuit = ansatz.bind_parameters(optimal_params)
-    # Añadir mediciones
-    optimal_circuit.measure_all()
-
-    # Realizar mediciones
-    transpiled_circuit = transpile(optimal_circuit, backend)
-    qobj = assemble(transpiled_circuit, backend, shots=20000)
-    measurement_result = backend.run(qobj).result()
-    counts = measurement_result.get_counts(optimal_circuit)
+    with stage('ansatz'):
+        ansatz, params = constraint_ansatz(H, layers=ANSATZ_LAYERS)
+
+    get_writer().draw_circuit(ansatz, 'ansatz')
+
+    if SEED is not None:
+        algorithm_globals.random_seed = SEED
+    rng = np.random.default_rng(SEED)
+    initial_point = rng.uniform(-np.pi, np.pi, ansatz.num_parameters)
+
+    optimize_start = time.perf_counter()
+    with stage('optimize'):
+        if GRADIENT is None:
+            optimizer = SPSA(maxiter=250)
+            # SPSA evalúa dos puntos perturbados por iteración: se envían en un solo job
+            optimizer.set_max_evals_grouped(2)
+            # Sin semilla los conteos son aleatorios y no se guardan en la caché
+            cache = (ResultCache(RESULT_CACHE_DIR)
+                     if RESULT_CACHE_DIR and SEED is not None else None)
+            telemetry = JsonlWriter(TELEMETRY) if TELEMETRY else None
+            try:
+                objective = BatchedObjective(ansatz, H, backend, shots=20000, seed=SEED,
+                                             cache=cache, telemetry=telemetry)
+                if MIN_SHOTS is not None:
+                    objective = AdaptiveShots(objective, min_shots=MIN_SHOTS, max_shots=20000)
+                if EARLY_STOP_THRESHOLD is None:
+                    result = optimizer.minimize(objective, initial_point)
+                else:
+                    stopper = EarlyStopping(rows, cols, QUBITS_PER_CELL,
+                                            threshold=EARLY_STOP_THRESHOLD)
+                    found, result = minimize_until_valid(
+                        optimizer, objective, initial_point, stopper)
+                if result is None:
+                    print(f"Tablero válido {found['board']} con probabilidad "
+                          f"{found['probability']:.3f} tras {found['iterations']} iteraciones "
+                          f"({found['evaluations']} evaluaciones, {found['jobs']} jobs) "
+                          f"en {found['seconds']:.2f} s")
+                    optimal_params = found['parameters']
+                    energy = objective(optimal_params)
+                else:
+                    optimal_params, energy = result.x, result.fun
+                num_evaluations = objective.num_evaluations
+                history, jobs = objective.history, objective.num_jobs
+                total_shots = objective.total_shots
+                print(f'Shots totales: {objective.total_shots}')
+                if cache is not None:
+                    print(f'Caché de resultados: {cache.stats()}')
+            finally:
+                # Cerrar el archivo aunque la optimización falle, para no perder eventos
+                if telemetry is not None:
+                    telemetry.close()
+            if telemetry is not None:
+                print(format_summary(summarize(read_jsonl(TELEMETRY))))
+        else:
+            optimal_params, energy, estimator = optimize(
+                ansatz, H, initial_point, gradient=GRADIENT, backend=backend, shots=20000)
+            num_evaluations = estimator.num_evaluations
+            history, jobs, total_shots = [], None, None
+    optimize_seconds = time.perf_counter() - optimize_start
+
+    print(f'Energía: {energy}, evaluaciones: {num_evaluations}')
+
+    with stage('measure'):
+        # Preparar el estado cuántico óptimo
+        optimal_circuit = ansatz.bind_parameters(optimal_params)
+        # Añadir mediciones
+        optimal_circuit.measure_all()
+
+        # Realizar mediciones
+        with stage('transpile'):
+            transpiled_circuit = transpile(optimal_circuit, backend)
+        with stage('simulate'):
+            qobj = assemble(transpiled_circuit, backend, shots=20000)
+            measurement_result = backend.run(qobj).result()
+            counts = measurement_result.get_counts(optimal_circuit)
 
     # La configuración de qubits más probable es nuestra solución
     solution = max(counts, key=counts.get)
 
+    # Si no es un tablero válido, reparar las muestras más frecuentes
+    if REPAIR_TOP_N and not is_valid_board(
+            decode_board(solution, rows, cols, QUBITS_PER_CELL)):
+        with stage('repair'):
+            repaired = repair_samples(counts, H, rows, cols, QUBITS_PER_CELL,
+                                      top_n=REPAIR_TOP_N)
+        if repaired:
+            print(f"Reparado con {repaired[0]['steps']} cambios de bit desde "
+                  f"{repaired[0]['original']}")
+            solution = repaired[0]['bitstring']
+
     print(solution)
 
     # Decodificar la solución en formato de Sudoku
-    sudoku_solution = []
-
-    for i in range(SUDOKU_ROWS):
-        row = []
-        for j in range(SUDOKU_COLS):
-            idx = i * SUDOKU_COLS + j
-            number = solution[idx * QUBITS_PER_CELL:idx *
-                              QUBITS_PER_CELL + QUBITS_PER_CELL]
-            number = int(number, 2)
-            row.append(number)
-        sudoku_solution.append(row)
+    with stage('decode'):
+        sudoku_solution = []
+
+        for i in range(rows):
+            row = []
+            for j in range(cols):
+                idx = i * cols + j
+                number = solution[idx * QUBITS_PER_CELL:idx *
+                                  QUBITS_PER_CELL + QUBITS_PER_CELL]
+                number = int(number, 2)
+                row.append(number)
+            sudoku_solution.append(row)
+
+    if RUN_STORE:
+        config = {'alpha': ALPHA, 'qubits_per_cell': QUBITS_PER_CELL,
+                  'ansatz_layers': ANSATZ_LAYERS, 'gradient': GRADIENT, 'seed': SEED,
+                  'early_stop_threshold': EARLY_STOP_THRESHOLD, 'min_shots': MIN_SHOTS,
+                  'repair_top_n': REPAIR_TOP_N}
+        with stage('store'), RunStore(RUN_STORE) as store:
+            run_id = store.append(
+                'vqe', config, hamiltonian=H, rows=rows, cols=cols, energy=energy,
+                valid=is_valid_board(sudoku_solution), board=sudoku_solution,
+                parameters=optimal_params, trace=history, evaluations=num_evaluations,
+                jobs=jobs, total_shots=total_shots, seconds=time.perf_counter() - start,
+                timings={'optimize': optimize_seconds})
+        print(f'Ejecución {run_id} guardada en {RUN_STORE}')
+
+    return sudoku_solution
+
 
+if __name__ == '__main__':
     # Imprimir la solución
-    for row in sudoku_solution:
+    for row in solve():
         print(row)
@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+
+from adaptive_shots import AdaptiveShots
+
+
+class FakeObjective:
+    """Objetivo con energías fijas: f+ - f- = ``difference`` y σ = 1 en cada punto."""
+
+    def __init__(self, difference):
+        self.difference = difference
+        self.shots = None
+        self.total_shots = 0
+
+    def evaluate(self, points):
+        points = np.atleast_2d(points)
+        self.total_shots += self.shots * len(points)
+        means = np.zeros(len(points))
+        means[0] = self.difference
+        return means, np.ones(len(points))
+
+
+def run(difference, evaluations, **kwargs):
+    adaptive = AdaptiveShots(FakeObjective(difference), min_shots=500, window=4, **kwargs)
+    for _ in range(evaluations):
+        adaptive(np.zeros((2, 3)))
+    return adaptive
+
+
+class AdaptiveShotsTest(unittest.TestCase):
+    def test_starts_with_the_minimum(self):
+        adaptive = AdaptiveShots(FakeObjective(1.0), min_shots=300)
+        self.assertEqual(adaptive.shots, 300)
+
+    def test_shots_grow_when_noise_dominates(self):
+        # Con σ = 1 se necesitan 2 / 0.01² = 20000 shots para resolver la diferencia
+        adaptive = run(0.01, 3)
+        self.assertEqual(adaptive.shots, 500)
+        adaptive(np.zeros((2, 3)))
+        self.assertEqual(adaptive.shots, 1000)
+        self.assertEqual(adaptive.shot_history, [500] * 4)
+
+    def test_shots_stay_when_the_difference_is_resolved(self):
+        adaptive = run(1.0, 20)
+        self.assertEqual(adaptive.shots, 500)
+        self.assertEqual(adaptive.total_shots, 20 * 2 * 500)
+
+    def test_growth_is_capped_and_never_decreases(self):
+        adaptive = run(0.01, 40, max_shots=3000)
+        self.assertEqual(adaptive.shots, 3000)
+        self.assertEqual(adaptive.shot_history, sorted(adaptive.shot_history))
+
+        # Alcanza la mediana de los shots necesarios, no más
+        adaptive = run(0.02, 40, growth=10.0)
+        self.assertEqual(adaptive.shots, 5000)
+
+        # Si la diferencia se resuelve con menos shots, no se reducen
+        adaptive = run(0.1, 40)
+        self.assertEqual(set(adaptive.shot_history), {500})
+
+    def test_single_points_do_not_adjust_shots(self):
+        adaptive = run(0.0, 0)
+        for _ in range(10):
+            self.assertIsInstance(adaptive(np.zeros(3)), float)
+        self.assertEqual(adaptive.shots, 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
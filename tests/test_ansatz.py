@@ -0,0 +1,65 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from qiskit.quantum_info import SparsePauliOp
+
+from ansatz import constraint_ansatz, constraint_graph, schedule_edges, spanning_edges
+from restrictions import create_hamiltonian
+
+
+def components(edges):
+    parent = {}
+
+    def find(node):
+        while parent.setdefault(node, node) != node:
+            node = parent[node]
+        return node
+
+    for i, j in edges:
+        parent[find(i)] = find(j)
+    groups = {}
+    for node in list(parent):
+        groups.setdefault(find(node), set()).add(node)
+    return sorted(map(sorted, groups.values()))
+
+
+class ConstraintGraphTest(unittest.TestCase):
+    def test_edges_are_the_coupled_qubit_pairs(self):
+        H = SparsePauliOp(['IIZZ', 'ZIIZ', 'IZII'], [1, 1, 1])
+        self.assertEqual(constraint_graph(H), [(0, 1), (0, 3)])
+
+    def test_spanning_forest_keeps_components_with_fewest_edges(self):
+        edges = constraint_graph(create_hamiltonian(100, 2, 2, 2))
+        tree = spanning_edges(edges)
+        self.assertEqual(components(tree), components(edges))
+        self.assertEqual(len(tree), sum(len(c) - 1 for c in components(edges)))
+
+    def test_layers_do_not_share_qubits(self):
+        edges = constraint_graph(create_hamiltonian(100, 2, 2, 2))
+        layers = schedule_edges(edges)
+        self.assertEqual(sorted(edge for layer in layers for edge in layer), sorted(edges))
+        for layer in layers:
+            qubits = [q for edge in layer for q in edge]
+            self.assertEqual(len(qubits), len(set(qubits)))
+
+
+class ConstraintAnsatzTest(unittest.TestCase):
+    def test_tree_ansatz_is_shallower_than_full(self):
+        H = create_hamiltonian(100, 2, 2, 2)
+        tree, params = constraint_ansatz(H, layers=2)
+        full, _ = constraint_ansatz(H, layers=2, entanglement='full')
+        self.assertEqual(len(params), 3 * H.num_qubits)
+        self.assertEqual(tree.num_parameters, len(params))
+        self.assertLess(tree.count_ops()['cx'], full.count_ops()['cx'])
+        self.assertEqual(tree.count_ops()['cx'], 2 * len(spanning_edges(constraint_graph(H))))
+
+    def test_unknown_entanglement_is_rejected(self):
+        with self.assertRaises(ValueError):
+            constraint_ansatz(create_hamiltonian(100, 2, 2, 2), entanglement='ring')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from qiskit import QuantumCircuit
+
+import artifacts
+from artifacts import ArtifactWriter
+
+
+def bell():
+    circuit = QuantumCircuit(2)
+    circuit.h(0)
+    circuit.cx(0, 1)
+    return circuit
+
+
+class ArtifactWriterTest(unittest.TestCase):
+    def tearDown(self):
+        artifacts.configure(None)
+
+    def test_disabled_writer_draws_nothing(self):
+        writer = ArtifactWriter()
+        self.assertFalse(writer.enabled)
+        self.assertIsNone(writer.draw_circuit(bell(), 'bell'))
+        self.assertIsNone(writer.plot_histogram({'00': 1}, 'counts'))
+
+    def test_enabled_writer_writes_files_in_the_background(self):
+        directory = tempfile.mkdtemp()
+        writer = ArtifactWriter(directory)
+        circuit = bell()
+        text = writer.draw_circuit(circuit, 'bell')
+        # El dibujo usa una copia: cambios posteriores no lo afectan
+        circuit.measure_all()
+        histogram = writer.plot_histogram({'00': 3, '11': 5}, 'counts')
+        writer.close()
+
+        self.assertEqual(text.result(), os.path.join(directory, 'bell.txt'))
+        with open(text.result(), encoding='utf-8') as f:
+            self.assertNotIn('meas', f.read())
+        self.assertTrue(os.path.getsize(histogram.result()) > 0)
+        self.assertFalse(writer.enabled)
+
+    def test_global_writer_follows_the_environment(self):
+        directory = tempfile.mkdtemp()
+        artifacts._writer = None
+        with mock.patch.dict(os.environ, {'SUDOKU_ARTIFACTS': directory}):
+            writer = artifacts.get_writer()
+        self.assertEqual(writer.directory, directory)
+        self.assertIs(artifacts.get_writer(), writer)
+
+        self.assertFalse(artifacts.configure(None).enabled)
+        self.assertFalse(writer.enabled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from qiskit import Aer, QuantumCircuit
+
+from async_executor import AsyncExecutor, FakeLatencyProvider
+
+
+class AsyncExecutorCloseTest(unittest.TestCase):
+    def test_close_right_after_submit_does_not_hang(self):
+        circuit = QuantumCircuit(1)
+        circuit.h(0)
+        circuit.measure_all()
+        provider = FakeLatencyProvider(Aer.get_backend('qasm_simulator'), queue_delay=0.01)
+        futures = []
+
+        def run():
+            # close() llega dentro de la ventana de agrupamiento del primer circuito
+            with AsyncExecutor(provider, batch_window=1.0) as executor:
+                futures.append(executor.submit(circuit, 100))
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join(timeout=30)
+        self.assertFalse(thread.is_alive(), 'close() no terminó')
+        self.assertEqual(sum(futures[0].result(timeout=0).values()), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
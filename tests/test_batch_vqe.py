@@ -0,0 +1,65 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from batch_vqe import MODES, random_puzzles, solve_batch, solve_sequential
+from sudoku_board import is_valid_board
+
+
+def keeps_clues(puzzle, board):
+    return all(clue == value for clue_row, row in zip(puzzle, board)
+               for clue, value in zip(clue_row, row) if clue)
+
+
+class RandomPuzzlesTest(unittest.TestCase):
+    def test_latin_rectangles_with_the_requested_clues(self):
+        puzzles = random_puzzles(2, 4, 5, 6, seed=1)
+        self.assertEqual(len(puzzles), 6)
+        for puzzle in puzzles:
+            self.assertEqual((len(puzzle), len(puzzle[0])), (2, 4))
+            clues = [value for row in puzzle for value in row if value]
+            self.assertEqual(len(clues), 5)
+            self.assertTrue(all(1 <= value <= 4 for value in clues))
+            for line in puzzle + [list(column) for column in zip(*puzzle)]:
+                line = [value for value in line if value]
+                self.assertEqual(len(line), len(set(line)))
+        self.assertEqual(puzzles, random_puzzles(2, 4, 5, 6, seed=1))
+
+    def test_square_puzzles_use_the_sudoku_generator(self):
+        for puzzle in random_puzzles(4, 4, 10, 3):
+            self.assertEqual(sum(value != 0 for row in puzzle for value in row), 10)
+
+
+class SolveBatchTest(unittest.TestCase):
+    def setUp(self):
+        # Dos celdas libres por sudoku: 4 qubits con la codificación binaria
+        self.puzzles = random_puzzles(2, 4, 6, 4, seed=1)
+
+    def test_every_mode_solves_the_batch_keeping_the_clues(self):
+        for mode in MODES:
+            with self.subTest(mode=mode):
+                results, stats = solve_batch(self.puzzles, mode=mode, maxiter=20, seed=0)
+                self.assertEqual(stats['solved'], len(self.puzzles))
+                # Todo el lote se evalúa en pocos jobs
+                self.assertLess(stats['jobs'], stats['experiments'])
+                for puzzle, result in zip(self.puzzles, results):
+                    self.assertEqual(result['qubits'], 4)
+                    self.assertTrue(result['valid'])
+                    self.assertTrue(is_valid_board(result['board']))
+                    self.assertTrue(keeps_clues(puzzle, result['board']))
+                    self.assertLessEqual(result['found_at'], result['iterations'])
+
+    def test_sequential_runs_one_batch_per_puzzle(self):
+        results, stats = solve_sequential(self.puzzles[:2], maxiter=20, seed=0)
+        self.assertEqual((stats['mode'], stats['puzzles'], len(results)), ('sequential', 2, 2))
+        self.assertEqual(stats['solved'], sum(result['valid'] for result in results))
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            solve_batch(self.puzzles, mode='serial')
+
+
+if __name__ == '__main__':
+    unittest.main()
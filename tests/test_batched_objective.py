@@ -0,0 +1,89 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+from qiskit import Aer
+
+from ansatz import constraint_ansatz
+from batched_objective import BatchedObjective
+from early_stopping import SolutionFound
+from energy import DiagonalHamiltonian
+from restrictions import create_hamiltonian
+from telemetry import RingBuffer
+
+
+def stop(points, counts_list):
+    # Como EarlyStopping al encontrar un tablero: detiene la optimización desde el callback
+    raise SolutionFound({'board': None})
+
+
+class DiagonalHamiltonianTest(unittest.TestCase):
+    def test_diagonal_matches_the_operator_matrix(self):
+        from qiskit.quantum_info import Operator
+
+        H = create_hamiltonian(100, 2, 2, 2)
+        np.testing.assert_allclose(DiagonalHamiltonian(H).diagonal(),
+                                   np.real(np.diag(Operator(H).data)))
+
+    def test_expectation_weights_bitstrings_by_counts(self):
+        H = create_hamiltonian(100, 2, 2, 2)
+        diagonal = DiagonalHamiltonian(H)
+        counts = {'01101001': 3, '00000000': 1}
+        energies = diagonal.bitstring_energies(list(counts))
+        mean, std = diagonal.expectation(counts)
+        self.assertAlmostEqual(mean, (3 * energies[0] + energies[1]) / 4)
+        self.assertAlmostEqual(std, np.sqrt(3) / 4 * abs(energies[0] - energies[1]))
+
+
+class BatchedObjectiveTest(unittest.TestCase):
+    def setUp(self):
+        self.H = create_hamiltonian(100, 2, 2, 2)
+        self.ansatz, _ = constraint_ansatz(self.H)
+        self.backend = Aer.get_backend('qasm_simulator')
+        self.points = np.random.default_rng(0).uniform(
+            -np.pi, np.pi, (3, self.ansatz.num_parameters))
+
+    def objective(self):
+        return BatchedObjective(self.ansatz, self.H, self.backend, shots=2000, seed=11)
+
+    def test_all_points_go_in_one_job(self):
+        objective = self.objective()
+        energies = objective(self.points)
+        self.assertEqual(energies.shape, (3,))
+        self.assertEqual(objective.num_jobs, 1)
+        self.assertEqual(objective.num_evaluations, 3)
+        self.assertEqual(objective.total_shots, 6000)
+        self.assertIsInstance(objective(self.points[0]), float)
+
+    def test_energies_are_the_expectation_of_the_counts(self):
+        counts_list = self.objective().run_counts(self.points)
+        expected = [DiagonalHamiltonian(self.H).expectation(counts)[0] for counts in counts_list]
+        np.testing.assert_allclose(self.objective()(self.points), expected)
+
+    def test_wrong_number_of_parameters_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.objective()(np.zeros(self.ansatz.num_parameters + 1))
+
+
+class BatchedObjectiveCallbackTest(unittest.TestCase):
+    def test_stopping_callback_keeps_history_and_telemetry(self):
+        H = create_hamiltonian(100, 2, 2, 2)
+        ansatz, _ = constraint_ansatz(H)
+        telemetry = RingBuffer()
+        objective = BatchedObjective(ansatz, H, Aer.get_backend('qasm_simulator'),
+                                     shots=1000, seed=7, callback=stop, telemetry=telemetry)
+        points = np.zeros((2, ansatz.num_parameters))
+
+        with self.assertRaises(SolutionFound):
+            objective(points)
+
+        self.assertEqual(len(objective.history), 2)
+        evaluations = [event for event in telemetry if event['event'] == 'evaluation']
+        self.assertEqual([event['evaluation'] for event in evaluations], [0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
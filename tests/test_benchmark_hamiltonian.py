@@ -0,0 +1,36 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from benchmark_hamiltonian import BASELINE, compare
+
+OK = {'status': 'ok', 'seconds': 1.0, 'peak': 1000, 'qubits': 16, 'terms': 100}
+
+
+class CompareTest(unittest.TestCase):
+    def test_unchanged_results_have_no_regressions(self):
+        baseline = {'a': OK, 'b': {'status': 'timeout'}}
+        self.assertEqual(compare(dict(baseline), baseline), [])
+
+    def test_status_changes_are_reported_both_ways(self):
+        baseline = {'worse': OK, 'better': {'status': 'timeout'}}
+        results = {'worse': {'status': 'memory'}, 'better': OK}
+        regressions = compare(results, baseline)
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('terminaba y ahora da memory', regressions[0])
+        self.assertIn('de timeout a ok', regressions[1])
+
+    def test_slower_and_larger_results_are_regressions(self):
+        results = {'a': dict(OK, seconds=2.0, terms=101)}
+        regressions = compare(results, {'a': OK})
+        self.assertEqual(len(regressions), 2)
+
+    def test_baseline_path_does_not_depend_on_working_directory(self):
+        self.assertTrue(os.path.isabs(BASELINE))
+        self.assertTrue(os.path.exists(BASELINE))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import itertools
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from cell_encodings import ENCODINGS, decode_encoded_board, get_encoding
+from energy import DiagonalHamiltonian
+from restrictions import create_hamiltonian
+
+DIGITS = 4
+
+
+def energies(operator, bitstrings):
+    return dict(zip(bitstrings, DiagonalHamiltonian(operator).bitstring_energies(bitstrings)))
+
+
+class CellEncodingTest(unittest.TestCase):
+    def test_encode_decode_round_trip(self):
+        for name, encoding in ENCODINGS.items():
+            with self.subTest(encoding=name):
+                codes = [encoding.encode(digit, DIGITS) for digit in range(DIGITS)]
+                self.assertTrue(all(len(code) == encoding.qubits(DIGITS) for code in codes))
+                self.assertEqual(len(set(map(tuple, codes))), DIGITS)
+                self.assertEqual([encoding.decode(code, DIGITS) for code in codes],
+                                 list(range(DIGITS)))
+
+    def test_indicator_and_penalty_agree_with_the_codewords(self):
+        for name, encoding in ENCODINGS.items():
+            with self.subTest(encoding=name):
+                q = encoding.qubits(DIGITS)
+                positions = list(range(q))
+                bitstrings = [''.join(bits) for bits in itertools.product('01', repeat=q)]
+                penalty = energies(encoding.penalty(positions, DIGITS, q), bitstrings)
+                indicators = [energies(encoding.indicator(positions, digit, q), bitstrings)
+                              for digit in range(DIGITS)]
+
+                for bitstring in bitstrings:
+                    digit = encoding.decode([int(b) for b in bitstring], DIGITS)
+                    if digit is None:
+                        self.assertGreater(penalty[bitstring], 0.5, bitstring)
+                        continue
+                    self.assertAlmostEqual(penalty[bitstring], 0, msg=bitstring)
+                    self.assertEqual([round(indicator[bitstring]) for indicator in indicators],
+                                     [int(d == digit) for d in range(DIGITS)])
+
+    def test_unknown_encoding_is_rejected(self):
+        with self.assertRaises(ValueError):
+            get_encoding('gray')
+
+
+class EncodedHamiltonianTest(unittest.TestCase):
+    def test_ground_states_are_the_valid_2x2_boards(self):
+        for name, encoding in ENCODINGS.items():
+            with self.subTest(encoding=name):
+                H = create_hamiltonian(1, 2, None, encoding=name)
+                n = H.num_qubits
+                self.assertEqual(n, 4 * encoding.qubits(2))
+                bitstrings = [format(i, f'0{n}b') for i in range(2 ** n)]
+                zero = [b for b, e in energies(H, bitstrings).items() if abs(e) < 1e-9]
+                boards = sorted(decode_encoded_board(b, 2, 2, name, 2) for b in zero)
+                self.assertEqual(boards, [[[0, 1], [1, 0]], [[1, 0], [0, 1]]])
+
+    def test_qubits_per_cell_must_match_the_encoding(self):
+        with self.assertRaises(ValueError):
+            create_hamiltonian(1, 4, 3, encoding='one_hot')
+
+
+if __name__ == '__main__':
+    unittest.main()
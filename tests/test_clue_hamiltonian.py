@@ -0,0 +1,111 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+
+from cell_encodings import ENCODINGS
+from clue_hamiltonian import ClueHamiltonian
+from energy import DiagonalHamiltonian
+
+PUZZLE = [[1, 0, 0, 0], [0, 0, 1, 0], [0, 4, 0, 0], [0, 0, 0, 4]]
+SOLUTION = [[1, 2, 4, 3], [4, 3, 1, 2], [2, 4, 3, 1], [3, 1, 2, 4]]
+
+
+def all_bitstrings(n):
+    return [format(i, f'0{n}b') for i in range(2 ** n)]
+
+
+def encode_board(board, encoding, digits):
+    return ''.join(str(bit) for row in board for value in row
+                   for bit in encoding.encode(value - 1, digits))
+
+
+class ClueDeltaTest(unittest.TestCase):
+    def test_delta_is_zero_only_when_the_clues_hold(self):
+        clue_hamiltonian = ClueHamiltonian(2, encoding='binary', alpha=10)
+        bitstrings = all_bitstrings(clue_hamiltonian.num_qubits)
+        energies = DiagonalHamiltonian(clue_hamiltonian.clue_delta([[2, 0], [0, 2]])) \
+            .bitstring_energies(bitstrings)
+        for bitstring, energy in zip(bitstrings, energies):
+            misses = (bitstring[0] != '1') + (bitstring[3] != '1')
+            self.assertAlmostEqual(energy, 10 * misses)
+
+        self.assertEqual(DiagonalHamiltonian(clue_hamiltonian.clue_delta([[0, 0], [0, 0]]))
+                         .bitstring_energies(bitstrings[:1])[0], 0)
+
+    def test_ground_state_is_the_solution_of_the_clues(self):
+        for name in ENCODINGS:
+            with self.subTest(encoding=name):
+                clue_hamiltonian = ClueHamiltonian(2, encoding=name)
+                H = clue_hamiltonian.hamiltonian([[0, 2], [0, 0]])
+                bitstrings = all_bitstrings(H.num_qubits)
+                energies = DiagonalHamiltonian(H).bitstring_energies(bitstrings)
+                ground = [b for b, e in zip(bitstrings, energies) if abs(e) < 1e-9]
+                self.assertEqual(ground, [encode_board([[1, 2], [2, 1]],
+                                                       clue_hamiltonian.encoding, 2)])
+
+    def test_invalid_puzzles_are_rejected(self):
+        clue_hamiltonian = ClueHamiltonian(2, encoding='binary')
+        for puzzle in ([[0, 0, 0]] * 2, [[3, 0], [0, 0]], [[-1, 0], [0, 0]]):
+            with self.assertRaises(ValueError):
+                clue_hamiltonian.hamiltonian(puzzle)
+
+
+class ReduceTest(unittest.TestCase):
+    def test_reduced_energies_match_the_full_operator(self):
+        rng = np.random.default_rng(0)
+        for name in ENCODINGS:
+            with self.subTest(encoding=name):
+                clue_hamiltonian = ClueHamiltonian(4, encoding=name)
+                reduced = clue_hamiltonian.reduce(PUZZLE)
+                q = clue_hamiltonian.qubits_per_cell
+                self.assertEqual(reduced.num_qubits, clue_hamiltonian.num_qubits - 4 * q)
+                # Los términos repetidos tras fijar los qubits se combinan
+                labels = reduced.operator.paulis.to_labels()
+                self.assertEqual(len(labels), len(set(labels)))
+
+                bitstrings = [''.join(map(str, bits))
+                              for bits in rng.integers(0, 2, (100, reduced.num_qubits))]
+                bitstrings.append(''.join(bit for i, bit in enumerate(
+                    encode_board(SOLUTION, clue_hamiltonian.encoding, 4))
+                    if i in set(reduced.free_positions)))
+                expected = DiagonalHamiltonian(clue_hamiltonian.hamiltonian(PUZZLE)) \
+                    .bitstring_energies([reduced.expand(b) for b in bitstrings])
+                np.testing.assert_allclose(
+                    DiagonalHamiltonian(reduced.operator).bitstring_energies(bitstrings),
+                    expected, atol=1e-8)
+                self.assertAlmostEqual(expected[-1], 0)
+                self.assertEqual(reduced.decode(bitstrings[-1]), SOLUTION)
+
+    def test_decode_keeps_the_clues(self):
+        reduced = ClueHamiltonian(4, encoding='binary').reduce(PUZZLE)
+        board = reduced.decode('0' * reduced.num_qubits)
+        self.assertTrue(all(board[i][j] == PUZZLE[i][j]
+                            for i in range(4) for j in range(4) if PUZZLE[i][j]))
+        self.assertEqual(board[0][1], 1)
+
+    def test_empty_and_full_puzzles(self):
+        clue_hamiltonian = ClueHamiltonian(2, encoding='one_hot')
+        empty = clue_hamiltonian.reduce([[0, 0], [0, 0]])
+        self.assertEqual(empty.num_qubits, clue_hamiltonian.num_qubits)
+        self.assertEqual(empty.expand('1' * 8), '1' * 8)
+
+        full = clue_hamiltonian.reduce([[1, 2], [2, 1]])
+        self.assertEqual(full.num_qubits, 0)
+        self.assertEqual(full.decode(''), [[1, 2], [2, 1]])
+        np.testing.assert_allclose(full.operator.coeffs, 0)
+
+        # Pistas en conflicto: la energía constante es la del tablero completo
+        clues = [[1, 1], [2, 2]]
+        conflicting = clue_hamiltonian.reduce(clues)
+        expected = DiagonalHamiltonian(clue_hamiltonian.hamiltonian(clues)).bitstring_energies(
+            [encode_board(clues, clue_hamiltonian.encoding, 2)])[0]
+        self.assertGreater(expected, 0)
+        np.testing.assert_allclose(conflicting.operator.coeffs.real.sum(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
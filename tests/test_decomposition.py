@@ -0,0 +1,85 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+
+from decomposition import candidate_domains, peers, solve_by_decomposition, units
+from solution_cache import is_solution_of
+
+# Solución de problem.txt
+SOLUTION = [
+    [8, 2, 6, 9, 1, 5, 4, 3, 7],
+    [9, 3, 5, 7, 4, 6, 8, 1, 2],
+    [4, 1, 7, 8, 3, 2, 6, 9, 5],
+    [1, 8, 3, 5, 2, 4, 9, 7, 6],
+    [7, 5, 2, 6, 9, 3, 1, 8, 4],
+    [6, 9, 4, 1, 8, 7, 5, 2, 3],
+    [2, 7, 8, 4, 6, 9, 3, 5, 1],
+    [3, 4, 1, 2, 5, 8, 7, 6, 9],
+    [5, 6, 9, 3, 7, 1, 2, 4, 8],
+]
+
+
+def blank(board, count, seed):
+    puzzle = [row[:] for row in board]
+    for cell in np.random.default_rng(seed).choice(81, count, replace=False):
+        puzzle[cell // 9][cell % 9] = 0
+    return puzzle
+
+
+class CandidateDomainsTest(unittest.TestCase):
+    def test_peers_and_units(self):
+        self.assertTrue(all(len(group) == 20 for group in peers(9)))
+        self.assertEqual(peers(4)[0], (1, 2, 3, 4, 5, 8, 12))
+        self.assertEqual(len(units(9)), 27)
+
+    def test_fixed_values_and_domains_agree_with_the_solution(self):
+        puzzle = blank(SOLUTION, 50, seed=0)
+        fixed, domains = candidate_domains(puzzle)
+        values = [value for row in SOLUTION for value in row]
+
+        self.assertTrue(domains)
+        self.assertEqual(set(fixed) | set(domains), set(range(81)))
+        self.assertTrue(all(values[cell] == value for cell, value in fixed.items()))
+        self.assertTrue(all(values[cell] in domain for cell, domain in domains.items()))
+
+    def test_a_few_blanks_are_filled_by_propagation(self):
+        fixed, domains = candidate_domains(blank(SOLUTION, 20, seed=0))
+        self.assertEqual(domains, {})
+        self.assertEqual(fixed, {cell: value
+                                 for cell, value in enumerate(v for row in SOLUTION for v in row)})
+
+    def test_contradiction_is_reported(self):
+        puzzle = blank(SOLUTION, 50, seed=0)
+        # Dos unos en la misma subgrilla
+        puzzle[0][0] = puzzle[1][1] = 1
+        with self.assertRaises(ValueError):
+            candidate_domains(puzzle)
+
+
+class SolveByDecompositionTest(unittest.TestCase):
+    def test_sparse_puzzle_is_solved_within_the_qubit_budget(self):
+        puzzle = blank(SOLUTION, 50, seed=0)
+        board, stats = solve_by_decomposition(puzzle, seed=1)
+
+        self.assertEqual(stats['conflicts'], 0)
+        self.assertGreater(stats['iterations'], 0)
+        self.assertLessEqual(stats['max_qubits'], 20)
+        self.assertTrue(is_solution_of(puzzle, board))
+
+    def test_empty_4x4(self):
+        board, stats = solve_by_decomposition([[0] * 4 for _ in range(4)], budget=8, seed=1)
+        self.assertEqual(stats['conflicts'], 0)
+        self.assertLessEqual(stats['max_qubits'], 8)
+        self.assertTrue(is_solution_of([[0] * 4] * 4, board))
+
+    def test_unknown_solver_is_rejected(self):
+        with self.assertRaises(ValueError):
+            solve_by_decomposition(SOLUTION, solver='annealing')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+
+from difficulty import HARD_NODES, LEVELS, generate, rate_batch
+from sudoku_board import valid_boards
+
+SOLVED = np.array([[1, 2, 3, 4], [3, 4, 1, 2], [2, 1, 4, 3], [4, 3, 2, 1]], dtype=np.uint8)
+
+
+class RateBatchTest(unittest.TestCase):
+    def test_counts_zero_one_and_two_solutions(self):
+        unique = SOLVED.copy()
+        unique[0, 0] = 0
+        empty = np.zeros((4, 4), dtype=np.uint8)
+        # Dos 1 en la primera fila: sin solución
+        invalid = unique.copy()
+        invalid[0, 1] = 1
+        rating = rate_batch(np.array([unique, empty, invalid]))
+        self.assertEqual(rating['solutions'].tolist(), [1, 2, 0])
+        self.assertEqual(rating['level'][0], LEVELS.index('easy'))
+
+    def test_grades_on_nodes_up_to_the_first_solution(self):
+        puzzles, rating = generate(9, 'expert', 4, processes=1, seed=3)
+        self.assertTrue(np.all(rating['nodes'] > HARD_NODES))
+        self.assertTrue(np.all(rating['nodes'] <= rating['search_nodes']))
+
+
+class GenerateTest(unittest.TestCase):
+    def test_generates_unique_puzzles_of_the_requested_level(self):
+        for level in ('easy', 'medium', 'hard'):
+            puzzles, rating = generate(9, level, 3, processes=1, seed=12345)
+            self.assertEqual(puzzles.shape, (3, 9, 9))
+            self.assertTrue(np.all(rating['level'] == LEVELS.index(level)))
+            check = rate_batch(puzzles)
+            self.assertEqual(check['solutions'].tolist(), [1, 1, 1])
+            self.assertEqual(check['level'].tolist(), rating['level'].tolist())
+
+    def test_zero_count_returns_empty_arrays(self):
+        puzzles, rating = generate(9, 'hard', 0)
+        self.assertEqual(puzzles.shape, (0, 9, 9))
+        self.assertEqual(len(rating['level']), 0)
+
+    def test_clues_are_a_subset_of_a_valid_solution(self):
+        from propagation import solve_batch
+
+        puzzles, _ = generate(4, 'easy', 5, processes=1, seed=7)
+        solutions, _ = solve_batch(puzzles)
+        self.assertTrue(valid_boards(solutions).all())
+        self.assertTrue(np.all((puzzles == 0) | (puzzles == solutions)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+
+from early_stopping import EarlyStopping, minimize_until_valid
+
+VALID = '01101001'
+INVALID = '00000000'
+
+
+class FakeObjective:
+    """Devuelve conteos fijos por llamada, como ``BatchedObjective`` con su callback."""
+
+    def __init__(self, samples):
+        self.samples = iter(samples)
+        self.callback = None
+        self.num_jobs = 0
+
+    def __call__(self, points):
+        points = np.atleast_2d(points)
+        self.num_jobs += 1
+        self.callback(points, [{next(self.samples): 100} for _ in points])
+        return np.zeros(len(points))
+
+
+class FakeSPSA:
+    """Dos puntos agrupados por iteración y ``callback`` al terminar cada una."""
+
+    def __init__(self):
+        self.callback = None
+
+    def minimize(self, fun, x0):
+        for iteration in range(10):
+            fun(np.array([x0, x0]))
+            if self.callback is not None:
+                self.callback(2 * (iteration + 1), x0, 0.0, 0.1, True)
+
+
+class MinimizeUntilValidTest(unittest.TestCase):
+    def test_reports_completed_iterations(self):
+        # Las iteraciones 1 a 3 no tienen tableros válidos; el cuarto lote sí
+        objective = FakeObjective([INVALID] * 6 + [VALID, INVALID])
+        optimizer = FakeSPSA()
+        stopper = EarlyStopping(2, 2, 2, threshold=0.5)
+
+        found, result = minimize_until_valid(optimizer, objective, np.zeros(3), stopper)
+
+        self.assertIsNone(result)
+        self.assertEqual(found['board'], [[1, 2], [2, 1]])
+        self.assertEqual(found['iterations'], 3)
+        self.assertEqual(found['evaluations'], 7)
+        self.assertEqual(found['jobs'], 4)
+        self.assertIsNone(optimizer.callback)
+
+
+if __name__ == '__main__':
+    unittest.main()
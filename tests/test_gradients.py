@@ -0,0 +1,72 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+from qiskit import Aer
+from qiskit.circuit import Parameter, QuantumCircuit
+from qiskit.quantum_info import SparsePauliOp, Statevector
+
+from ansatz import constraint_ansatz
+from gradients import AdjointGradient, ParameterShiftGradient, expand_parameters
+from restrictions import create_hamiltonian
+
+
+def shared_parameter_circuit():
+    # θ0 aparece en dos rotaciones, como en sudoku_ansatz
+    theta = [Parameter('θ0'), Parameter('θ1')]
+    circuit = QuantumCircuit(2)
+    circuit.ry(theta[0], 0)
+    circuit.ry(theta[0], 1)
+    circuit.cx(0, 1)
+    circuit.rx(theta[1], 1)
+    return circuit
+
+
+HAMILTONIAN = SparsePauliOp(['IZ', 'ZI', 'ZZ'], [1.0, 0.5, 0.3])
+
+
+class AdjointGradientTest(unittest.TestCase):
+    def test_energy_matches_the_statevector(self):
+        H = create_hamiltonian(100, 2, 2, 2)
+        ansatz, _ = constraint_ansatz(H)
+        x = np.random.default_rng(0).uniform(-np.pi, np.pi, ansatz.num_parameters)
+        energy, _ = AdjointGradient(ansatz, H).value_and_gradient(x)
+        expected = Statevector(ansatz.assign_parameters(x)).expectation_value(H).real
+        self.assertAlmostEqual(energy, expected, places=6)
+
+    def test_gradient_matches_finite_differences(self):
+        H = create_hamiltonian(100, 2, 2, 2)
+        ansatz, _ = constraint_ansatz(H)
+        estimator = AdjointGradient(ansatz, H)
+        x = np.random.default_rng(1).uniform(-np.pi, np.pi, ansatz.num_parameters)
+        _, gradient = estimator.value_and_gradient(x)
+        step = 1e-5
+        numeric = [(estimator.value_and_gradient(x + step * e)[0]
+                    - estimator.value_and_gradient(x - step * e)[0]) / (2 * step)
+                   for e in np.eye(len(x))]
+        np.testing.assert_allclose(gradient, numeric, atol=1e-4)
+
+
+class ParameterShiftGradientTest(unittest.TestCase):
+    def test_shared_parameters_are_expanded_per_occurrence(self):
+        expanded, occurrences = expand_parameters(shared_parameter_circuit())
+        self.assertEqual(expanded.num_parameters, 3)
+        self.assertEqual(sorted(occurrences.tolist()), [0, 0, 1])
+
+    def test_sampled_gradient_agrees_with_the_adjoint_gradient(self):
+        circuit = shared_parameter_circuit()
+        x = np.array([0.7, -0.4])
+        _, exact = AdjointGradient(circuit, HAMILTONIAN).value_and_gradient(x)
+        estimator = ParameterShiftGradient(circuit, HAMILTONIAN, Aer.get_backend('qasm_simulator'),
+                                           shots=200000, seed=5)
+        np.testing.assert_allclose(estimator(x), exact, atol=0.03)
+        # Punto central más dos desplazamientos por aparición, en un solo job
+        self.assertEqual(estimator.num_evaluations, 7)
+        self.assertEqual(estimator.objective.num_jobs, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
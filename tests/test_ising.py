@@ -0,0 +1,82 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+import pytest
+from qiskit.quantum_info import SparsePauliOp
+
+from energy import DiagonalHamiltonian
+from ising import from_bqm, from_sparse_pauli_op, to_bqm, to_sparse_pauli_op
+from restrictions import create_hamiltonian
+
+
+class PauliIsingRoundTripTest(unittest.TestCase):
+    def setUp(self):
+        self.H = create_hamiltonian(100, 2, 2, 2)
+        self.model = from_sparse_pauli_op(self.H)
+
+    def test_pauli_ising_pauli_round_trip(self):
+        self.assertTrue(to_sparse_pauli_op(self.model).equiv(self.H.simplify()))
+
+    def test_energies_use_s_equal_one_minus_two_b(self):
+        bits = np.random.default_rng(0).integers(0, 2, size=(200, self.H.num_qubits))
+        np.testing.assert_allclose(self.model.energies(1 - 2 * bits),
+                                   DiagonalHamiltonian(self.H).energies(bits))
+
+    def test_bitstrings_put_qubit_zero_on_the_right(self):
+        spins = self.model.bitstring_to_spins('0' * (self.H.num_qubits - 1) + '1')
+        self.assertEqual(spins[0], -1)
+        self.assertTrue(np.all(spins[1:] == 1))
+        self.assertEqual(self.model.spins_to_bitstring(spins), '0' * (self.H.num_qubits - 1) + '1')
+
+    def test_terms_on_more_than_two_qubits_are_rejected(self):
+        with self.assertRaises(ValueError):
+            from_sparse_pauli_op(SparsePauliOp(['ZZZ']))
+
+
+class BQMTest(unittest.TestCase):
+    def setUp(self):
+        self.dimod = pytest.importorskip('dimod')
+        self.H = create_hamiltonian(100, 2, 2, 2)
+        labels = [f'q{i}' for i in range(self.H.num_qubits)]
+        self.model = from_sparse_pauli_op(self.H, labels=labels)
+        self.bqm = to_bqm(self.model)
+
+    def test_h_and_j_map_to_linear_and_quadratic_biases(self):
+        self.assertEqual(self.bqm.vartype, self.dimod.SPIN)
+        self.assertAlmostEqual(self.bqm.offset, self.model.offset)
+        for label, h in zip(self.model.labels, self.model.h):
+            self.assertAlmostEqual(self.bqm.get_linear(label), h)
+        self.assertEqual(self.bqm.num_interactions, self.model.num_interactions)
+        for a, b, j in zip(self.model.rows, self.model.cols, self.model.couplings):
+            self.assertAlmostEqual(
+                self.bqm.get_quadratic(self.model.labels[a], self.model.labels[b]), j)
+
+    def test_bqm_energies_match_the_operator_with_s_equal_one_minus_two_b(self):
+        bits = np.random.default_rng(1).integers(0, 2, size=(200, self.H.num_qubits))
+        energies = self.bqm.energies((1 - 2 * bits, self.model.labels))
+        np.testing.assert_allclose(energies, DiagonalHamiltonian(self.H).energies(bits))
+
+    def test_bqm_round_trip(self):
+        back = from_bqm(self.bqm)
+        spins = 1 - 2 * np.random.default_rng(2).integers(0, 2, size=(50, self.H.num_qubits))
+        reordered = spins[:, [self.model.index[label] for label in back.labels]]
+        np.testing.assert_allclose(back.energies(reordered), self.model.energies(spins))
+
+    def test_binary_bqm_is_converted_to_spins(self):
+        bqm = self.dimod.BinaryQuadraticModel({'a': 1.0, 'b': -2.0}, {('a', 'b'): 3.0}, 0.5,
+                                              self.dimod.BINARY)
+        model = from_bqm(bqm)
+        for a in (0, 1):
+            for b in (0, 1):
+                sample = {'a': a, 'b': b}
+                # dimod relaciona variables binarias y espines con s = 2x - 1
+                spins = model.sample_to_spins({v: 2 * x - 1 for v, x in sample.items()})
+                self.assertAlmostEqual(model.energies(spins)[0], bqm.energy(sample))
+
+
+if __name__ == '__main__':
+    unittest.main()
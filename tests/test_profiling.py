@@ -0,0 +1,98 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import profiling
+from profiling import Profiler
+
+
+def nested(profiler):
+    with profiler.stage('solve'):
+        with profiler.stage('hamiltonian'):
+            time.sleep(0.01)
+        for _ in range(2):
+            with profiler.stage('simulate'):
+                data = bytearray(2 ** 20)
+                del data
+
+
+class ProfilerTest(unittest.TestCase):
+    def tearDown(self):
+        profiling.configure(enabled=False)
+
+    def test_disabled_profiler_records_nothing(self):
+        profiler = Profiler()
+        nested(profiler)
+        self.assertEqual(profiler.records, [])
+        output = io.StringIO()
+        profiler.report(file=output)
+        self.assertEqual(output.getvalue(), '')
+
+    def test_nested_stages_are_aggregated_by_path(self):
+        profiler = profiling.configure(enabled=True)
+        nested(profiler)
+        summary = {total['stage']: total for total in profiler.summary()}
+
+        self.assertEqual(list(summary), ['solve', 'solve;hamiltonian', 'solve;simulate'])
+        self.assertEqual(summary['solve;simulate']['calls'], 2)
+        self.assertEqual(summary['solve;hamiltonian']['depth'], 1)
+        self.assertGreaterEqual(summary['solve;hamiltonian']['wall'], 0.01)
+        self.assertGreaterEqual(summary['solve']['wall'],
+                                summary['solve;hamiltonian']['wall'])
+        # El pico de la etapa hija también cuenta para la madre
+        self.assertGreaterEqual(summary['solve;simulate']['peak'], 2 ** 20)
+        self.assertGreaterEqual(summary['solve']['peak'], summary['solve;simulate']['peak'])
+        self.assertIn('\n  simulate ', profiler.format_table())
+
+    def test_stage_is_recorded_when_it_raises(self):
+        profiler = Profiler(enabled=True, trace_memory=False)
+        with self.assertRaises(RuntimeError):
+            with profiler.stage('fails'):
+                raise RuntimeError
+        self.assertEqual([record['stage'] for record in profiler.records], ['fails'])
+
+    def test_chrome_and_folded_traces(self):
+        directory = tempfile.mkdtemp()
+        profiler = Profiler(enabled=True, trace_memory=False)
+        nested(profiler)
+
+        with open(profiler.write_trace(os.path.join(directory, 'traza.json'))) as f:
+            events = json.load(f)['traceEvents']
+        self.assertEqual(sorted(event['name'] for event in events),
+                         ['hamiltonian', 'simulate', 'simulate', 'solve'])
+        self.assertTrue(all(event['ph'] == 'X' and event['dur'] >= 0 for event in events))
+
+        with open(profiler.write_trace(os.path.join(directory, 'traza.folded'))) as f:
+            stacks = dict(line.rsplit(' ', 1) for line in f.read().splitlines())
+        self.assertEqual(set(stacks), {'solve', 'solve;hamiltonian', 'solve;simulate'})
+        self.assertGreaterEqual(int(stacks['solve;hamiltonian']), 10000)
+        self.assertTrue(all(int(value) >= 0 for value in stacks.values()))
+
+    def test_global_profiler_and_decorator(self):
+        trace = os.path.join(tempfile.mkdtemp(), 'traza.folded')
+        profiler = profiling.configure(trace=trace)
+        self.assertTrue(profiler.enabled)
+
+        @profiling.profiled()
+        def decode():
+            return 42
+
+        self.assertEqual(decode(), 42)
+        with profiling.stage('otra'):
+            pass
+        self.assertEqual([record['stage'] for record in profiler.records], ['decode', 'otra'])
+
+        output = io.StringIO()
+        profiler.report(file=output)
+        self.assertIn(f'Traza de perfilado en {trace}', output.getvalue())
+        self.assertTrue(os.path.exists(trace))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+
+from propagation import (CONTRADICTION, SOLVED, STUCK, candidates, propagate, solve_batch,
+                         solve_board, solve_many, to_boards)
+from sudoku_board import valid_boards
+
+
+def parse(text):
+    return [[int(value) for value in line] for line in text.split()]
+
+
+# problem.txt: se resuelve solo con propagación
+EASY = parse("""
+820910007 900706812 017800090 080000970 052093180
+600187000 078009050 300250760 509301208
+""")
+# Sudoku de Arto Inkala: la propagación se estanca y hace falta ramificar
+HARD = parse("""
+800000000 003600000 070090200 050007000 000045700
+000100030 001000068 008500010 090000400
+""")
+HARD_SOLUTION = parse("""
+812753649 943682175 675491283 154237896 369845721
+287169534 521974368 438526917 796318452
+""")
+# Dos cincos en la primera fila
+INVALID = [row[:] for row in HARD]
+INVALID[0][1] = INVALID[0][2] = 5
+
+
+class CandidatesTest(unittest.TestCase):
+    def test_masks_round_trip_through_to_boards(self):
+        masks = candidates([HARD])
+        self.assertEqual(masks[0, 0, 0], 1 << 7)
+        self.assertEqual(masks[0, 0, 1], (1 << 9) - 1)
+        np.testing.assert_array_equal(to_boards(masks)[0], HARD)
+
+    def test_unsupported_boards_are_rejected(self):
+        for boards in (np.zeros((1, 5, 5)), [[[0, 5], [0, 0]]], [[[-1] * 4] * 4]):
+            with self.assertRaises(ValueError):
+                candidates(boards)
+
+
+class PropagateTest(unittest.TestCase):
+    def test_status_of_each_board(self):
+        masks, status = propagate(candidates([EASY, HARD, INVALID]))
+        self.assertEqual(status.tolist(), [SOLVED, STUCK, CONTRADICTION])
+        self.assertTrue(valid_boards(to_boards(masks[:1]))[0])
+
+
+class SolveBatchTest(unittest.TestCase):
+    def test_hard_puzzle_is_solved_by_branching(self):
+        self.assertEqual(solve_board(HARD), HARD_SOLUTION)
+        _, stats = solve_batch(np.array([HARD]))
+        self.assertEqual((stats['propagated'], stats['branched']), (0, 1))
+        self.assertGreater(stats['nodes'], 0)
+
+    def test_contradiction_is_reported(self):
+        self.assertIsNone(solve_board(INVALID))
+        solutions, stats = solve_batch(np.array([INVALID, EASY]))
+        self.assertFalse(solutions[0].any())
+        self.assertEqual(stats['unsolvable'], 1)
+        self.assertEqual(stats['propagated'], 1)
+
+    def test_mixed_batch(self):
+        empty = np.zeros((4, 4), dtype=np.uint8)
+        solutions, stats = solve_batch(np.array([empty, [[1, 1, 0, 0]] + [[0] * 4] * 3]))
+        self.assertTrue(valid_boards(solutions[:1])[0])
+        self.assertFalse(solutions[1].any())
+        self.assertEqual(stats['boards'], 2)
+
+    def test_solve_many_matches_solve_batch(self):
+        boards = np.array([EASY, HARD, INVALID, HARD, EASY], dtype=np.uint8)
+        expected, expected_stats = solve_batch(boards)
+        for processes in (1, 2):
+            with self.subTest(processes=processes):
+                solutions, stats = solve_many(boards, processes=processes, chunk_size=2)
+                np.testing.assert_array_equal(solutions, expected)
+                self.assertEqual(stats, expected_stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
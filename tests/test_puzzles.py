@@ -0,0 +1,104 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+
+from puzzles import (FORMATS, PuzzleWriter, detect_format, get_matrix, is_correct,
+                     iter_puzzle_batches, iter_puzzles)
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def random_boards(count, n, seed=0):
+    return np.random.default_rng(seed).integers(0, n + 1, (count, n, n), dtype=np.uint8)
+
+
+class PuzzleFormatsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def write(self, name, boards, format, n=9):
+        filename = self.path(name)
+        with PuzzleWriter(filename, n, format) as writer:
+            writer.write_batch(boards[:-1])
+            writer.write(boards[-1].tolist())
+        self.assertEqual(writer.count, len(boards))
+        return filename
+
+    def test_every_format_round_trips_in_batches(self):
+        boards = random_boards(7, 9)
+        for format in FORMATS:
+            with self.subTest(format=format):
+                filename = self.write(f'tableros.{format}', boards, format)
+                self.assertEqual(detect_format(filename), format)
+                batches = list(iter_puzzle_batches(filename, batch_size=3))
+                self.assertEqual([len(batch) for batch in batches], [3, 3, 1])
+                self.assertTrue(all(batch.dtype == np.uint8 for batch in batches))
+                np.testing.assert_array_equal(np.concatenate(batches), boards)
+                self.assertEqual(list(iter_puzzles(filename)), boards.tolist())
+
+    def test_packed_handles_an_odd_number_of_cells(self):
+        boards = random_boards(3, 5)
+        filename = self.write('impar.bin', boards, 'packed', n=5)
+        self.assertEqual(os.path.getsize(filename), 8 + 3 * 13)
+        np.testing.assert_array_equal(np.concatenate(list(iter_puzzle_batches(filename))),
+                                      boards)
+
+    def test_append_keeps_earlier_boards(self):
+        first, second = random_boards(2, 4, seed=1), random_boards(3, 4, seed=2)
+        filename = self.write('tableros.bin', first, 'packed', n=4)
+        with PuzzleWriter(filename, 4, append=True) as writer:
+            writer.write_batch(second)
+        self.assertEqual(list(iter_puzzles(filename)), first.tolist() + second.tolist())
+
+        with self.assertRaises(ValueError):
+            PuzzleWriter(filename, 9, append=True)
+
+    def test_line_format_accepts_dots_for_empty_cells(self):
+        filename = self.path('tableros.txt')
+        with open(filename, 'w') as f:
+            f.write('1..4..1..4..1..4\n\n' + '0' * 16 + '\n')
+        self.assertEqual(detect_format(filename), 'line')
+        boards = list(iter_puzzles(filename))
+        self.assertEqual(boards[0][0], [1, 0, 0, 4])
+        self.assertEqual(boards[1], [[0] * 4] * 4)
+
+    def test_malformed_files_are_rejected(self):
+        filename = self.write('tableros.bin', random_boards(2, 9), 'packed')
+        with open(filename, 'ab') as f:
+            f.write(b'\x00')
+        with self.assertRaises(ValueError):
+            list(iter_puzzles(filename))
+
+        filename = self.path('incompleto.txt')
+        with open(filename, 'w') as f:
+            f.write('1 2\n2 1\n1 2\n')
+        with self.assertRaises(ValueError):
+            list(iter_puzzles(filename))
+
+        for format, n in (('csv', 9), ('line', 16), ('packed', 16)):
+            with self.assertRaises(ValueError):
+                PuzzleWriter(self.path('x'), n, format)
+
+    def test_empty_packed_file_has_no_boards(self):
+        filename = self.path('vacio.bin')
+        PuzzleWriter(filename, 9).close()
+        self.assertEqual(list(iter_puzzles(filename)), [])
+
+
+class ProblemFileTest(unittest.TestCase):
+    def test_problem_file_matches_the_grid_reader(self):
+        matrix = get_matrix(os.path.join(ROOT, 'problem.txt'))
+        self.assertEqual(list(iter_puzzles(os.path.join(ROOT, 'problem.txt'))), [matrix])
+        self.assertFalse(is_correct(matrix))
+
+
+if __name__ == '__main__':
+    unittest.main()
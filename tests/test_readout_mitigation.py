@@ -0,0 +1,112 @@
+import itertools
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+
+import readout_mitigation
+from readout_mitigation import (ReadoutCalibration, get_calibration, nearest_probabilities,
+                                noisy_backend)
+
+P01 = [0.02, 0.04, 0.01]
+P10 = [0.05, 0.03, 0.08]
+
+
+def measured_counts(calibration, true_counts):
+    """Conteos esperados tras el error de lectura; el carácter i es el qubit n - 1 - i."""
+    A = calibration.assignment_matrices()
+    n = calibration.num_qubits
+    counts = {}
+    for measured in map(''.join, itertools.product('01', repeat=n)):
+        counts[measured] = sum(
+            weight * np.prod([A[q][int(measured[n - 1 - q]), int(true[n - 1 - q])]
+                              for q in range(n)])
+            for true, weight in true_counts.items())
+    return counts
+
+
+class NearestProbabilitiesTest(unittest.TestCase):
+    def test_distributions_are_unchanged(self):
+        np.testing.assert_allclose(nearest_probabilities([0.2, 0.3, 0.5]), [0.2, 0.3, 0.5])
+
+    def test_negative_mass_is_taken_from_the_rest(self):
+        np.testing.assert_allclose(nearest_probabilities([0.6, 0.5, -0.1]), [0.55, 0.45, 0.0])
+
+
+class ReadoutCalibrationTest(unittest.TestCase):
+    def setUp(self):
+        self.calibration = ReadoutCalibration(P01, P10)
+        self.true = {'000': 500, '011': 300, '101': 150, '110': 50}
+
+    def test_correct_inverts_a_known_readout_error(self):
+        corrected = self.calibration.correct(measured_counts(self.calibration, self.true))
+        for bitstring in set(corrected) | set(self.true):
+            self.assertAlmostEqual(corrected.get(bitstring, 0), self.true.get(bitstring, 0),
+                                   places=6)
+
+    def test_sparse_inverse_matches_the_dense_one(self):
+        counts = {bitstring: round(value) for bitstring, value
+                  in measured_counts(self.calibration, self.true).items() if value >= 1}
+        dense = self.calibration.correct(counts)
+        with mock.patch.object(readout_mitigation, 'DENSE_QUBITS', 0), \
+                mock.patch.object(readout_mitigation, 'BLOCK_SIZE', 8):
+            sparse = self.calibration.correct(counts)
+        self.assertEqual(set(sparse), set(dense))
+        for bitstring in dense:
+            self.assertAlmostEqual(sparse[bitstring], dense[bitstring])
+        # Los conteos corregidos conservan los shots
+        self.assertAlmostEqual(sum(dense.values()), sum(counts.values()))
+
+    def test_singular_assignment_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ReadoutCalibration([0.5], [0.5])
+        with self.assertRaises(ValueError):
+            ReadoutCalibration([0.1, 0.1], [0.1])
+
+    def test_dict_round_trip(self):
+        copy = ReadoutCalibration.from_dict(self.calibration.to_dict())
+        np.testing.assert_array_equal(copy.p01, P01)
+        np.testing.assert_array_equal(copy.p10, P10)
+        self.assertEqual(copy.timestamp, self.calibration.timestamp)
+
+
+class GetCalibrationTest(unittest.TestCase):
+    def setUp(self):
+        readout_mitigation._calibrations.clear()
+        self.directory = tempfile.mkdtemp()
+        self.backend = noisy_backend(3, seed=1)
+
+    def tearDown(self):
+        readout_mitigation._calibrations.clear()
+
+    def test_calibration_measures_the_noise_model(self):
+        calibration = get_calibration(self.backend, 3, seed=0, cache_dir=None)
+        # Tasas de noisy_backend: p (1 ± spread), con margen para el muestreo
+        for rates, p in ((calibration.p01, 0.02), (calibration.p10, 0.05)):
+            self.assertTrue(np.all((rates > 0.5 * p - 0.005) & (rates < 1.5 * p + 0.005)))
+
+    def test_calibration_is_cached_in_memory_and_on_disk(self):
+        calibrate = mock.Mock(wraps=readout_mitigation.calibrate)
+        with mock.patch.object(readout_mitigation, 'calibrate', calibrate):
+            first = get_calibration(self.backend, 3, shots=1000, cache_dir=self.directory)
+            self.assertIs(get_calibration(self.backend, 3, shots=1000,
+                                          cache_dir=self.directory), first)
+            readout_mitigation._calibrations.clear()
+            from_disk = get_calibration(self.backend, 3, shots=1000, cache_dir=self.directory)
+            self.assertEqual(calibrate.call_count, 1)
+            np.testing.assert_array_equal(from_disk.p01, first.p01)
+
+            # Una calibración vencida se repite
+            with mock.patch.object(time, 'time', return_value=first.timestamp + 25 * 3600):
+                get_calibration(self.backend, 3, shots=1000, cache_dir=self.directory)
+            self.assertEqual(calibrate.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from repair import repair_samples
+from restrictions import create_hamiltonian
+from sudoku_board import decode_board, is_valid_board
+
+ROWS = COLS = 2
+QUBITS_PER_CELL = 2
+# [[1, 2], [2, 1]] en la codificación de vqe_local: dos bits por celda, de izquierda a derecha
+VALID = '01101001'
+
+
+def flip(bitstring, index):
+    return bitstring[:index] + str(1 - int(bitstring[index])) + bitstring[index + 1:]
+
+
+class RepairSamplesTest(unittest.TestCase):
+    def setUp(self):
+        self.H = create_hamiltonian(100, ROWS, QUBITS_PER_CELL, COLS)
+
+    def repair(self, counts, **kwargs):
+        return repair_samples(counts, self.H, ROWS, COLS, QUBITS_PER_CELL, **kwargs)
+
+    def test_one_bit_off_sample_is_repaired_into_a_valid_board(self):
+        sample = flip(VALID, 0)
+        self.assertFalse(is_valid_board(decode_board(sample, ROWS, COLS, QUBITS_PER_CELL)))
+
+        repaired = self.repair({sample: 10})
+
+        self.assertEqual(len(repaired), 1)
+        entry = repaired[0]
+        self.assertEqual(entry['original'], sample)
+        self.assertEqual(entry['counts'], 10)
+        self.assertGreaterEqual(entry['steps'], 1)
+        self.assertTrue(is_valid_board(entry['board']))
+        self.assertEqual(decode_board(entry['bitstring'], ROWS, COLS, QUBITS_PER_CELL),
+                         entry['board'])
+
+    def test_valid_sample_needs_no_changes(self):
+        repaired = self.repair({VALID: 1})
+        self.assertEqual(repaired[0]['steps'], 0)
+        self.assertEqual(repaired[0]['board'], [[1, 2], [2, 1]])
+
+    def test_only_the_top_n_samples_are_repaired_and_sorted(self):
+        counts = {flip(VALID, i): 10 - i for i in range(4)}
+        repaired = self.repair(counts, top_n=2)
+        self.assertLessEqual(len(repaired), 2)
+        self.assertTrue({entry['original'] for entry in repaired}
+                        <= {flip(VALID, 0), flip(VALID, 1)})
+        keys = [(entry['energy'], entry['steps']) for entry in repaired]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_no_steps_leaves_invalid_samples_out(self):
+        self.assertEqual(self.repair({flip(VALID, 0): 1}, max_steps=0), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
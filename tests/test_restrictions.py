@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+from qiskit.quantum_info import SparsePauliOp
+
+from energy import DiagonalHamiltonian
+from restrictions import compact_operator, create_hamiltonian, operator_stats, split_identity
+
+
+class CompactOperatorTest(unittest.TestCase):
+    def test_compaction_keeps_the_spectrum_with_fewer_terms(self):
+        raw = create_hamiltonian(100, 2, 2, compact=False)
+        H = create_hamiltonian(100, 2, 2)
+
+        self.assertLess(len(H), len(raw))
+        self.assertEqual(len(H.paulis), len(set(H.paulis.to_labels())))
+        np.testing.assert_allclose(DiagonalHamiltonian(H).diagonal(),
+                                   DiagonalHamiltonian(raw).diagonal())
+
+    def test_repeated_and_negligible_terms_are_merged_and_dropped(self):
+        operator = SparsePauliOp(['ZI', 'ZI', 'IZ', 'II'], [1.0, 2.0, 1e-12, 0.5])
+        compact = compact_operator(operator)
+        self.assertEqual(dict(zip(compact.paulis.to_labels(), compact.coeffs.real)),
+                         {'ZI': 3.0, 'II': 0.5})
+
+
+class OperatorStatsTest(unittest.TestCase):
+    def test_counts_terms_identity_and_locality(self):
+        operator = SparsePauliOp(['III', 'ZII', 'IZZ', 'ZIZ', 'III'], [2, 1, 1, 1, 3])
+        self.assertEqual(operator_stats(operator), {
+            'qubits': 3,
+            'terms': 5,
+            'identity_terms': 2,
+            'identity_offset': 5.0,
+            'locality': {1: 1, 2: 2},
+            'max_locality': 2,
+        })
+
+    def test_only_identity(self):
+        stats = operator_stats(SparsePauliOp(['II'], [1]))
+        self.assertEqual((stats['locality'], stats['max_locality']), ({}, 0))
+
+
+class SplitIdentityTest(unittest.TestCase):
+    def test_offset_is_separated_from_the_rest(self):
+        operator = SparsePauliOp(['II', 'ZZ', 'II'], [1, 2, 3])
+        rest, offset = split_identity(operator)
+        self.assertEqual(offset, 4)
+        self.assertEqual(rest.paulis.to_labels(), ['ZZ'])
+
+        rest, offset = split_identity(SparsePauliOp(['II'], [5]))
+        self.assertEqual(offset, 5)
+        self.assertEqual(rest.coeffs.tolist(), [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from qiskit import Aer, QuantumCircuit
+from qiskit.circuit import Parameter
+
+from result_cache import CachingProvider, ResultCache, backend_settings
+
+
+def rotation(angle):
+    theta = Parameter('theta')
+    circuit = QuantumCircuit(1)
+    circuit.ry(theta, 0)
+    circuit.measure_all()
+    return circuit.assign_parameters({theta: angle})
+
+
+class FakeResult:
+    def __init__(self, counts_list):
+        self.counts_list = counts_list
+
+    def get_counts(self, index):
+        return self.counts_list[index]
+
+
+class FakeJob:
+    def __init__(self, counts_list):
+        self.counts_list = counts_list
+
+    def result(self):
+        return FakeResult(self.counts_list)
+
+
+class FakeProvider:
+    """Proveedor de ``async_executor`` que registra los circuitos enviados."""
+
+    def __init__(self):
+        self.backend = Aer.get_backend('qasm_simulator')
+        self.submitted = []
+
+    def run(self, circuits, shots):
+        self.submitted.append(len(circuits))
+        return FakeJob([{'0': shots, 'lote': len(self.submitted)} for _ in circuits])
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.settings = backend_settings(Aer.get_backend('qasm_simulator'))
+
+    def test_key_depends_on_circuit_shots_seed_and_backend(self):
+        key = ResultCache.key(rotation(0.5), self.settings, 100, seed=1)
+        self.assertEqual(key, ResultCache.key(rotation(0.5), self.settings, 100, seed=1))
+        others = [
+            ResultCache.key(rotation(0.6), self.settings, 100, seed=1),
+            ResultCache.key(rotation(0.5), self.settings, 200, seed=1),
+            ResultCache.key(rotation(0.5), self.settings, 100, seed=2),
+            ResultCache.key(rotation(0.5), 'otro backend', 100, seed=1),
+        ]
+        self.assertNotIn(key, others)
+        self.assertEqual(len(set(others)), len(others))
+
+    def test_put_then_get_counts_hits_and_misses(self):
+        cache = ResultCache(self.directory)
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', {'0': 3, '1': 7})
+        self.assertEqual(cache.get('a'), {'0': 3, '1': 7})
+        self.assertEqual(cache.stats(),
+                         {'hits': 1, 'misses': 1, 'hit_rate': 0.5, 'entries': 1})
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResultCache(self.directory, max_entries=2)
+        cache.put('a', {'0': 1})
+        cache.put('b', {'0': 2})
+        cache.get('a')
+        cache.put('c', {'0': 3})
+
+        self.assertIsNone(cache.get('b'))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'b.json')))
+        self.assertEqual(cache.get('a'), {'0': 1})
+        self.assertEqual(cache.get('c'), {'0': 3})
+
+    def test_lru_order_survives_a_new_instance(self):
+        cache = ResultCache(self.directory)
+        for age, key in enumerate(['viejo', 'nuevo']):
+            cache.put(key, {'0': age})
+            os.utime(os.path.join(self.directory, f'{key}.json'), (age, age))
+
+        reopened = ResultCache(self.directory, max_entries=2)
+        reopened.put('otro', {'0': 2})
+        self.assertIsNone(reopened.get('viejo'))
+        self.assertEqual(reopened.get('nuevo'), {'0': 1})
+
+
+class CachingProviderTest(unittest.TestCase):
+    def test_only_missing_circuits_are_submitted(self):
+        provider = FakeProvider()
+        caching = CachingProvider(provider, ResultCache(tempfile.mkdtemp()), seed=3)
+
+        first = caching.run([rotation(0.1), rotation(0.2)], 100).result()
+        second = caching.run([rotation(0.2), rotation(0.3)], 100).result()
+
+        self.assertEqual(provider.submitted, [2, 1])
+        self.assertEqual(second.get_counts(0), first.get_counts(1))
+        self.assertEqual(second.get_counts(1)['lote'], 2)
+        self.assertIs(caching.backend, provider.backend)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+from qiskit.quantum_info import SparsePauliOp
+
+from run_store import RunStore, hamiltonian_fingerprint
+
+
+class HamiltonianFingerprintTest(unittest.TestCase):
+    def test_equal_operators_share_the_fingerprint(self):
+        operator = SparsePauliOp(['ZI', 'IZ', 'ZI'], [1, 2, 3])
+        same = SparsePauliOp(['IZ', 'ZI'], [2, 4])
+        self.assertEqual(hamiltonian_fingerprint(operator), hamiltonian_fingerprint(same))
+        self.assertNotEqual(hamiltonian_fingerprint(operator),
+                            hamiltonian_fingerprint(SparsePauliOp(['IZ', 'ZI'], [2, 5])))
+
+
+class RunStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'vars', 'runs.sqlite')
+        self.H = SparsePauliOp(['ZZ', 'IZ'], [1, -1])
+
+    def test_append_then_get_returns_the_run(self):
+        with RunStore(self.path) as store:
+            run_id = store.append('vqe', {'shots': 1000, 'seed': 7}, hamiltonian=self.H,
+                                  rows=2, cols=2, energy=-1.5, valid=True,
+                                  board=[[1, 2], [2, 1]], parameters=[0.1, 0.2],
+                                  trace=[(1.0, 0.5), (-1.5, None)], evaluations=2,
+                                  total_shots=2000, seconds=0.3, timings={'solve': 0.2})
+            run = store.get(run_id)
+            self.assertIsNone(store.get(run_id + 1))
+
+        self.assertEqual(run['method'], 'vqe')
+        self.assertEqual(run['config'], {'shots': 1000, 'seed': 7})
+        self.assertEqual(run['hamiltonian'], hamiltonian_fingerprint(self.H))
+        self.assertEqual(run['board'], [[1, 2], [2, 1]])
+        self.assertIs(run['valid'], True)
+        np.testing.assert_array_equal(run['parameters'], [0.1, 0.2])
+        self.assertEqual(run['timings'], {'solve': 0.2})
+
+    def test_trace_keeps_the_evaluation_order(self):
+        with RunStore(self.path) as store:
+            run_id = store.append('qaoa', {}, trace=[(3.0, 0.1), (2.0, None), (1.0, 0.3)])
+            trace = store.trace(run_id)
+            self.assertEqual(store.trace(run_id + 1).shape, (0, 2))
+        np.testing.assert_array_equal(trace[:, 0], [3.0, 2.0, 1.0])
+        self.assertTrue(np.isnan(trace[1, 1]))
+
+    def test_runs_are_filtered_ordered_and_appended_across_connections(self):
+        other = SparsePauliOp(['XX'], [1])
+        with RunStore(self.path) as store:
+            store.append('vqe', {}, hamiltonian=self.H, rows=2, cols=2, energy=0.5, valid=False)
+            store.append('qaoa', {}, hamiltonian=self.H, rows=2, cols=2, energy=-2.0, valid=True)
+        with RunStore(self.path) as store:
+            store.append('vqe', {}, hamiltonian=other, rows=4, cols=4, energy=-9.0, valid=True)
+
+            self.assertEqual(len(store), 3)
+            self.assertEqual([run['id'] for run in store.runs()], [1, 2, 3])
+            self.assertEqual([run['energy'] for run in store.runs(method='vqe')], [0.5, -9.0])
+            self.assertEqual([run['method'] for run in store.runs(rows=2, valid=True)],
+                             ['qaoa'])
+            self.assertEqual([run['id'] for run in store.runs(order_by='energy', limit=2)],
+                             [3, 2])
+            self.assertEqual(store.best(self.H)['energy'], -2.0)
+            self.assertIsNone(store.best(SparsePauliOp(['YY'], [1])))
+            with self.assertRaises(ValueError):
+                store.runs(order_by='energy; DROP TABLE runs')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+
+from solution_cache import (SolutionCache, apply_transform, canonical_form, invert_transform,
+                            is_solution_of, random_symmetry)
+
+PUZZLE = [
+    [8, 2, 0, 9, 1, 0, 0, 0, 7],
+    [9, 0, 0, 7, 0, 6, 8, 1, 2],
+    [0, 1, 7, 8, 0, 0, 0, 9, 0],
+    [0, 8, 0, 0, 0, 0, 9, 7, 0],
+    [0, 5, 2, 0, 9, 3, 1, 8, 0],
+    [6, 0, 0, 1, 8, 7, 0, 0, 0],
+    [0, 7, 8, 0, 0, 9, 0, 5, 0],
+    [3, 0, 0, 2, 5, 0, 7, 6, 0],
+    [5, 0, 9, 3, 0, 1, 2, 0, 8],
+]
+SMALL = [[1, 0, 0, 0], [0, 0, 1, 0], [0, 4, 0, 0], [0, 0, 0, 4]]
+SMALL_SOLUTION = [[1, 2, 4, 3], [4, 3, 1, 2], [2, 4, 3, 1], [3, 1, 2, 4]]
+
+
+def relabel_and_swap(board):
+    """Renombra los dígitos con d -> n + 1 - d, cambia las filas 0 y 1 y las columnas 1 y 0."""
+    n = len(board)
+    grid = np.array([[n + 1 - value if value else 0 for value in row] for row in board])
+    grid[[0, 1]] = grid[[1, 0]]
+    grid[:, [0, 1]] = grid[:, [1, 0]]
+    return grid.tolist()
+
+
+def solve_small(board):
+    # Solo usado como solucionador del 4x4 conocido
+    return SMALL_SOLUTION if board == SMALL else None
+
+
+class CanonicalFormTest(unittest.TestCase):
+    def test_invariant_under_relabel_and_row_column_swaps(self):
+        for board in (SMALL, PUZZLE):
+            with self.subTest(size=len(board)):
+                canonical, _ = canonical_form(board)
+                variant = relabel_and_swap(board)
+                self.assertNotEqual(variant, board)
+                self.assertEqual(canonical_form(variant)[0], canonical)
+                self.assertEqual(canonical_form(np.array(board).T.tolist())[0], canonical)
+
+    def test_invariant_under_random_symmetries(self):
+        rng = np.random.default_rng(0)
+        canonical, _ = canonical_form(PUZZLE)
+        for _ in range(3):
+            self.assertEqual(canonical_form(random_symmetry(PUZZLE, rng))[0], canonical)
+
+    def test_transform_maps_to_the_canonical_board_and_back(self):
+        canonical, transform = canonical_form(PUZZLE)
+        self.assertEqual(apply_transform(PUZZLE, transform), canonical)
+        self.assertEqual(invert_transform(canonical, transform), PUZZLE)
+        # Las pistas se renombran por orden de aparición y las vacías siguen en 0
+        self.assertEqual(sum(value == 0 for row in canonical for value in row),
+                         sum(value == 0 for row in PUZZLE for value in row))
+
+    def test_unsupported_sizes_are_rejected(self):
+        for board in ([[0] * 3] * 3, [[0] * 4] * 3, [[0] * 16] * 16):
+            with self.assertRaises(ValueError):
+                canonical_form(board)
+
+
+class SolutionCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), 'solutions')
+
+    def test_symmetric_puzzle_is_answered_from_the_cache(self):
+        variant = relabel_and_swap(SMALL)
+        with SolutionCache(self.path) as cache:
+            self.assertIsNone(cache.get(variant))
+            self.assertEqual(cache.solve(SMALL, solve_small), SMALL_SOLUTION)
+
+            solution = cache.solve(variant, solve_small)
+            self.assertTrue(is_solution_of(variant, solution))
+            self.assertEqual(cache.stats()['hits'], 1)
+
+        # La caché en disco sobrevive al cierre, aun sin memoria
+        with SolutionCache(self.path, max_memory=0) as cache:
+            self.assertEqual(cache.get(SMALL), SMALL_SOLUTION)
+            self.assertEqual(cache.stats()['memory_entries'], 0)
+
+    def test_wrong_solutions_are_not_stored(self):
+        wrong = [row[:] for row in SMALL_SOLUTION]
+        wrong[0][1], wrong[0][2] = wrong[0][2], wrong[0][1]
+        with SolutionCache(self.path) as cache:
+            with self.assertRaises(ValueError):
+                cache.put(SMALL, wrong)
+            self.assertEqual(cache.solve(SMALL, lambda board: wrong), wrong)
+            self.assertIsNone(cache.get(SMALL))
+
+
+if __name__ == '__main__':
+    unittest.main()
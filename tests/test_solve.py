@@ -0,0 +1,106 @@
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+import solve
+
+PUZZLE = """\
+8 2 0 9 1 0 0 0 7
+9 0 0 7 0 6 8 1 2
+0 1 7 8 0 0 0 9 0
+0 8 0 0 0 0 9 7 0
+0 5 2 0 9 3 1 8 0
+6 0 0 1 8 7 0 0 0
+0 7 8 0 0 9 0 5 0
+3 0 0 2 5 0 7 6 0
+5 0 9 3 0 1 2 0 8
+"""
+
+
+def write_puzzle(text):
+    filename = os.path.join(tempfile.mkdtemp(), 'problem.txt')
+    with open(filename, 'w') as f:
+        f.write(text)
+    return filename
+
+
+def run_main(*args):
+    output, errors = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+        status = solve.main(list(args))
+    return status, output.getvalue(), errors.getvalue()
+
+
+def unsolved(matrix):
+    # Un método que agota sus iteraciones sin resolver el tablero
+    return None
+
+
+class SolveTest(unittest.TestCase):
+    def test_classical_methods_solve_the_puzzle(self):
+        filename = write_puzzle(PUZZLE)
+        for method in solve.FALLBACKS:
+            with self.subTest(method=method):
+                status, output, _ = run_main(method, filename)
+                self.assertEqual(status, 0)
+                lines = output.splitlines()
+                self.assertEqual(len(lines), 10)
+                self.assertEqual(lines[-1], 'The solution is correct')
+                # Las pistas se conservan
+                self.assertEqual(lines[0].split()[:2], ['8', '2'])
+
+    def test_classical_method_does_not_import_heavy_modules(self):
+        # En un proceso aparte: la sesión de pruebas ya importó qiskit
+        script = ('import sys, solve; status = solve.main(["classical", sys.argv[1]]); '
+                  'heavy = {"qiskit", "qiskit_aer", "dimod", "matplotlib"} & set(sys.modules); '
+                  'sys.exit(status or len(heavy))')
+        result = subprocess.run([sys.executable, '-c', script, write_puzzle(PUZZLE)],
+                                cwd=SRC, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_variational_methods_reject_boards_they_would_ignore(self):
+        boards = {
+            'pistas': '1 0\n0 0\n',
+            'tamaño': '0 0 0 0\n' * 4,
+        }
+        for reason, text in boards.items():
+            with self.subTest(reason=reason):
+                status, output, errors = run_main('vqe', write_puzzle(text))
+                self.assertEqual(status, 2)
+                self.assertEqual(output, '')
+                self.assertTrue(errors.startswith('Error: vqe_local'))
+
+
+class FallbackTest(unittest.TestCase):
+    def setUp(self):
+        self.filename = write_puzzle(PUZZLE)
+
+    def run_main(self, *args):
+        output = io.StringIO()
+        with mock.patch.dict(solve.SOLVERS, {'decomposition': (unsolved, '')}), \
+                contextlib.redirect_stdout(output):
+            status = solve.main(['decomposition', self.filename, *args])
+        return status, output.getvalue()
+
+    def test_failure_without_fallback_exits_one(self):
+        status, output = self.run_main()
+        self.assertEqual(status, 1)
+        self.assertEqual(output, '')
+
+    def test_fallback_is_labelled_and_has_its_own_exit_status(self):
+        status, output = self.run_main('--fallback', 'propagation')
+        self.assertEqual(status, solve.FALLBACK_EXIT)
+        self.assertTrue(output.startswith('Respaldo: decomposition'))
+        self.assertIn('The solution is correct', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
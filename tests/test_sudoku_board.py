@@ -0,0 +1,24 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+
+from sudoku_board import count_conflicts, is_valid_board, valid_boards
+
+
+class ValidBoardsTest(unittest.TestCase):
+    def test_values_outside_the_digits_are_invalid(self):
+        # Distintos en cada fila y columna, pero 0 y 3 no son dígitos de un 2x2
+        boards = [[[0, 2], [1, 3]], [[1, 0], [0, 1]], [[1, 2], [2, 1]]]
+        self.assertEqual(valid_boards(np.array(boards)).tolist(), [False, False, True])
+        self.assertEqual([is_valid_board(board) for board in boards], [False, False, True])
+
+    def test_out_of_range_cells_count_as_conflicts(self):
+        self.assertEqual(count_conflicts(np.array([[[0, 2], [1, 3]]])).tolist(), [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
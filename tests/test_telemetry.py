@@ -0,0 +1,83 @@
+import math
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import numpy as np
+
+from telemetry import (JsonlWriter, RingBuffer, evaluation_events, format_summary, read_jsonl,
+                       summarize)
+
+
+def evaluation(energy, **timings):
+    return {'event': 'evaluation', 'energy': energy, **timings}
+
+
+class SinkTest(unittest.TestCase):
+    def test_ring_buffer_keeps_the_last_events(self):
+        buffer = RingBuffer(capacity=3)
+        for i in range(5):
+            buffer.record({'evaluation': i})
+        self.assertEqual([event['evaluation'] for event in buffer], [2, 3, 4])
+
+    def test_jsonl_writer_round_trip_and_flush(self):
+        path = os.path.join(tempfile.mkdtemp(), 'telemetria.jsonl')
+        with JsonlWriter(path, flush_every=2) as writer:
+            writer.record({'event': 'setup', 'transpile': 0.5})
+            self.assertEqual(list(read_jsonl(path)), [])
+            writer.record(evaluation(1.0))
+            self.assertEqual(len(list(read_jsonl(path))), 2)
+            writer.record(evaluation(0.5))
+        self.assertEqual([event['event'] for event in read_jsonl(path)],
+                         ['setup', 'evaluation', 'evaluation'])
+
+        with JsonlWriter(path, append=True) as writer:
+            writer.record(evaluation(0.25))
+        self.assertEqual(len(list(read_jsonl(path))), 4)
+
+
+class EvaluationEventsTest(unittest.TestCase):
+    def test_job_time_is_shared_between_points(self):
+        points = np.array([[3.0, 4.0], [0.0, 0.0]])
+        events = evaluation_events(points, [(1.0, 0.1), (2.0, 0.2)],
+                                   {'simulate': 1.0, 'bind': 0.5}, first_evaluation=10,
+                                   shots=100)
+        self.assertEqual([event['evaluation'] for event in events], [10, 11])
+        self.assertEqual([event['param_norm'] for event in events], [5.0, 0.0])
+        self.assertEqual(events[1]['energy'], 2.0)
+        self.assertEqual((events[0]['simulate'], events[0]['bind'], events[0]['transpile']),
+                         (0.5, 0.25, 0.0))
+
+
+class SummarizeTest(unittest.TestCase):
+    def test_convergence_rate_of_an_exponential_decay(self):
+        energies = [math.exp(-0.5 * k) for k in range(5)] + [0.0, 0.3]
+        events = [{'event': 'setup', 'transpile': 1.0}]
+        events += [evaluation(energy, simulate=0.5) for energy in energies]
+        summary = summarize(events)
+
+        self.assertEqual(summary['evaluations'], 7)
+        self.assertEqual((summary['first_energy'], summary['best_energy']), (1.0, 0.0))
+        self.assertEqual(summary['best_evaluation'], 5)
+        self.assertAlmostEqual(summary['convergence_rate'], -0.5)
+        self.assertAlmostEqual(summary['evaluations_per_e_fold'], 2.0)
+        self.assertAlmostEqual(summary['seconds'], 4.5)
+        self.assertAlmostEqual(summary['time_fraction']['simulate'], 3.5 / 4.5)
+
+        text = format_summary(summary)
+        self.assertIn('Energía: 1.00 -> 0.00 (mejor en la evaluación 5)', text)
+        self.assertIn('una e-fold cada 2.0 evaluaciones', text)
+
+    def test_no_evaluations(self):
+        summary = summarize([{'event': 'setup'}])
+        self.assertEqual(summary['evaluations'], 0)
+        self.assertNotIn('best_energy', summary)
+        self.assertEqual(format_summary(summary).splitlines()[0],
+                         'Evaluaciones: 0, tiempo registrado: 0.00 s')
+
+
+if __name__ == '__main__':
+    unittest.main()